@@ -0,0 +1,307 @@
+"""
+Offline archive of historic observations and checklist feeds.
+
+Usage:
+    python archive.py sync US-NY US-NJ --start 2024-05-01 --end 2024-05-31
+    python archive.py sync US-NY US-NJ
+
+The first form backfills a date range. Without ``--start``, each region
+continues from the day after its last archived day (or ``--days`` back on
+the first run), so a daily cron job only fetches the new days. The archive
+lives in ``$EBIRD_CACHE_DIR/archive.sqlite3`` and is read by the server.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS archive_days (
+    kind TEXT NOT NULL,
+    region TEXT NOT NULL,
+    day TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (kind, region, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS observations (
+    region TEXT NOT NULL,
+    day TEXT NOT NULL,
+    speciesCode TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS observations_by_day ON observations (region, day, speciesCode);
+CREATE INDEX IF NOT EXISTS observations_by_species ON observations (speciesCode, day);
+CREATE TABLE IF NOT EXISTS checklists (
+    region TEXT NOT NULL,
+    day TEXT NOT NULL,
+    subId TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS checklists_by_day ON checklists (region, day);
+"""
+
+OBSERVATIONS = "obs"
+CHECKLISTS = "lists"
+
+# Largest page the historic and checklist feed endpoints return.
+MAX_HISTORIC_RESULTS = 10000
+MAX_FEED_RESULTS = 200
+
+
+def days_between(start, end):
+    """Yield every date from ``start`` to ``end`` inclusive."""
+    for offset in range((end - start).days + 1):
+        yield start + timedelta(days=offset)
+
+
+class ObservationArchive:
+    """
+    SQLite archive of historic observations and checklist feeds by region
+    and date.
+
+    Past days barely change, but checklists keep arriving for a few days
+    after the fact. A day therefore only counts as archived once it was
+    fetched at least ``settle_days`` after it ended; earlier copies are
+    fetched again by the next sync and are not served.
+    """
+
+    def __init__(self, path=":memory:", settle_days=3, clock=time.time):
+        self.path = path
+        self.settle_days = settle_days
+        self.clock = clock
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path)
+            if self.path != ":memory:":
+                # Lets the server read while a sync is writing.
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def today(self):
+        return date.fromtimestamp(self.clock())
+
+    def _settled(self, day, fetched_at):
+        return (date.fromtimestamp(fetched_at) - day).days >= self.settle_days
+
+    def has(self, kind, region_code, day):
+        """
+        Return True if a settled copy of the day is archived.
+        """
+        row = self._db().execute(
+            "SELECT fetched_at FROM archive_days WHERE kind = ? AND region = ? AND day = ?",
+            (kind, region_code, day.isoformat()),
+        ).fetchone()
+        return row is not None and self._settled(day, row[0])
+
+    def last_day(self, kind, region_code):
+        """
+        Return the latest settled day archived for a region, or None.
+        """
+        rows = self._db().execute(
+            "SELECT day, fetched_at FROM archive_days WHERE kind = ? AND region = ? ORDER BY day DESC",
+            (kind, region_code),
+        )
+        for day, fetched_at in rows:
+            day = date.fromisoformat(day)
+            if self._settled(day, fetched_at):
+                return day
+        return None
+
+    def observations(self, region_code, day, species_code=None, max_results=None):
+        """
+        Return the archived observations for a region and day, in API
+        order, or None if the day is not archived.
+        """
+        if not self.has(OBSERVATIONS, region_code, day):
+            return None
+        query = "SELECT data FROM observations WHERE region = ? AND day = ?"
+        args = [region_code, day.isoformat()]
+        if species_code:
+            query += " AND speciesCode = ?"
+            args.append(species_code)
+        query += " ORDER BY rowid"
+        if max_results:
+            query += " LIMIT ?"
+            args.append(max_results)
+        return [json.loads(data) for (data,) in self._db().execute(query, args)]
+
+    def checklists(self, region_code, day, max_results=None):
+        """
+        Return the archived checklist feed for a region and day, or None if
+        the day is not archived.
+        """
+        if not self.has(CHECKLISTS, region_code, day):
+            return None
+        query = "SELECT data FROM checklists WHERE region = ? AND day = ? ORDER BY rowid"
+        args = [region_code, day.isoformat()]
+        if max_results:
+            query += " LIMIT ?"
+            args.append(max_results)
+        return [json.loads(data) for (data,) in self._db().execute(query, args)]
+
+    def store_observations(self, region_code, day, records):
+        self._store(
+            OBSERVATIONS,
+            "INSERT INTO observations (region, day, speciesCode, data) VALUES (?, ?, ?, ?)",
+            region_code,
+            day,
+            ((r.get("speciesCode"), json.dumps(r, separators=(",", ":"))) for r in records or []),
+        )
+
+    def store_checklists(self, region_code, day, records):
+        self._store(
+            CHECKLISTS,
+            "INSERT INTO checklists (region, day, subId, data) VALUES (?, ?, ?, ?)",
+            region_code,
+            day,
+            ((r.get("subId"), json.dumps(r, separators=(",", ":"))) for r in records or []),
+        )
+
+    def _store(self, kind, insert, region_code, day, rows):
+        table = "observations" if kind == OBSERVATIONS else "checklists"
+        db = self._db()
+        with db:
+            db.execute(
+                f"DELETE FROM {table} WHERE region = ? AND day = ?",
+                (region_code, day.isoformat()),
+            )
+            db.executemany(
+                insert, ((region_code, day.isoformat(), key, data) for key, data in rows)
+            )
+            db.execute(
+                "INSERT OR REPLACE INTO archive_days (kind, region, day, fetched_at) VALUES (?, ?, ?, ?)",
+                (kind, region_code, day.isoformat(), self.clock()),
+            )
+
+    async def sync_day(self, client, region_code, day):
+        """
+        Fetch and store both feeds for one region and day, skipping feeds
+        that are already archived.
+        """
+        fetched = {}
+        if not self.has(OBSERVATIONS, region_code, day):
+            fetched[OBSERVATIONS] = client.get_historic_observations(
+                region_code,
+                day.year,
+                day.month,
+                day.day,
+                {"maxResults": MAX_HISTORIC_RESULTS},
+            )
+        if not self.has(CHECKLISTS, region_code, day):
+            fetched[CHECKLISTS] = client.get_checklist_feed_on_date(
+                region_code,
+                day.year,
+                day.month,
+                day.day,
+                {"maxResults": MAX_FEED_RESULTS},
+            )
+        results = dict(zip(fetched, await asyncio.gather(*fetched.values())))
+        if OBSERVATIONS in results:
+            self.store_observations(region_code, day, results[OBSERVATIONS])
+        if CHECKLISTS in results:
+            self.store_checklists(region_code, day, results[CHECKLISTS])
+        return {kind: len(records or []) for kind, records in results.items()}
+
+    async def sync(self, client, region_codes, start, end=None, max_concurrency=4):
+        """
+        Archive every day from ``start`` to ``end`` (default yesterday) for
+        each region. Days already archived are skipped, so re-running a
+        sync only fetches what is new or not yet settled.
+
+        Returns counts of fetched days and records, and the errors by
+        ``"<region> <day>"``.
+        """
+        end = min(end or self.today(), self.today() - timedelta(days=1))
+        semaphore = asyncio.Semaphore(max_concurrency)
+        summary = {"days": 0, OBSERVATIONS: 0, CHECKLISTS: 0, "errors": {}}
+
+        async def fetch(region_code, day):
+            async with semaphore:
+                try:
+                    counts = await self.sync_day(client, region_code, day)
+                except Exception as e:
+                    summary["errors"][f"{region_code} {day.isoformat()}"] = str(e)
+                    return
+            if counts:
+                summary["days"] += 1
+                for kind, count in counts.items():
+                    summary[kind] += count
+
+        await asyncio.gather(
+            *(
+                fetch(region_code, day)
+                for region_code in region_codes
+                for day in days_between(start, end)
+            )
+        )
+        return summary
+
+    def resume_from(self, region_code, default_days):
+        """
+        Return the first day an incremental sync of a region should fetch.
+        """
+        last = min(
+            (self.last_day(kind, region_code) for kind in (OBSERVATIONS, CHECKLISTS)),
+            key=lambda day: day or date.min,
+        )
+        if last is None:
+            return self.today() - timedelta(days=default_days)
+        return last + timedelta(days=1)
+
+
+async def run_sync(args):
+    from server import archive, ebird
+
+    try:
+        for region_code in args.regions:
+            start = args.start or archive.resume_from(region_code, args.days)
+            summary = await archive.sync(
+                ebird, [region_code], start, args.end, max_concurrency=args.concurrency
+            )
+            print(
+                f"{region_code}: {summary['days']} days from {start.isoformat()}, "
+                f"{summary[OBSERVATIONS]} observations, {summary[CHECKLISTS]} checklists",
+                file=sys.stderr,
+            )
+            for key, error in summary["errors"].items():
+                print(f"  failed {key}: {error}", file=sys.stderr)
+    finally:
+        await ebird.aclose()
+        archive.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the offline eBird archive.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    sync = commands.add_parser("sync", help="Backfill or incrementally sync regions.")
+    sync.add_argument("regions", nargs="+", help="Region codes, e.g. US-NY.")
+    sync.add_argument("--start", type=date.fromisoformat, help="First day (YYYY-MM-DD).")
+    sync.add_argument("--end", type=date.fromisoformat, help="Last day (default yesterday).")
+    sync.add_argument(
+        "--days",
+        type=int,
+        default=30,
+        help="Days to backfill for a region that has not been synced yet.",
+    )
+    sync.add_argument("--concurrency", type=int, default=4, help="Days fetched at once.")
+    args = parser.parse_args(argv)
+    asyncio.run(run_sync(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Decode, memory and formatting cost of a 10k-observation payload as raw dicts
+versus slotted ``models.Observation`` records.
+
+Responses are cached as dicts, so the server formats those directly; parsing
+them into records on every call costs more than attribute access saves.
+
+Usage: python benchmarks/bench_models.py [--records N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+from models import Observation  # noqa: E402
+from server import format_observations  # noqa: E402
+
+
+def payload(n):
+    return json.dumps(
+        [
+            {
+                "speciesCode": f"sp{i % 900:04d}",
+                "comName": f"Common Name {i % 900}",
+                "sciName": f"Genus species{i % 900}",
+                "locId": f"L{i}",
+                "locName": f"Location {i}",
+                "obsDt": "2025-06-01 07:30",
+                "howMany": i % 7 or None,
+                "lat": 40.0 + i / 1e5,
+                "lng": -73.0 - i / 1e5,
+                "obsValid": True,
+                "obsReviewed": False,
+                "locationPrivate": False,
+                "subId": f"S{i}",
+                "userDisplayName": f"Observer {i % 50}",
+            }
+            for i in range(n)
+        ]
+    ).encode()
+
+
+def parse_observations(observations):
+    return [obs if isinstance(obs, Observation) else Observation.from_dict(obs) for obs in observations]
+
+
+def format_records(observations):
+    """Formatting from parsed records, kept for comparison."""
+    lines = []
+    for obs in parse_observations(observations):
+        how_many = f"Count: {obs.how_many}" if obs.how_many else "Present"
+        date = obs.obs_dt if obs.obs_dt is not None else "Unknown date"
+        if obs.obs_time:
+            date = f"{date} {obs.obs_time}"
+        observer = f"\nObserver: {obs.user_display_name}" if obs.user_display_name else ""
+        lines.append(
+            f"Species: {obs.com_name} ({obs.sci_name})\n"
+            f"Location: {obs.loc_name}\n"
+            f"{how_many}\n"
+            f"Date: {date}\n"
+            f"Coordinates: {obs.lat}, {obs.lng}{observer}"
+        )
+    return "\n\n".join(lines)
+
+
+def format_dicts(observations):
+    """The original dict-based formatter, kept for comparison."""
+    lines = []
+    for obs in observations:
+        how_many = f"Count: {obs.get('howMany')}" if obs.get("howMany") else "Present"
+        date = obs.get("obsDt", "Unknown date")
+        time_ = obs.get("obsTime", "")
+        datetime_str = f"{date} {time_}".strip()
+        line = (
+            f"Species: {obs.get('comName')} ({obs.get('sciName')})\n"
+            f"Location: {obs.get('locName')}\n"
+            f"{how_many}\n"
+            f"Date: {datetime_str}\n"
+            f"Coordinates: {obs.get('lat')}, {obs.get('lng')}"
+        )
+        if obs.get("userDisplayName"):
+            line += f"\nObserver: {obs.get('userDisplayName')}"
+        lines.append(line)
+    return "\n\n".join(lines)
+
+
+def timed(label, func, *args, repeat=5):
+    best = min(_run(func, args) for _ in range(repeat))
+    print(f"{label:<34} {best * 1000:8.2f} ms")
+
+
+def _run(func, args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def retained(func, *args):
+    tracemalloc.start()
+    result = func(*args)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main(n):
+    raw = payload(n)
+    dicts = json.loads(raw)
+    records = parse_observations(dicts)
+    print(f"{n} observations, {len(raw) / 1024:.0f} KiB, decoder: {models.loads.__module__}")
+
+    timed("decode json.loads", json.loads, raw)
+    timed("decode models.loads", models.loads, raw)
+    timed("parse to Observation", parse_observations, dicts)
+    timed("format dicts, original", format_dicts, dicts)
+    timed("format dicts, server", format_observations, dicts)
+    timed("format parsed records", format_records, records)
+    timed("parse + format from dicts", format_records, dicts)
+
+    dict_bytes = retained(lambda: json.loads(raw))
+    record_bytes = retained(lambda: parse_observations(json.loads(raw)))
+    print(f"memory per record: dicts {dict_bytes / n:.0f} B, Observation {record_bytes / n:.0f} B")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=10000)
+    args = parser.parse_args()
+    main(args.records)
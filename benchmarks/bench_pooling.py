@@ -0,0 +1,63 @@
+"""
+Per-call latency of a fresh ``httpx.AsyncClient`` per request versus the
+pooled client owned by ``EBirdClient``, against a local mock server.
+
+Usage: python benchmarks/bench_pooling.py [--calls N]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_server import MockEBirdServer  # noqa: E402
+from client import EBirdClient  # noqa: E402
+
+
+async def per_call_client(base_url, calls):
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        async with httpx.AsyncClient(timeout=10) as client:
+            response = await client.get(f"{base_url}/data/obs/US-NY/recent")
+            response.json()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def pooled_client(base_url, calls):
+    timings = []
+    async with EBirdClient("bench") as ebird:
+        ebird.base_url = base_url
+        for _ in range(calls):
+            start = time.perf_counter()
+            await ebird.make_request("/data/obs/US-NY/recent")
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(label, timings, connections):
+    timings_ms = sorted(t * 1000 for t in timings)
+    p50 = statistics.median(timings_ms)
+    p99 = timings_ms[int(len(timings_ms) * 0.99) - 1]
+    print(f"{label:<22} p50={p50:7.3f} ms  p99={p99:7.3f} ms  connections={connections}")
+
+
+async def main(calls):
+    for label, bench in (("new client per call", per_call_client), ("pooled EBirdClient", pooled_client)):
+        async with MockEBirdServer() as server:
+            timings = await bench(server.base_url, calls)
+            report(label, timings, server.connections)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls))
@@ -0,0 +1,65 @@
+"""
+Lookup latency of the fuzzy species name index on a synthetic taxonomy.
+
+Usage: python benchmarks/bench_resolver.py [--taxa N]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from taxonomy import NameIndex  # noqa: E402
+
+def pseudo_word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))
+
+
+def synthetic_taxa(n, seed=1):
+    """
+    Taxa with a Zipf-like word distribution, roughly like real common names
+    (a few words such as "Warbler" are frequent, most are rare).
+    """
+    rng = random.Random(seed)
+    vocabulary = [pseudo_word(rng).capitalize() for _ in range(n // 3)]
+    weights = [1 / (rank + 20) for rank in range(len(vocabulary))]
+    taxa = []
+    for i in range(n):
+        com = " ".join(rng.choices(vocabulary, weights, k=rng.randint(2, 3)))
+        sci = f"{pseudo_word(rng)} {pseudo_word(rng)}".capitalize()
+        taxa.append({"speciesCode": f"sp{i:05d}", "comName": com, "sciName": sci})
+    return taxa
+
+
+def main(n, queries):
+    taxa = synthetic_taxa(n)
+    start = time.perf_counter()
+    index = NameIndex(taxa)
+    print(f"built index over {n} taxa in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = random.Random(2)
+    samples = [rng.choice(taxa)["comName"] for _ in range(queries // 2)]
+    samples += [s[: rng.randint(4, 10)] + "x" for s in samples]
+    timings = []
+    for query in samples:
+        start = time.perf_counter()
+        index.search(query, limit=10)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(
+        f"search: p50={statistics.median(timings):.3f} ms  "
+        f"p99={timings[int(len(timings) * 0.99) - 1]:.3f} ms  over {len(timings)} queries"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--taxa", type=int, default=17000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.taxa, args.queries)
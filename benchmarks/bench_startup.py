@@ -0,0 +1,107 @@
+"""
+Cold start of the server over stdio, as an MCP client sees it.
+
+Each run spawns ``python server.py`` and reports the time to import the
+server module, from spawning the process to a completed ``initialize``,
+for the ``tools/list`` request, for the first tool call, and in total from
+spawning the process to the first tool response. Runs with an empty cache
+directory register every tool to answer ``tools/list``; later runs read the
+cached tool schemas.
+
+The default tool, ``ebird_get_metrics``, needs no eBird API access.
+
+Usage: python benchmarks/bench_startup.py [--runs N] [--tool NAME] [--args JSON]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER = os.path.join(ROOT, "server.py")
+
+IMPORT_SERVER = (
+    "import time; start = time.perf_counter(); import server; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def server_env(cache_dir):
+    return {**os.environ, "EBIRD_CACHE_DIR": cache_dir, "DEBUG": "false"}
+
+
+def import_time(cache_dir):
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SERVER],
+        cwd=ROOT,
+        env=server_env(cache_dir),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+async def session_times(cache_dir, tool, arguments):
+    params = StdioServerParameters(command=sys.executable, args=[SERVER], env=server_env(cache_dir))
+    times = {}
+    with open(os.devnull, "w") as errlog:
+        start = time.perf_counter()
+        async with stdio_client(params, errlog=errlog) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                initialized = time.perf_counter()
+                tools = await session.list_tools()
+                listed = time.perf_counter()
+                result = await session.call_tool(tool, arguments)
+                responded = time.perf_counter()
+    times["initialize"] = initialized - start
+    times["tools/list"] = listed - initialized
+    times["first tool call"] = responded - listed
+    times["to first response"] = responded - start
+    if result.isError:
+        raise RuntimeError(f"{tool} failed: {result.content}")
+    times["tools"] = len(tools.tools)
+    return times
+
+
+def report(label, runs):
+    print(label)
+    for key in ("import", "initialize", "tools/list", "first tool call", "to first response"):
+        values_ms = [run[key] * 1000 for run in runs]
+        print(
+            f"  {key:<18} median {statistics.median(values_ms):7.1f} ms   "
+            f"min {min(values_ms):7.1f} ms"
+        )
+
+
+async def main(runs, tool, arguments):
+    cold, warm = [], []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            # Warm runs reuse the tool schemas the cold run cached.
+            for results in (cold, warm):
+                times = {"import": import_time(cache_dir)}
+                times.update(await session_times(cache_dir, tool, arguments))
+                results.append(times)
+    print(f"{cold[0]['tools']} tools, {runs} runs, first call: {tool}")
+    report("empty tool schema cache", cold)
+    report("cached tool schemas", warm)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tool", default="ebird_get_metrics")
+    parser.add_argument("--args", default="{}", help="tool arguments as JSON")
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.tool, json.loads(args.args)))
@@ -0,0 +1,57 @@
+"""
+Peak Python memory while consuming a large JSON array response, buffered via
+``make_request`` versus incrementally via ``stream_records``.
+
+Usage: python benchmarks/bench_streaming.py [--records N]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_models import payload  # noqa: E402
+from benchmarks.mock_server import MockEBirdServerProcess  # noqa: E402
+from client import EBirdClient  # noqa: E402
+
+
+async def buffered(ebird):
+    count = 0
+    for _ in await ebird.make_request("/data/obs/US-NY/historic/2024/5/1"):
+        count += 1
+    return count
+
+
+async def streamed(ebird):
+    count = 0
+    async for _ in ebird.stream_records("/data/obs/US-NY/historic/2024/5/1"):
+        count += 1
+    return count
+
+
+async def main(n):
+    body = payload(n)
+    print(f"{n} records, {len(body) / 1024 / 1024:.1f} MiB body")
+    with MockEBirdServerProcess(body=body) as server:
+        for label, consume in (("buffered make_request", buffered), ("stream_records", streamed)):
+            async with EBirdClient("bench") as ebird:
+                ebird.base_url = server.base_url
+                await consume(ebird)  # warm up the connection
+                tracemalloc.start()
+                start = time.perf_counter()
+                count = await consume(ebird)
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            print(f"{label:<24} {count} records  {elapsed * 1000:8.1f} ms  peak {peak / 1024 / 1024:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=50000)
+    args = parser.parse_args()
+    asyncio.run(main(args.records))
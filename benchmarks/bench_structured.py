@@ -0,0 +1,121 @@
+"""
+Text versus structured tool output for a large observation list, measured
+through FastMCP's own tool call path.
+
+For each mode this reports the server-side cost (tool call, formatting or
+record conversion, result conversion and serializing the ``CallToolResult``
+message), the message size and the time a client needs to turn the response
+into records: a JSON decode of ``structuredContent`` versus parsing prose.
+
+Usage: python benchmarks/bench_structured.py [--records N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp import types  # noqa: E402
+from mcp.server.fastmcp import FastMCP  # noqa: E402
+
+import server  # noqa: E402
+from benchmarks.bench_models import payload  # noqa: E402
+
+TOOL = "ebird_get_recent_observations"
+
+OBSERVATION_TEXT = re.compile(
+    r"Species: (?P<comName>.*) \((?P<sciName>.*)\)\n"
+    r"Location: (?P<locName>.*)\n"
+    r"(?:Count: (?P<howMany>\d+)|Present)\n"
+    r"Date: (?P<obsDt>.*)\n"
+    r"Coordinates: (?P<lat>\S+), (?P<lng>\S+)"
+    r"(?:\nObserver: (?P<userDisplayName>.*))?"
+)
+
+
+class StubClient:
+    def __init__(self, records):
+        self.records = records
+
+    async def get_recent_observations(self, region_code, options=None):
+        return self.records
+
+
+def parse_text(message):
+    """What a client has to do to get records back out of the text output."""
+    # FastMCP serializes the tools' {"content": [...]} return value as the
+    # text block, so the prose is one JSON decode further down.
+    text = json.loads(message)["content"][0]["text"]
+    text = json.loads(text)["content"][0]["text"]
+    return [m.groupdict() for m in OBSERVATION_TEXT.finditer(text)]
+
+
+def parse_structured(message):
+    return json.loads(message)["structuredContent"]["observations"]
+
+
+def build(structured, server_class):
+    mcp = server_class(name="bench")
+    mcp.tool(name=TOOL, structured_output=structured)(server.ebird_get_recent_observations)
+    return mcp
+
+
+def serialize(result):
+    """Serialize a tool result the way the low-level server sends it."""
+    content, structured = result if isinstance(result, tuple) else (result, None)
+    message = types.CallToolResult(content=list(content), structuredContent=structured)
+    return message.model_dump_json(by_alias=True, exclude_none=True)
+
+
+async def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+async def measure(label, structured, n, repeat, server_class=server.EBirdMCP):
+    server.EBIRD_STRUCTURED_OUTPUT = structured
+    mcp = build(structured, server_class)
+    args = {"regionCode": "US-NY", "pageSize": n}
+
+    async def respond():
+        return serialize(await mcp.call_tool(TOOL, args))
+
+    respond_time, message = await best_of(respond, repeat)
+    parse = parse_structured if structured else parse_text
+
+    async def consume():
+        return parse(message)
+
+    parse_time, records = await best_of(consume, repeat)
+    assert len(records) == n, (label, len(records))
+    print(
+        f"{label:<26} server {respond_time * 1000:8.1f} ms   "
+        f"message {len(message) / 1024:8.0f} KiB   "
+        f"client parse {parse_time * 1000:7.1f} ms   "
+        f"total {(respond_time + parse_time) * 1000:8.1f} ms"
+    )
+
+
+async def main(n, repeat):
+    server.ebird = StubClient(json.loads(payload(n)))
+    print(f"{n} observations")
+    await measure("text", False, n, repeat)
+    await measure("structured", True, n, repeat)
+    await measure("structured, stock FastMCP", True, n, repeat, FastMCP)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.records, args.repeat))
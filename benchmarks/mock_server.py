@@ -0,0 +1,97 @@
+"""
+Minimal local HTTP/1.1 server used by the benchmarks in place of api.ebird.org.
+
+It speaks just enough HTTP to answer GET requests with a fixed JSON body and
+honours keep-alive, so connection reuse in the client is visible in timings.
+"""
+
+import asyncio
+import json
+
+
+class MockEBirdServer:
+    def __init__(self, body=None, host="127.0.0.1", port=0, delay=0.0):
+        payload = body if body is not None else [{"speciesCode": "norcar"}]
+        self.body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.connections = 0
+        self.requests = 0
+        self._server = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/v2"
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                self.requests += 1
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                keep_alive = b"connection: close" not in head.lower()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    + f"Content-Length: {len(self.body)}\r\n".encode()
+                    + (b"Connection: keep-alive\r\n" if keep_alive else b"Connection: close\r\n")
+                    + b"\r\n"
+                )
+                writer.write(self.body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._server.close()
+        await self._server.wait_closed()
+
+
+def _serve(body, port_queue):
+    async def run():
+        async with MockEBirdServer(body=body) as server:
+            port_queue.put(server.port)
+            await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+class MockEBirdServerProcess:
+    """
+    Runs ``MockEBirdServer`` in a child process, so its buffers do not show
+    up in memory measurements of the client.
+    """
+
+    def __init__(self, body=None):
+        self.body = body
+        self.port = None
+        self._process = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}/v2"
+
+    def __enter__(self):
+        import multiprocessing
+
+        queue = multiprocessing.Queue()
+        self._process = multiprocessing.Process(target=_serve, args=(self.body, queue), daemon=True)
+        self._process.start()
+        self.port = queue.get(timeout=10)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._process.terminate()
+        self._process.join()
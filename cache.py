@@ -0,0 +1,393 @@
+import json
+import math
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# Bump when the format of cached responses changes; entries written with
+# another version are ignored and removed by compaction.
+CACHE_VERSION = 1
+
+DISK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    stale_until REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    version INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS responses_by_access ON responses (accessed_at);
+"""
+
+# Endpoint prefix -> TTL in seconds. The longest matching prefix wins.
+DEFAULT_TTLS = {
+    "/data/obs": 5 * MINUTE,
+    "/data/nearest": 5 * MINUTE,
+    "/product/lists": 5 * MINUTE,
+    "/product/top100": HOUR,
+    "/product/stats": HOUR,
+    "/product/spplist": DAY,
+    "/product/checklist/view": DAY,
+    "/ref/hotspot": 6 * HOUR,
+    "/ref/adjacent": 7 * DAY,
+    "/ref/region": 7 * DAY,
+    "/ref/taxonomy": 7 * DAY,
+    # Checked daily for new taxonomy releases, so kept well below a day.
+    "/ref/taxonomy/versions": HOUR,
+    "/ref/taxa-locales": 7 * DAY,
+    "/ref/sppgroup": 7 * DAY,
+}
+
+
+def ttl_for(endpoint, ttls):
+    """
+    Return the TTL for an endpoint using the longest matching prefix, or 0.
+    """
+    best = None
+    for prefix in ttls:
+        if endpoint.startswith(prefix) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return ttls[best] if best is not None else 0
+
+
+def make_key(endpoint, params, expect_json=True):
+    """
+    Build a cache key from the endpoint and the already normalized params.
+    """
+    items = tuple(sorted((k, str(v)) for k, v in params.items()))
+    return (endpoint, items, expect_json)
+
+
+class CacheEntry:
+    __slots__ = ("value", "size", "expires_at", "stale_until", "hits")
+
+    def __init__(self, value, size, expires_at, stale_until=None):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.stale_until = expires_at if stale_until is None else stale_until
+        self.hits = 0
+
+
+class ResponseCache:
+    """
+    Interface for response caches used by EBirdClient.
+
+    Implementations store decoded responses by key and must be safe to call
+    from a single event loop. Cached values are shared, so callers must not
+    mutate them.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def lookup(self, key, ttl=None):
+        """
+        Return ``(value, remaining, hits)`` for a cached value, where
+        ``remaining`` is the seconds left before it expires (negative while
+        it is stale but still kept) and ``hits`` counts lookups since it was
+        stored, or None. Caches without stale entries only return fresh ones.
+        ``ttl`` is the TTL the value would be stored with, if known, so that
+        tiers that never hold such values can be skipped.
+        """
+        value = self.get(key)
+        return None if value is None else (value, math.inf, 0)
+
+    def set(self, key, value, ttl, size=0, stale=0):
+        """
+        Store a value for ``ttl`` seconds, then keep it ``stale`` seconds
+        longer for ``lookup`` to serve while it is refreshed.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        return {}
+
+
+class TTLCache(ResponseCache):
+    """
+    In-memory LRU cache with per-entry TTL, bounded by entry count and bytes.
+
+    Entries stored with a ``stale`` window stay available to ``lookup``
+    after they expire, for stale-while-revalidate; ``get`` only returns
+    fresh entries.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _entry(self, key, now):
+        """Return the entry if it is fresh or stale, dropping dead ones."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.stale_until <= now:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key):
+        now = self.clock()
+        entry = self._entry(key, now)
+        if entry is None or entry.expires_at <= now:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry.hits += 1
+        return entry.value
+
+    def lookup(self, key, ttl=None):
+        now = self.clock()
+        entry = self._entry(key, now)
+        if entry is None:
+            self.misses += 1
+            return None
+        remaining = entry.expires_at - now
+        if remaining > 0:
+            self.hits += 1
+            entry.hits += 1
+        else:
+            self.stale_hits += 1
+        return entry.value, remaining, entry.hits
+
+    def set(self, key, value, ttl, size=0, stale=0):
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        expires_at = self.clock() + ttl
+        self._entries[key] = CacheEntry(value, size, expires_at, expires_at + stale)
+        self.current_bytes += size
+        while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry.size
+
+
+class DiskCache(ResponseCache):
+    """
+    SQLite cache of responses that survives restarts.
+
+    Entries carry their expiry, stale window and format version. Times are
+    wall-clock so they stay valid across processes. ``compact()`` drops dead
+    and outdated entries, then the least recently used ones until the file
+    content is under ``max_bytes``; it is meant to run periodically.
+    """
+
+    def __init__(self, path=":memory:", max_bytes=256 * 1024 * 1024, clock=time.time):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._conn = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def _db(self):
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path)
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                # Losing the last writes on power loss only costs refetches.
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(DISK_SCHEMA)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def _key(key):
+        return json.dumps(key, separators=(",", ":"))
+
+    def get(self, key):
+        found = self.lookup(key)
+        return found[0] if found is not None and found[1] > 0 else None
+
+    def lookup(self, key, ttl=None):
+        now = self.clock()
+        db = self._db()
+        row = db.execute(
+            "SELECT data, expires_at FROM responses WHERE key = ? AND version = ? AND stale_until > ?",
+            (self._key(key), CACHE_VERSION, now),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        with db:
+            db.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, self._key(key))
+            )
+        remaining = row[1] - now
+        if remaining > 0:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return json.loads(row[0]), remaining, 0
+
+    def set(self, key, value, ttl, size=0, stale=0):
+        if ttl <= 0:
+            return
+        data = json.dumps(value, separators=(",", ":"))
+        if len(data) > self.max_bytes:
+            return
+        now = self.clock()
+        db = self._db()
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._key(key), data, len(data), now + ttl, now + ttl + stale, now, CACHE_VERSION),
+            )
+        self.writes += 1
+
+    def clear(self):
+        db = self._db()
+        with db:
+            db.execute("DELETE FROM responses")
+
+    def compact(self):
+        """
+        Remove expired and outdated entries and evict the least recently used
+        beyond ``max_bytes``. Returns the number of entries removed.
+        """
+        db = self._db()
+        with db:
+            removed = db.execute(
+                "DELETE FROM responses WHERE stale_until <= ? OR version != ?",
+                (self.clock(), CACHE_VERSION),
+            ).rowcount
+            (total,) = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+            if total > self.max_bytes:
+                evict = []
+                for key, size in db.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed_at"
+                ):
+                    if total <= self.max_bytes:
+                        break
+                    evict.append((key,))
+                    total -= size
+                db.executemany("DELETE FROM responses WHERE key = ?", evict)
+                self.evictions += len(evict)
+                removed += len(evict)
+        if removed and self.path != ":memory:":
+            db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return removed
+
+    def stats(self):
+        stats = {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
+        # Only report sizes once the database is open; stats alone should
+        # not create the file.
+        if self._conn is not None:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            stats.update(entries=entries, bytes=size)
+        return stats
+
+
+class TieredCache(ResponseCache):
+    """
+    An in-memory cache in front of a disk cache.
+
+    Lookups try memory first, then disk, copying disk hits into memory.
+    Only entries with a TTL of at least ``min_disk_ttl`` are written to
+    disk, so long-lived reference data persists across restarts while
+    short-lived observation data stays in memory.
+    """
+
+    def __init__(self, memory, disk, min_disk_ttl=HOUR):
+        self.memory = memory
+        self.disk = disk
+        self.min_disk_ttl = min_disk_ttl
+
+    def get(self, key):
+        found = self.lookup(key)
+        return found[0] if found is not None and found[1] > 0 else None
+
+    def lookup(self, key, ttl=None):
+        found = self.memory.lookup(key)
+        if found is not None or (ttl is not None and ttl < self.min_disk_ttl):
+            # Values with a shorter TTL are never written to disk.
+            return found
+        found = self.disk.lookup(key)
+        if found is not None:
+            value, remaining, _ = found
+            if remaining > 0:
+                # The JSON length stands in for the response size.
+                size = len(json.dumps(value, separators=(",", ":")))
+                self.memory.set(key, value, remaining, size=size)
+        return found
+
+    def set(self, key, value, ttl, size=0, stale=0):
+        self.memory.set(key, value, ttl, size=size, stale=stale)
+        if ttl >= self.min_disk_ttl:
+            self.disk.set(key, value, ttl, size=size, stale=stale)
+
+    def clear(self):
+        self.memory.clear()
+        self.disk.clear()
+
+    def compact(self):
+        return self.disk.compact()
+
+    def close(self):
+        self.disk.close()
+
+    def stats(self):
+        stats = self.memory.stats()
+        stats.update({f"disk_{key}": value for key, value in self.disk.stats().items()})
+        return stats
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checklist_details (
+    subId TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    data TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS checklist_details_by_age ON checklist_details (fetched_at);
+"""
+
+
+class ChecklistStore:
+    """
+    SQLite store of checklist details keyed by checklist ID.
+
+    A submitted checklist is addressed by its ID and does not change, so
+    details are kept until the store grows past ``max_entries``, when the
+    oldest are dropped. They outlive the response cache and restarts.
+    """
+
+    def __init__(self, path=":memory:", max_entries=100_000, clock=time.time):
+        self.path = path
+        self.max_entries = max_entries
+        self.clock = clock
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+
+    def _db(self):
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path)
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def get_many(self, sub_ids):
+        """
+        Return ``{sub_id: checklist}`` for the stored checklists among
+        ``sub_ids``.
+        """
+        sub_ids = list(sub_ids)
+        found = {}
+        # Stay below SQLite's default limit on bound parameters.
+        for i in range(0, len(sub_ids), 500):
+            chunk = sub_ids[i : i + 500]
+            rows = self._db().execute(
+                f"SELECT subId, data FROM checklist_details WHERE subId IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            found.update((sub_id, json.loads(data)) for sub_id, data in rows)
+        self.hits += len(found)
+        self.misses += len(sub_ids) - len(found)
+        return found
+
+    def get(self, sub_id):
+        return self.get_many([sub_id]).get(sub_id)
+
+    def put_many(self, checklists):
+        """
+        Store ``{sub_id: checklist}`` and drop the oldest checklists beyond
+        ``max_entries``.
+        """
+        db = self._db()
+        now = self.clock()
+        with db:
+            db.executemany(
+                "INSERT OR REPLACE INTO checklist_details (subId, fetched_at, data) VALUES (?, ?, ?)",
+                (
+                    (sub_id, now, json.dumps(checklist, separators=(",", ":")))
+                    for sub_id, checklist in checklists.items()
+                ),
+            )
+            (count,) = db.execute("SELECT COUNT(*) FROM checklist_details").fetchone()
+            if count > self.max_entries:
+                db.execute(
+                    "DELETE FROM checklist_details WHERE subId IN "
+                    "(SELECT subId FROM checklist_details ORDER BY fetched_at LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    async def fetch(self, client, sub_ids, max_concurrency=8):
+        """
+        Return checklist details for ``sub_ids``, reading stored ones and
+        fetching the rest concurrently.
+
+        Returns ``{"checklists": [...], "errors": {sub_id: message}}`` with
+        checklists in request order. A failing checklist is reported in
+        ``errors`` without affecting the others.
+        """
+        sub_ids = list(dict.fromkeys(sub_ids))
+        found = self.get_many(sub_ids)
+        missing = [sub_id for sub_id in sub_ids if sub_id not in found]
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch_one(sub_id):
+            async with semaphore:
+                return await client.get_checklist(sub_id)
+
+        results = await asyncio.gather(
+            *(fetch_one(sub_id) for sub_id in missing), return_exceptions=True
+        )
+        fetched = {}
+        errors = {}
+        for sub_id, result in zip(missing, results):
+            if isinstance(result, Exception):
+                errors[sub_id] = str(result) or type(result).__name__
+            elif result:
+                fetched[sub_id] = result
+        if fetched:
+            self.put_many(fetched)
+            found.update(fetched)
+        return {
+            "checklists": [found[sub_id] for sub_id in sub_ids if sub_id in found],
+            "errors": errors,
+        }
+
+    def stats(self):
+        (count,) = self._db().execute("SELECT COUNT(*) FROM checklist_details").fetchone()
+        return {"entries": count, "hits": self.hits, "misses": self.misses}
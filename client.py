@@ -1,58 +1,469 @@
+import asyncio
+import contextlib
+import sys
+
 import httpx
 
+from cache import DEFAULT_TTLS, make_key, ttl_for
+from jsonstream import iter_json_array
+from metrics import endpoint_label
+from models import loads
+from retry import parse_retry_after
+from tracing import CLIENT, Tracer
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def process_params(params):
+    """
+    Drop None values and convert booleans to the strings the API expects.
+    """
+    processed_params = {}
+    for key, value in (params or {}).items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            processed_params[key] = "true" if value else "false"
+        else:
+            processed_params[key] = value
+    return processed_params
+
+
+def observation_key(obs):
+    """
+    Identity of an observation record, used to de-duplicate merged results.
+    """
+    if obs.get("obsId"):
+        return obs["obsId"]
+    if obs.get("subId"):
+        return (obs["subId"], obs.get("speciesCode"))
+    return (obs.get("speciesCode"), obs.get("locId"), obs.get("obsDt"))
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share a key.
+
+    The first caller for a key starts the work; callers arriving while it is
+    in flight await the same task instead of starting their own.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._inflight)
+
+    def start(self, key, func):
+        """
+        Start ``func`` for a key unless it is already in flight. Returns the
+        task and whether this call started it.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            return task, False
+        task = asyncio.ensure_future(func())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._done(key, t))
+        return task, True
+
+    async def do(self, key, func):
+        task, started = self.start(key, func)
+        if not started:
+            self.coalesced += 1
+        # Shield so one cancelled caller does not cancel the shared request.
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller went away.
+            task.exception()
+
 
 class EBirdClient:
     """
     eBird Client
     A simple API client for eBird API v2.
     Ref: https://documenter.getpostman.com/view/664302/S1ENwy59
+
+    The client owns a single pooled ``httpx.AsyncClient`` that is created on
+    the first request and reused afterwards, so connections to the API are
+    kept alive between calls. Use it as an async context manager or call
+    ``aclose()`` when done.
+
+    An optional ``cache`` (see ``cache.ResponseCache``) stores successful
+    responses keyed by endpoint and normalized params, with a TTL chosen per
+    endpoint family from ``cache_ttls``.
+
+    Identical requests that are already in flight are coalesced into one
+    upstream call; ``coalesced_requests`` counts the calls that were shared.
+
+    With ``stale_ratio``, cached responses are kept that fraction of their
+    TTL past expiry and served stale while one background request refreshes
+    them (stale-while-revalidate). With ``refresh_ahead``, entries looked up
+    at least ``hot_hits`` times are refreshed in the background once less
+    than that fraction of their TTL is left, so hot keys rarely go stale.
+    ``background_refreshes`` counts the refreshes started.
+
+    An optional ``governor`` (see ``throttle.RequestGovernor``) bounds the
+    rate and concurrency of upstream requests; excess calls wait in line.
+
+    An optional ``retry_policy`` (see ``retry.RetryPolicy``) retries transient
+    failures of idempotent requests, and an optional ``circuit_breaker``
+    fails fast while the API keeps failing.
+
+    An optional ``metrics`` registry (see ``metrics.MetricsRegistry``)
+    records per-endpoint latency, status codes, bytes received, cache
+    lookups and requests in flight, and an optional ``tracer`` (see
+    ``tracing.Tracer``) emits spans for requests, HTTP attempts and JSON
+    decoding.
     """
 
-    def __init__(self, api_key):
+    def __init__(
+        self,
+        api_key,
+        timeout=10,
+        max_connections=20,
+        http2=None,
+        cache=None,
+        cache_ttls=None,
+        governor=None,
+        retry_policy=None,
+        circuit_breaker=None,
+        metrics=None,
+        tracer=None,
+        stale_ratio=0.0,
+        refresh_ahead=0.0,
+        hot_hits=3,
+    ):
         self.api_key = api_key
         self.base_url = "https://api.ebird.org/v2"
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.http2 = HTTP2_AVAILABLE if http2 is None else http2
+        self._client = None
+        self.cache = cache
+        self.cache_ttls = DEFAULT_TTLS if cache_ttls is None else cache_ttls
+        self._single_flight = SingleFlight()
+        self.stale_ratio = stale_ratio
+        self.refresh_ahead = refresh_ahead
+        self.hot_hits = hot_hits
+        self.background_refreshes = 0
+        self.governor = governor
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.tracer = tracer if tracer is not None else Tracer()
+        self.metrics = metrics
+        if metrics is not None:
+            self._latency = metrics.histogram(
+                "upstream_request_duration_seconds",
+                "Time per eBird API request attempt.",
+                ("endpoint",),
+            )
+            self._responses = metrics.counter(
+                "upstream_responses_total",
+                "eBird API responses by status code, or error for network failures.",
+                ("endpoint", "status"),
+            )
+            self._bytes = metrics.counter(
+                "upstream_response_bytes_total",
+                "Response bytes received from the eBird API.",
+                ("endpoint",),
+            )
+            self._in_flight = metrics.gauge(
+                "upstream_in_flight", "eBird API requests in progress."
+            )
+            self._cache_lookups = metrics.counter(
+                "cache_lookups_total",
+                "Response cache lookups by result (hit, stale or miss).",
+                ("endpoint", "result"),
+            )
+
+    def _get_client(self):
+        """
+        Return the shared HTTP client, creating it on first use.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=60,
+                ),
+            )
+        return self._client
+
+    async def aclose(self):
+        """
+        Close the pooled HTTP client. A new one is created on the next request.
+        """
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    @property
+    def coalesced_requests(self):
+        return self._single_flight.coalesced
 
     async def make_request(self, endpoint, params=None, expect_json=True):
         """
         Make an async request to the eBird API.
         It automatically handles boolean to string conversion for API parameters.
         """
-        if params is None:
-            params = {}
-
-        processed_params = {}
-        for key, value in params.items():
-            if value is None:
-                continue
-            if isinstance(value, bool):
-                processed_params[key] = "true" if value else "false"
-            else:
-                processed_params[key] = value
-
+        processed_params = process_params(params)
+
+        key = make_key(endpoint, processed_params, expect_json)
+        with self.tracer.span("ebird.request", endpoint=endpoint_label(endpoint)) as span:
+            ttl = 0
+            if self.cache is not None:
+                ttl = ttl_for(endpoint, self.cache_ttls)
+                if ttl > 0:
+                    found = self.cache.lookup(key, ttl)
+                    if found is None:
+                        result = "miss"
+                    else:
+                        value, remaining, hits = found
+                        result = "hit" if remaining > 0 else "stale"
+                    if self.metrics is not None:
+                        self._cache_lookups.inc(endpoint=endpoint_label(endpoint), result=result)
+                    span.set(cache=result)
+                    if found is not None:
+                        if remaining <= 0 or (
+                            hits >= self.hot_hits and remaining < self.refresh_ahead * ttl
+                        ):
+                            self._refresh(endpoint, processed_params, expect_json, key, ttl)
+                        return value
+
+            return await self._single_flight.do(
+                key, lambda: self._fetch(endpoint, processed_params, expect_json, key, ttl)
+            )
+
+    def _refresh(self, endpoint, params, expect_json, cache_key, ttl):
+        """
+        Refetch a cached response in the background, unless a request for it
+        is already in flight. Failures keep the stale copy until it ages out.
+        """
+        _, started = self._single_flight.start(
+            cache_key, lambda: self._fetch(endpoint, params, expect_json, cache_key, ttl)
+        )
+        if started:
+            self.background_refreshes += 1
+
+    async def _fetch(self, endpoint, params, expect_json, cache_key, ttl):
+        """
+        Perform the upstream GET and store the decoded result in the cache.
+        """
         url = f"{self.base_url}{endpoint}"
         headers = {
             "X-eBirdApiToken": self.api_key,
             "Accept": "application/json" if expect_json else "text/plain",
         }
 
-        async with httpx.AsyncClient(timeout=10) as client:
-            try:
-                response = await client.get(
-                    url, headers=headers, params=processed_params
+        try:
+            response = await self._send_with_retry("GET", url, headers, params)
+            response.raise_for_status()
+
+            if expect_json:
+                with self.tracer.span("json.decode", bytes=len(response.content)) as span:
+                    data = loads(response.content)
+                    span.set(records=len(data) if isinstance(data, list) else None)
+            else:
+                data = response.text
+
+            if ttl > 0:
+                self.cache.set(
+                    cache_key,
+                    data,
+                    ttl,
+                    size=len(response.content),
+                    stale=ttl * self.stale_ratio,
                 )
-                response.raise_for_status()
+            return data
+
+        except httpx.RequestError as e:
+            print(f"Request error while accessing {url}: {e}", file=sys.stderr)
+            raise
+        except httpx.HTTPStatusError as e:
+            print(f"HTTP error while accessing {url}: {e}", file=sys.stderr)
+            raise
 
-                if expect_json:
-                    return response.json()
-                else:
-                    return response.text
+    async def stream_records(self, endpoint, params=None):
+        """
+        Yield the records of a JSON array response one at a time.
 
+        The body is parsed incrementally as it arrives, so only the record
+        being decoded is held in memory. Streams bypass the response cache,
+        request coalescing and retries, but still go through the circuit
+        breaker and the governor.
+        """
+        url = f"{self.base_url}{endpoint}"
+        headers = {"X-eBirdApiToken": self.api_key, "Accept": "application/json"}
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            breaker.before_call()
+
+        async with contextlib.AsyncExitStack() as stack:
+            if self.governor is not None:
+                try:
+                    await stack.enter_async_context(self.governor.slot())
+                except BaseException:
+                    if breaker is not None:
+                        breaker.release()
+                    raise
+            label = endpoint_label(endpoint)
+            status = "error"
+            try:
+                if self.metrics is not None:
+                    stack.enter_context(self._in_flight.track())
+                    stack.enter_context(self._latency.time(endpoint=label))
+                response = await stack.enter_async_context(
+                    self._get_client().stream(
+                        "GET", url, headers=headers, params=process_params(params)
+                    )
+                )
+                status = response.status_code
+                response.raise_for_status()
             except httpx.RequestError as e:
-                print(f"Request error while accessing {url}: {e}")
+                if breaker is not None:
+                    breaker.record_failure()
+                print(f"Request error while accessing {url}: {e}", file=sys.stderr)
                 raise
             except httpx.HTTPStatusError as e:
-                print(f"HTTP error while accessing {url}: {e}")
+                if breaker is not None:
+                    if e.response.status_code >= 500 or e.response.status_code == 429:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                print(f"HTTP error while accessing {url}: {e}", file=sys.stderr)
                 raise
+            except BaseException:
+                if breaker is not None:
+                    breaker.release()
+                raise
+            finally:
+                if self.metrics is not None:
+                    self._responses.inc(endpoint=label, status=status)
+            if breaker is not None:
+                breaker.record_success()
+
+            async for record in iter_json_array(self._count_bytes(response.aiter_bytes(), label)):
+                yield record
+
+    async def _count_bytes(self, chunks, endpoint):
+        async for chunk in chunks:
+            if self.metrics is not None:
+                self._bytes.inc(len(chunk), endpoint=endpoint)
+            yield chunk
+
+    async def _send_with_retry(self, method, url, headers, params):
+        """
+        Send a request, retrying idempotent ones according to the retry policy.
+        """
+        policy = self.retry_policy
+        if policy is None or method not in policy.methods:
+            return await self._send(method, url, headers, params)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy.deadline
+        for attempt in range(policy.max_attempts):
+            last_attempt = attempt == policy.max_attempts - 1
+            timeout = max(0.001, min(self.timeout, deadline - loop.time()))
+            error = response = None
+            try:
+                response = await self._send(method, url, headers, params, timeout)
+            except httpx.RequestError as e:
+                if last_attempt:
+                    raise
+                error = e
+                delay = policy.backoff(attempt)
+            else:
+                if last_attempt or response.status_code not in policy.retry_statuses:
+                    return response
+                delay = policy.backoff(
+                    attempt, parse_retry_after(response.headers.get("Retry-After"))
+                )
+
+            if loop.time() + delay >= deadline:
+                if error is not None:
+                    raise error
+                return response
+            policy.retries += 1
+            await asyncio.sleep(delay)
+
+    async def _send(self, method, url, headers, params, timeout=None):
+        """
+        Send one request through the circuit breaker and the governor.
+        """
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            breaker.before_call()
+
+        client = self._get_client()
+        kwargs = {"headers": headers, "params": params}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        try:
+            if self.governor is not None:
+                async with self.governor.slot():
+                    response = await self._request(client, method, url, kwargs)
+            else:
+                response = await self._request(client, method, url, kwargs)
+        except httpx.RequestError:
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled or failed without an upstream outcome.
+            if breaker is not None:
+                breaker.release()
+            raise
+
+        if breaker is not None:
+            if response.status_code >= 500 or response.status_code == 429:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        return response
+
+    async def _request(self, client, method, url, kwargs):
+        """
+        Send the request, recording it in the metrics registry and as a
+        span if enabled.
+        """
+        if self.metrics is None and not self.tracer.enabled:
+            return await client.request(method, url, **kwargs)
+        endpoint = endpoint_label(url[len(self.base_url) :])
+        with self.tracer.span(f"HTTP {method}", CLIENT, endpoint=endpoint) as span:
+            if self.metrics is None:
+                response = await client.request(method, url, **kwargs)
+                span.set(status=response.status_code, bytes=len(response.content))
+                return response
+            status = "error"
+            try:
+                with self._in_flight.track(), self._latency.time(endpoint=endpoint):
+                    response = await client.request(method, url, **kwargs)
+                status = response.status_code
+                self._bytes.inc(len(response.content), endpoint=endpoint)
+                span.set(status=status, bytes=len(response.content))
+                return response
+            finally:
+                self._responses.inc(endpoint=endpoint, status=status)
 
     # --- data/obs ---
     async def get_recent_observations(self, region_code, options=None):
@@ -77,6 +488,42 @@ class EBirdClient:
 
         return await self.make_request(endpoint, params)
 
+    async def get_recent_observations_batch(
+        self, region_codes, options=None, max_concurrency=8
+    ):
+        """
+        1b. Recent observations in several regions, fetched concurrently.
+
+        Returns ``{"observations": [...], "errors": {region_code: message}}``.
+        Observations are merged in region order and de-duplicated, so
+        overlapping regions do not repeat records. A failing region is
+        reported in ``errors`` without affecting the others.
+        """
+        region_codes = list(dict.fromkeys(region_codes))
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(region_code):
+            async with semaphore:
+                return await self.get_recent_observations(region_code, options)
+
+        results = await asyncio.gather(
+            *(fetch(code) for code in region_codes), return_exceptions=True
+        )
+
+        observations = []
+        errors = {}
+        seen = set()
+        for region_code, result in zip(region_codes, results):
+            if isinstance(result, Exception):
+                errors[region_code] = str(result) or type(result).__name__
+                continue
+            for obs in result or []:
+                key = observation_key(obs)
+                if key not in seen:
+                    seen.add(key)
+                    observations.append(obs)
+        return {"observations": observations, "errors": errors}
+
     async def get_notable_observations(self, region_code, options=None):
         """
         2. Recent notable observations in a region.
@@ -234,12 +681,20 @@ class EBirdClient:
         endpoint = f"/product/lists/{region_code}"
         return await self.make_request(endpoint)
 
-    async def get_checklist_feed_on_date(self, region_code, year, month, day):
+    async def get_checklist_feed_on_date(self, region_code, year, month, day, options=None):
         """
         3. Checklist feed on a date.
         """
+        if options is None:
+            options = {}
+
+        params = {
+            "sortKey": options.get("sortKey"),
+            "maxResults": options.get("maxResults"),
+        }
+
         endpoint = f"/product/lists/{region_code}/{year}/{month}/{day}"
-        return await self.make_request(endpoint)
+        return await self.make_request(endpoint, params)
 
     async def get_regional_statistics_on_date(self, region_code, year, month, day):
         """
@@ -308,7 +763,7 @@ class EBirdClient:
         try:
             return await self.make_request(endpoint, params)
         except Exception:
-            print("Falling back to text format for hotspots.")
+            print("Falling back to text format for hotspots.", file=sys.stderr)
             params.pop("fmt", None)
             text_response = await self.make_request(endpoint, params, expect_json=False)
             if text_response:
@@ -353,6 +808,23 @@ class EBirdClient:
 
         return await self.make_request(endpoint, params)
 
+    def stream_taxonomy(self, options=None):
+        """
+        1b. eBird Taxonomy, yielded one taxon at a time.
+        """
+        if options is None:
+            options = {}
+
+        params = {
+            "locale": options.get("locale", "en"),
+            "cat": options.get("cat", "species"),
+            "fmt": "json",
+        }
+
+        endpoint = "/ref/taxonomy/ebird"
+
+        return self.stream_records(endpoint, params)
+
     async def get_taxonomy_forms(self, species_code):
         """
         2. Taxonomic Forms.
@@ -0,0 +1,133 @@
+import asyncio
+from array import array
+from datetime import timedelta
+
+from archive import MAX_HISTORIC_RESULTS, days_between
+
+
+async def historic_days(client, archive, region_code, start, end):
+    """
+    Return ``([(day, records)], {day: error})`` of historic observations
+    from ``start`` to ``end``.
+
+    Archived days are read from disk. The rest are fetched concurrently,
+    paced by the client's governor, and stored in the archive. A day that
+    fails is reported in the errors without failing the others.
+    """
+    days = list(days_between(start, end))
+
+    async def load(day):
+        records = archive.observations(region_code, day) if archive is not None else None
+        if records is None:
+            records = await client.get_historic_observations(
+                region_code, day.year, day.month, day.day, {"maxResults": MAX_HISTORIC_RESULTS}
+            )
+            if archive is not None:
+                archive.store_observations(region_code, day, records)
+        return records or []
+
+    results = await asyncio.gather(*(load(day) for day in days), return_exceptions=True)
+    loaded, errors = [], {}
+    for day, result in zip(days, results):
+        if isinstance(result, BaseException):
+            errors[day] = result
+        else:
+            loaded.append((day, result))
+    return loaded, errors
+
+
+class SpeciesFrequency:
+    """
+    Per-day presence and counts of species over a run of days.
+
+    Presence and counts live in flat ``array`` buffers indexed by
+    ``species * num_days + day``, so each species' time series is a
+    contiguous slice and totals are computed by C-level sums over it.
+    Days marked ``missing`` are left out of the frequency.
+    """
+
+    def __init__(self, start, num_days, species_codes=None):
+        self.start = start
+        self.num_days = num_days
+        self.fixed = species_codes is not None
+        self.index = {code: i for i, code in enumerate(species_codes or [])}
+        self.names = {}
+        self.present = array("B", bytes(len(self.index) * num_days))
+        self.counts = array("l", [0]) * (len(self.index) * num_days)
+        self.missing = set()
+
+    def _add_species(self, species_code, com_name):
+        i = self.index[species_code] = len(self.index)
+        self.names[species_code] = com_name
+        self.present.frombytes(bytes(self.num_days))
+        self.counts.extend(array("l", [0]) * self.num_days)
+        return i
+
+    def mark_missing(self, day_offset):
+        """
+        Record that the observations ``day_offset`` days after ``start`` are
+        unavailable.
+        """
+        self.missing.add(day_offset)
+
+    def add(self, day_offset, records):
+        """
+        Add the observations reported ``day_offset`` days after ``start``.
+        """
+        index, names, present, counts = self.index, self.names, self.present, self.counts
+        n = self.num_days
+        for record in records:
+            species_code = record.get("speciesCode")
+            i = index.get(species_code)
+            if i is None:
+                if self.fixed:
+                    continue
+                i = self._add_species(species_code, record.get("comName"))
+            elif species_code not in names:
+                names[species_code] = record.get("comName")
+            pos = i * n + day_offset
+            present[pos] = 1
+            counts[pos] += record.get("howMany") or 0
+
+    def series(self, species_code):
+        """
+        Return a summary and the daily series for one species.
+        """
+        i = self.index[species_code]
+        window = slice(i * self.num_days, (i + 1) * self.num_days)
+        present = self.present[window]
+        counts = self.counts[window]
+        days_reported = sum(present)
+        days_covered = self.num_days - len(self.missing)
+        max_count = max(counts, default=0)
+        return {
+            "speciesCode": species_code,
+            "comName": self.names.get(species_code),
+            "daysReported": days_reported,
+            "daysCovered": days_covered,
+            "frequency": round(days_reported / days_covered, 3) if days_covered else 0.0,
+            "totalCount": sum(counts),
+            "maxCount": max_count,
+            "maxCountDate": (
+                (self.start + timedelta(days=counts.index(max_count))).isoformat()
+                if max_count
+                else None
+            ),
+            "present": present.tobytes().translate(_PRESENCE).decode(),
+            "counts": counts.tolist(),
+        }
+
+    def ranked(self, limit=None):
+        """
+        Return species codes, most often reported first.
+        """
+        n = self.num_days
+        days_reported = {
+            code: sum(self.present[i * n : (i + 1) * n]) for code, i in self.index.items()
+        }
+        ranked = sorted(days_reported, key=days_reported.get, reverse=True)
+        return ranked[:limit] if limit else ranked
+
+
+# Renders presence bytes (0 or 1) as "0"/"1" characters.
+_PRESENCE = bytes.maketrans(b"\x00\x01", b"01")
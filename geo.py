@@ -0,0 +1,101 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """
+    Return the great-circle distance between two points in kilometers.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lng, dist_km):
+    """
+    Return ``(min_lat, min_lng, max_lat, max_lng)`` enclosing a circle.
+
+    Near the poles, or when the circle crosses the antimeridian, the
+    longitude range is widened to the whole globe.
+    """
+    dlat = dist_km / KM_PER_DEGREE
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0
+    dlng = dlat / math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if lng - dlng < -180 or lng + dlng > 180:
+        return min_lat, -180.0, max_lat, 180.0
+    return min_lat, lng - dlng, max_lat, lng + dlng
+
+
+
+def geohash_encode(lat, lng, precision=5):
+    """
+    Return the geohash of a point.
+    """
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits = value = 0
+    even = True
+    while len(chars) < precision:
+        rng, coord = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = value * 2 + 1
+            rng[0] = mid
+        else:
+            value *= 2
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def geohash_bounds(geohash):
+    """
+    Return ``(min_lat, min_lng, max_lat, max_lng)`` of a geohash cell.
+    """
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if value >> shift & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+
+def covering_tile(lat, lng, dist_km, precision=5, max_dist_km=50, step_km=5):
+    """
+    Return ``(tile_lat, tile_lng, radius_km)``: the center of the geohash
+    cell containing a point and a radius around it that encloses the
+    ``dist_km`` circle from anywhere in the cell.
+
+    The radius is rounded up to a multiple of ``step_km`` so nearby queries
+    with similar distances share a tile. Returns None when the radius would
+    exceed ``max_dist_km``.
+    """
+    min_lat, min_lng, max_lat, max_lng = geohash_bounds(geohash_encode(lat, lng, precision))
+    tile_lat, tile_lng = (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+    reach = dist_km + max(
+        haversine(tile_lat, tile_lng, corner_lat, corner_lng)
+        for corner_lat in (min_lat, max_lat)
+        for corner_lng in (min_lng, max_lng)
+    )
+    if reach > max_dist_km:
+        return None
+    return tile_lat, tile_lng, min(max_dist_km, math.ceil(reach / step_km) * step_km)
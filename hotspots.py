@@ -0,0 +1,169 @@
+import math
+import time
+from datetime import date, timedelta
+
+from cache import HOUR
+from geo import bounding_box, haversine
+
+
+class RegionHotspots:
+    __slots__ = ("fetched_at", "back", "loc_ids", "bounds", "source")
+
+    def __init__(self, fetched_at, back, loc_ids, bounds, source):
+        self.fetched_at = fetched_at
+        self.back = back
+        self.loc_ids = loc_ids
+        self.bounds = bounds
+        self.source = source
+
+
+class HotspotIndex:
+    """
+    Grid index over the hotspots of region hotspot lists.
+
+    Hotspots are bucketed into ``cell_size`` degree cells, so a radius query
+    only measures haversine distances to hotspots in the cells overlapping
+    the circle's bounding box.
+
+    A region list is complete only inside the region, so a circle counts as
+    covered when it lies within the extent of a fresh region list that
+    includes every hotspot the query's ``back`` window asks for, and the
+    region's neighbours are known and indexed too (see ``covered``).
+    """
+
+    def __init__(self, cell_size=0.1, ttl=6 * HOUR, clock=time.time):
+        self.cell_size = cell_size
+        self.ttl = ttl
+        self.clock = clock
+        self.regions = {}
+        self.hotspots = {}
+        self._owners = {}
+        self._cells = {}
+
+    def __len__(self):
+        return len(self.hotspots)
+
+    def _cell(self, lat, lng):
+        return math.floor(lat / self.cell_size), math.floor(lng / self.cell_size)
+
+    def add_region(self, region_code, hotspots, back=None):
+        """
+        Index a region's hotspot list, replacing any earlier list.
+
+        ``back`` is the window the list was fetched with; None means every
+        hotspot regardless of recent activity. Re-adding the same list
+        object (e.g. a cached response) keeps its original fetch time.
+        """
+        entry = self.regions.get(region_code)
+        if entry is not None and entry.source is hotspots and entry.back == back:
+            return
+        self.remove_region(region_code)
+        loc_ids = set()
+        lats, lngs = [], []
+        for hotspot in hotspots:
+            loc_id, lat, lng = hotspot.get("locId"), hotspot.get("lat"), hotspot.get("lng")
+            if loc_id is None or lat is None or lng is None:
+                continue
+            loc_ids.add(loc_id)
+            lats.append(lat)
+            lngs.append(lng)
+            self.hotspots[loc_id] = hotspot
+            owners = self._owners.setdefault(loc_id, set())
+            if not owners:
+                self._cells.setdefault(self._cell(lat, lng), set()).add(loc_id)
+            owners.add(region_code)
+        bounds = (min(lats), min(lngs), max(lats), max(lngs)) if lats else None
+        self.regions[region_code] = RegionHotspots(self.clock(), back, loc_ids, bounds, hotspots)
+
+    def remove_region(self, region_code):
+        entry = self.regions.pop(region_code, None)
+        if entry is None:
+            return
+        for loc_id in entry.loc_ids:
+            owners = self._owners[loc_id]
+            owners.discard(region_code)
+            if not owners:
+                del self._owners[loc_id]
+                hotspot = self.hotspots.pop(loc_id)
+                cell = self._cells[self._cell(hotspot["lat"], hotspot["lng"])]
+                cell.discard(loc_id)
+
+    def fresh(self, region_code, back=None):
+        """
+        Return True if the region's list is current and includes every
+        hotspot active within ``back`` days.
+        """
+        entry = self.regions.get(region_code)
+        return (
+            entry is not None
+            and self.clock() - entry.fetched_at < self.ttl
+            and (entry.back is None or (back is not None and back <= entry.back))
+        )
+
+    def covered(self, region_code, back=None):
+        """
+        Return True if the region, or a region containing it, is fresh.
+        """
+        while True:
+            if self.fresh(region_code, back):
+                return True
+            if "-" not in region_code:
+                return False
+            region_code = region_code.rsplit("-", 1)[0]
+
+    def covering_region(self, lat, lng, dist, back=None):
+        """
+        Return a fresh region whose hotspot extent contains the circle, or
+        None. Smaller regions are preferred.
+        """
+        min_lat, min_lng, max_lat, max_lng = bounding_box(lat, lng, dist)
+        best = None
+        for region_code, entry in self.regions.items():
+            bounds = entry.bounds
+            if (
+                bounds is not None
+                and bounds[0] <= min_lat
+                and bounds[1] <= min_lng
+                and max_lat <= bounds[2]
+                and max_lng <= bounds[3]
+                and self.fresh(region_code, back)
+                and (best is None or len(entry.loc_ids) < len(self.regions[best].loc_ids))
+            ):
+                best = region_code
+        return best
+
+    def nearby(self, lat, lng, dist, back=None):
+        """
+        Return ``(distance, hotspot)`` pairs within ``dist`` km, nearest
+        first. With ``back``, only hotspots visited in the last ``back``
+        days are returned.
+        """
+        min_lat, min_lng, max_lat, max_lng = bounding_box(lat, lng, dist)
+        lat0, lng0 = self._cell(min_lat, min_lng)
+        lat1, lng1 = self._cell(max_lat, max_lng)
+        since = (date.fromtimestamp(self.clock()) - timedelta(days=back)).isoformat() if back else None
+        found = []
+        for i in range(lat0, lat1 + 1):
+            for j in range(lng0, lng1 + 1):
+                for loc_id in self._cells.get((i, j), ()):
+                    hotspot = self.hotspots[loc_id]
+                    if since is not None and (hotspot.get("latestObsDt") or "") < since:
+                        continue
+                    d = haversine(lat, lng, hotspot["lat"], hotspot["lng"])
+                    if d <= dist:
+                        found.append((d, hotspot))
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def nearest(self, lat, lng, k, back=None, max_dist=50):
+        """
+        Return the ``k`` nearest hotspots within ``max_dist`` km as
+        ``(distance, hotspot)`` pairs, widening the search radius until
+        enough are found.
+        """
+        radius = min(max_dist, self.cell_size * 111.0)
+        while True:
+            found = self.nearby(lat, lng, radius, back)
+            if len(found) >= k or radius >= max_dist:
+                return found[:k]
+            radius = min(max_dist, radius * 2)
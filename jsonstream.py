@@ -0,0 +1,77 @@
+import codecs
+import json
+import re
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+class JSONArrayScanner:
+    """
+    Incremental parser for a top-level JSON array.
+
+    ``feed`` accepts chunks of bytes and returns the array elements completed
+    so far. Each element is decoded by the C decoder as soon as its bytes
+    have arrived, and only the unparsed tail of the input is buffered, so
+    memory stays flat however long the array is.
+    """
+
+    def __init__(self):
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._text = ""
+        self._started = False
+        self._first = True
+        self.done = False
+
+    def feed(self, data):
+        text = self._text + self._utf8.decode(data)
+        pos = _WHITESPACE.match(text, 0).end()
+        records = []
+        while not self.done and pos < len(text):
+            if not self._started:
+                if text[pos] != "[":
+                    raise ValueError("Expected a JSON array")
+                self._started = True
+                pos = _WHITESPACE.match(text, pos + 1).end()
+                continue
+            if text[pos] == "]":
+                self.done = True
+                pos += 1
+                break
+            start = pos
+            if not self._first:
+                if text[pos] != ",":
+                    raise ValueError(f"Expected ',' or ']' in JSON array, got {text[pos]!r}")
+                pos = _WHITESPACE.match(text, pos + 1).end()
+            try:
+                record, end = _decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                # Most likely the element is not complete yet.
+                pos = start
+                break
+            after = _WHITESPACE.match(text, end).end()
+            if after >= len(text) or text[after] not in ",]":
+                # A number cut off by the chunk boundary (e.g. "1." of
+                # "1.5") decodes early, so wait until the delimiter arrives.
+                pos = start
+                break
+            records.append(record)
+            self._first = False
+            pos = after
+        self._text = text[pos:]
+        return records
+
+    def close(self):
+        if not self.done:
+            raise ValueError("Incomplete JSON array")
+
+
+async def iter_json_array(chunks):
+    """
+    Yield the elements of a JSON array from an async iterable of bytes.
+    """
+    scanner = JSONArrayScanner()
+    async for chunk in chunks:
+        for record in scanner.feed(chunk):
+            yield record
+    scanner.close()
@@ -0,0 +1,274 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters, gauges and histograms are kept in plain dicts keyed by label
+values; nothing is exported until ``MetricsRegistry.render`` is called. A
+registry can also collect the ``stats()`` dicts that the cache, governor,
+circuit breaker and other components already keep.
+"""
+
+import asyncio
+import contextlib
+import math
+import re
+import time
+
+# Upper bounds in seconds, from a cache hit to a slow upstream call.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Literal path segments of eBird API endpoints; anything else (region codes,
+# species codes, IDs, dates) is an argument and collapses to "{}".
+ENDPOINT_WORDS = frozenset(
+    {
+        "data", "obs", "geo", "recent", "notable", "historic", "nearest",
+        "product", "top100", "lists", "stats", "spplist", "checklist", "view",
+        "ref", "adjacent", "hotspot", "info", "region", "list", "taxonomy",
+        "ebird", "taxa-locales", "versions", "sppgroup",
+        "country", "subnational1", "subnational2",
+    }
+)
+
+
+def endpoint_label(endpoint):
+    """
+    Return a low-cardinality label for an endpoint path, e.g.
+    ``/data/obs/US-NY/recent`` -> ``/data/obs/{}/recent``.
+    """
+    return "/".join(
+        part if not part or part in ENDPOINT_WORDS else "{}" for part in endpoint.split("/")
+    )
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self.values = {}
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def samples(self):
+        for key, value in self.values.items():
+            yield self.name, _labels(self.labelnames, key), value
+
+    def snapshot(self):
+        return [
+            {**dict(zip(self.labelnames, key)), "value": value}
+            for key, value in self.values.items()
+        ]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        self.values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextlib.contextmanager
+    def track(self, **labels):
+        """Count the enclosed block as in progress."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class HistogramValue:
+    __slots__ = ("buckets", "count", "sum")
+
+    def __init__(self, size):
+        self.buckets = [0] * size
+        self.count = 0
+        self.sum = 0.0
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.bounds = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = HistogramValue(len(self.bounds))
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                entry.buckets[i] += 1
+                break
+        entry.count += 1
+        entry.sum += value
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """Observe the duration of the enclosed block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        for key, entry in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.bounds, entry.buckets):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket",
+                    _labels(self.labelnames, key, [("le", _number(bound))]),
+                    cumulative,
+                )
+            yield f"{self.name}_count", _labels(self.labelnames, key), entry.count
+            yield f"{self.name}_sum", _labels(self.labelnames, key), entry.sum
+
+    def snapshot(self):
+        return [
+            {
+                **dict(zip(self.labelnames, key)),
+                "count": entry.count,
+                "sum": round(entry.sum, 6),
+                "avg": round(entry.sum / entry.count, 6) if entry.count else 0.0,
+            }
+            for key, entry in self.values.items()
+        ]
+
+
+class MetricsRegistry:
+    """
+    A set of named metrics plus collectors of component ``stats()``.
+    """
+
+    def __init__(self, namespace="ebird"):
+        self.namespace = namespace
+        self.metrics = {}
+        self.collectors = {}
+
+    def _add(self, metric):
+        return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(f"{self.namespace}_{name}", help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self._add(Gauge(f"{self.namespace}_{name}", help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(f"{self.namespace}_{name}", help, labels, buckets))
+
+    def collect(self, name, stats):
+        """
+        Export the dict returned by ``stats()`` as gauges named
+        ``<namespace>_<name>_<key>``. String values become a ``value``
+        label on a gauge set to 1.
+        """
+        self.collectors[name] = stats
+
+    def _collected(self):
+        for name, stats in self.collectors.items():
+            try:
+                values = stats() or {}
+            except Exception:
+                continue
+            for key, value in values.items():
+                metric = re.sub(r"[^a-zA-Z0-9_]", "_", f"{self.namespace}_{name}_{key}")
+                if isinstance(value, bool):
+                    value = int(value)
+                if isinstance(value, (int, float)):
+                    yield metric, "", value
+                elif value is not None:
+                    yield metric, _labels(("value",), (value,)), 1
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_number(value)}")
+        for name, labels, value in self._collected():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name}{labels} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """Return the metrics as a JSON-ready dict."""
+        data = {name: metric.snapshot() for name, metric in self.metrics.items()}
+        for name, stats in self.collectors.items():
+            try:
+                data[f"{self.namespace}_{name}"] = stats() or {}
+            except Exception as e:
+                data[f"{self.namespace}_{name}"] = {"error": str(e)}
+        return data
+
+
+async def start_server(registry, host="127.0.0.1", port=9464):
+    """
+    Start serving ``registry.render()`` at ``/metrics`` over plain HTTP and
+    return the ``asyncio.Server``; close it to stop. Meant for a local
+    scraper, not for the public internet.
+    """
+
+    async def handle(reader, writer):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request.split()
+            if len(parts) >= 2 and parts[0] == b"GET" and parts[1].split(b"?")[0] == b"/metrics":
+                status, body = "200 OK", registry.render().encode()
+            else:
+                status, body = "404 Not Found", b"Not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
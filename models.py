@@ -0,0 +1,181 @@
+from dataclasses import dataclass, field
+from operator import attrgetter
+
+# Use the fastest available JSON decoder; all accept bytes.
+try:
+    import orjson
+
+    loads = orjson.loads
+except ImportError:
+    try:
+        import msgspec
+
+        loads = msgspec.json.decode
+    except ImportError:
+        import json
+
+        loads = json.loads
+
+
+# Compact records for structured hotspot and checklist output. ``to_dict``
+# turns a record back into eBird field names, leaving out unset fields.
+# Cached responses stay dicts: the text formatters read those directly, and
+# observation lists are compacted from them without building records, since
+# parsing them on every call costs more than attribute access saves.
+
+
+def _fields(*pairs):
+    """Return ``(keys, getter)`` mapping eBird field names to attributes."""
+    return tuple(key for key, _ in pairs), attrgetter(*(attr for _, attr in pairs))
+
+
+def _compact(record, fields):
+    keys, getter = fields
+    return {key: value for key, value in zip(keys, getter(record)) if value is not None}
+
+
+@dataclass(slots=True)
+class Observation:
+    species_code: str | None = None
+    com_name: str | None = None
+    sci_name: str | None = None
+    loc_id: str | None = None
+    loc_name: str | None = None
+    obs_dt: str | None = None
+    obs_time: str | None = None
+    how_many: int | None = None
+    lat: float | None = None
+    lng: float | None = None
+    sub_id: str | None = None
+    obs_id: str | None = None
+    user_display_name: str | None = None
+
+    @classmethod
+    def from_dict(cls, d):
+        get = d.get
+        return cls(
+            get("speciesCode"),
+            get("comName"),
+            get("sciName"),
+            get("locId"),
+            get("locName"),
+            get("obsDt"),
+            get("obsTime"),
+            get("howMany"),
+            get("lat"),
+            get("lng"),
+            get("subId"),
+            get("obsId"),
+            get("userDisplayName"),
+        )
+
+    def to_dict(self):
+        return _compact(self, _OBSERVATION_FIELDS)
+
+
+_OBSERVATION_FIELDS = _fields(
+    ("speciesCode", "species_code"),
+    ("comName", "com_name"),
+    ("sciName", "sci_name"),
+    ("locId", "loc_id"),
+    ("locName", "loc_name"),
+    ("obsDt", "obs_dt"),
+    ("obsTime", "obs_time"),
+    ("howMany", "how_many"),
+    ("lat", "lat"),
+    ("lng", "lng"),
+    ("subId", "sub_id"),
+    ("obsId", "obs_id"),
+    ("userDisplayName", "user_display_name"),
+)
+
+
+@dataclass(slots=True)
+class Hotspot:
+    loc_id: str | None = None
+    loc_name: str | None = None
+    lat: float | None = None
+    lng: float | None = None
+    num_species: int | None = None
+    latest_obs_dt: str | None = None
+
+    @classmethod
+    def from_dict(cls, d):
+        get = d.get
+        return cls(
+            get("locId"),
+            get("locName"),
+            get("lat"),
+            get("lng"),
+            get("numSpecies", get("numSpeciesAllTime")),
+            get("latestObsDt"),
+        )
+
+    def to_dict(self):
+        return _compact(self, _HOTSPOT_FIELDS)
+
+
+_HOTSPOT_FIELDS = _fields(
+    ("locId", "loc_id"),
+    ("locName", "loc_name"),
+    ("lat", "lat"),
+    ("lng", "lng"),
+    ("numSpecies", "num_species"),
+    ("latestObsDt", "latest_obs_dt"),
+)
+
+
+@dataclass(slots=True)
+class Checklist:
+    sub_id: str | None = None
+    loc_name: str | None = None
+    obs_dt: str | None = None
+    user_display_name: str | None = None
+    obs: list[Observation] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, d):
+        get = d.get
+        return cls(
+            get("subId"),
+            (get("loc") or {}).get("locName"),
+            get("obsDt"),
+            get("userDisplayName"),
+            [Observation.from_dict(o) for o in get("obs") or ()],
+        )
+
+    def to_dict(self):
+        data = _compact(self, _CHECKLIST_FIELDS)
+        data["obs"] = [o.to_dict() for o in self.obs]
+        return data
+
+
+_CHECKLIST_FIELDS = _fields(
+    ("subId", "sub_id"),
+    ("locName", "loc_name"),
+    ("obsDt", "obs_dt"),
+    ("userDisplayName", "user_display_name"),
+)
+
+
+def compact_observations(records):
+    """
+    Return observation dicts as compact dicts for structured output, mapping
+    them directly instead of building ``Observation`` records first.
+    """
+    keys = _OBSERVATION_FIELDS[0]
+    return [{key: value for key in keys if (value := r.get(key)) is not None} for r in records]
+
+
+def parse_hotspots(records):
+    from_dict = Hotspot.from_dict
+    return [r if isinstance(r, Hotspot) else from_dict(r) for r in records]
+
+
+def parse_checklist(record):
+    return record if isinstance(record, Checklist) else Checklist.from_dict(record)
+
+
+def to_dicts(records):
+    """Return parsed records as compact dicts for structured output."""
+    return [record.to_dict() for record in records]
@@ -0,0 +1,93 @@
+import base64
+import json
+import secrets
+
+from cache import TTLCache
+
+
+class CursorError(ValueError):
+    """
+    Raised for malformed or expired pagination cursors.
+    """
+
+
+class ResultPages:
+    """
+    Server-side store of full tool results for cursor-based pagination.
+
+    The first call for a result stores the records and hands out an opaque
+    cursor; follow-up pages are sliced from memory instead of re-fetching
+    upstream. Results expire after ``ttl`` seconds or when evicted.
+    """
+
+    def __init__(self, max_results=64, ttl=15 * 60, cache=None):
+        self.ttl = ttl
+        self._results = cache if cache is not None else TTLCache(max_entries=max_results)
+
+    def put(self, records):
+        result_id = secrets.token_urlsafe(9)
+        self._results.set(result_id, records, self.ttl, size=len(records))
+        return result_id
+
+    def resume(self, cursor):
+        """
+        Return ``(records, result_id, offset)`` for a cursor.
+        """
+        try:
+            state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            result_id, offset = state["id"], int(state["offset"])
+        except (ValueError, KeyError, TypeError) as e:
+            raise CursorError(f"Invalid cursor: {cursor}") from e
+        if offset < 0:
+            raise CursorError(f"Invalid cursor: {cursor}")
+        records = self._results.get(result_id)
+        if records is None:
+            raise CursorError("Cursor has expired; repeat the original request.")
+        return records, result_id, offset
+
+    @staticmethod
+    def cursor(result_id, offset):
+        state = json.dumps({"id": result_id, "offset": offset}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(state.encode()).decode()
+
+    @staticmethod
+    def check(page_size, offset=0):
+        """
+        Raise ValueError for a page size below 1 or a negative offset.
+        """
+        if page_size < 1:
+            raise ValueError("pageSize must be at least 1")
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+
+    def window(self, records, page_size, offset=0, result_id=None):
+        """
+        Return ``(start, end, next_cursor)`` for one page of ``records``;
+        ``next_cursor`` is None on the last page.
+        """
+        self.check(page_size, offset)
+        start = offset
+        end = min(len(records), start + page_size)
+        if end >= len(records):
+            return start, end, None
+        if result_id is None:
+            result_id = self.put(records)
+        return start, end, self.cursor(result_id, end)
+
+    def page(self, records, formatter, page_size, offset=0, result_id=None):
+        """
+        Format one page of ``records`` and append a footer with the cursor
+        for the next page when there is one.
+        """
+        total = len(records)
+        start, end, next_cursor = self.window(records, page_size, offset, result_id)
+        text = formatter(records[start:end])
+        if start == 0 and end >= total:
+            return text
+        if end > start:
+            footer = f"Showing {start + 1}-{end} of {total}."
+        else:
+            footer = f"No results at offset {start} of {total}."
+        if next_cursor:
+            footer += f" Next page cursor: {next_cursor}"
+        return f"{text}\n\n{footer}"
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import os
+import time
+
+DAY = 24 * 60 * 60
+
+REGION_TYPES = ("country", "subnational1", "subnational2")
+
+
+def region_type(region_code):
+    """
+    Return the eBird region type implied by a region code (e.g. US-NY).
+    """
+    depth = region_code.count("-")
+    return REGION_TYPES[depth] if depth < len(REGION_TYPES) else None
+
+
+def child_type(region_code):
+    """
+    Return the type of the regions directly below a region, if any.
+    """
+    depth = region_code.count("-") + 1
+    return REGION_TYPES[depth] if depth < len(REGION_TYPES) else None
+
+
+class RegionGraph:
+    """
+    In-memory region hierarchy and adjacency graph, persisted as JSON.
+
+    Children and neighbours are fetched once per region and reused for
+    ``ttl`` seconds, so tree and multi-hop queries answer locally after the
+    first expansion.
+    """
+
+    def __init__(self, path=None, ttl=30 * DAY, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self.names = {}
+        self.children = {}
+        self.adjacent = {}
+        self._loaded = False
+
+    def load(self):
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            # A damaged file is rebuilt from the API.
+            return
+        if not isinstance(data, dict):
+            return
+        self.names = data.get("names", {})
+        self.children = data.get("children", {})
+        self.adjacent = data.get("adjacent", {})
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Worker processes sharing the file each write their own copy.
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"names": self.names, "children": self.children, "adjacent": self.adjacent},
+                f,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_path, self.path)
+
+    def _fresh(self, edges, region_code):
+        entry = edges.get(region_code)
+        return entry is not None and self.clock() - entry["fetched_at"] < self.ttl
+
+    def _store(self, edges, region_code, regions):
+        for region in regions or []:
+            self.names[region["code"]] = region.get("name", region["code"])
+        edges[region_code] = {
+            "fetched_at": self.clock(),
+            "codes": [region["code"] for region in regions or []],
+        }
+
+    async def expand(self, client, region_code, max_concurrency=8):
+        """
+        Fetch the sub-region tree below a region, one level at a time.
+
+        Each level is fetched concurrently; regions already known are not
+        requested again.
+        """
+        if not self._loaded:
+            self.load()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        changed = False
+
+        async def fetch(code):
+            async with semaphore:
+                return await client.get_sub_region_list(child_type(code), code)
+
+        frontier = [region_code] if child_type(region_code) else []
+        while frontier:
+            missing = [code for code in frontier if not self._fresh(self.children, code)]
+            results = await asyncio.gather(*(fetch(code) for code in missing))
+            for code, regions in zip(missing, results):
+                self._store(self.children, code, regions)
+                changed = True
+            frontier = [
+                child
+                for code in frontier
+                for child in self.children[code]["codes"]
+                if child_type(child) is not None
+            ]
+        if changed:
+            self.save()
+
+    def descendants(self, region_code, region_type_filter=None):
+        """
+        Return known descendants of a region, depth first in API order.
+        """
+        found = []
+        stack = list(reversed(self.children.get(region_code, {}).get("codes", [])))
+        while stack:
+            code = stack.pop()
+            if region_type_filter is None or region_type(code) == region_type_filter:
+                found.append(code)
+            stack.extend(reversed(self.children.get(code, {}).get("codes", [])))
+        return found
+
+    async def neighbors(self, client, region_code, hops=1, max_concurrency=8):
+        """
+        Return ``{region_code: distance}`` for regions within ``hops`` of a
+        region, excluding the region itself.
+        """
+        if not self._loaded:
+            self.load()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        changed = False
+
+        async def fetch(code):
+            async with semaphore:
+                return await client.get_adjacent_regions(code)
+
+        distances = {region_code: 0}
+        frontier = [region_code]
+        for hop in range(1, hops + 1):
+            missing = [code for code in frontier if not self._fresh(self.adjacent, code)]
+            results = await asyncio.gather(*(fetch(code) for code in missing))
+            for code, regions in zip(missing, results):
+                self._store(self.adjacent, code, regions)
+                changed = True
+            next_frontier = []
+            for code in frontier:
+                for neighbor in self.adjacent[code]["codes"]:
+                    if neighbor not in distances:
+                        distances[neighbor] = hop
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        if changed:
+            self.save()
+        del distances[region_code]
+        return distances
+
+    def known_neighbors(self, region_code):
+        """
+        Return the cached adjacent regions of a region, without fetching,
+        or None when its neighbours were never fetched.
+        """
+        if not self._loaded:
+            self.load()
+        entry = self.adjacent.get(region_code)
+        return entry["codes"] if entry is not None else None
+
+    def name(self, region_code):
+        return self.names.get(region_code, region_code)
@@ -0,0 +1,127 @@
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD"})
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling upstream while the circuit breaker is open.
+    """
+
+
+def parse_retry_after(value, now=None):
+    """
+    Parse a Retry-After header (seconds or HTTP date) into seconds, or None.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter for idempotent requests.
+
+    ``deadline`` bounds the total time spent on one call, including waits;
+    a ``Retry-After`` header replaces the computed delay. Every call makes
+    at least one attempt, so ``max_attempts`` of 0 means no retries.
+    """
+
+    def __init__(
+        self,
+        max_attempts=3,
+        base_delay=0.5,
+        max_delay=8.0,
+        deadline=30.0,
+        retry_statuses=RETRY_STATUSES,
+        methods=IDEMPOTENT_METHODS,
+        rng=random.random,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_statuses = retry_statuses
+        self.methods = methods
+        self.rng = rng
+        self.retries = 0
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Return the delay before retrying after the given (0-based) attempt.
+        """
+        if retry_after is not None:
+            return retry_after
+        return self.rng() * min(self.max_delay, self.base_delay * 2**attempt)
+
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated upstream failures.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls raise ``CircuitOpenError`` for ``reset_timeout`` seconds. Then one
+    trial call is let through: success closes the circuit, failure reopens it.
+    A call that ends with neither (e.g. cancelled) must call ``release``.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def before_call(self):
+        if self.state == self.OPEN:
+            if self.clock() - self._opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError("eBird API circuit is open; failing fast")
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError("eBird API circuit is half-open; trial call in progress")
+            self._trial_in_flight = True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def release(self):
+        """Let another trial through after a call that recorded no outcome."""
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = self.clock()
+
+    def stats(self):
+        return {"state": self.state, "failures": self.failures, "rejected": self.rejected}
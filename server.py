@@ -1,15 +1,51 @@
+import argparse
+import asyncio
+import functools
+import hashlib
+import importlib.metadata
+import inspect
+import json
 import os
 import sys
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from datetime import date, timedelta
 from typing import Any
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import pydantic_core
 from mcp.server.fastmcp import FastMCP
+from mcp.types import TextContent, Tool
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 
+from archive import ObservationArchive
+from cache import MINUTE, DiskCache, TieredCache, TTLCache
+from checklists import ChecklistStore
 from client import EBirdClient
+from frequency import SpeciesFrequency, historic_days
+from geo import covering_tile, haversine
+from hotspots import HotspotIndex
+from models import (
+    compact_observations,
+    parse_checklist,
+    parse_hotspots,
+    to_dicts,
+)
+from metrics import MetricsRegistry, start_server as start_metrics_server
+from pagination import ResultPages
+from regions import RegionGraph, child_type
+from retry import CircuitBreaker, RetryPolicy
+from taxonomy import TaxonomyStore
+from throttle import RequestGovernor
+from tracing import SERVER, Tracer, exporter_for
+from warmup import WarmUp
 
 # --- Configuration ---
 
-mcp = FastMCP(name="ebird-api", version="1.0.0")
-
 EBIRD_API_KEY = os.getenv("EBIRD_API_KEY", "EBIRD_API_KEY")
 if EBIRD_API_KEY == "EBIRD_API_KEY":
     print(
@@ -17,7 +53,398 @@ if EBIRD_API_KEY == "EBIRD_API_KEY":
         file=sys.stderr,
     )
 
-ebird = EBirdClient(EBIRD_API_KEY)
+EBIRD_CACHE_DIR = os.path.expanduser(
+    os.getenv("EBIRD_CACHE_DIR", os.path.join("~", ".cache", "ebird-mcp-server"))
+)
+EBIRD_TAXONOMY_LOCALES = os.getenv("EBIRD_TAXONOMY_LOCALES", "en")
+EBIRD_CACHE = os.getenv("EBIRD_CACHE", "true").lower() == "true"
+EBIRD_CACHE_MAX_ENTRIES = int(os.getenv("EBIRD_CACHE_MAX_ENTRIES", "1024"))
+EBIRD_CACHE_MAX_BYTES = int(os.getenv("EBIRD_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+EBIRD_CACHE_STALE_RATIO = float(os.getenv("EBIRD_CACHE_STALE_RATIO", "0.5"))
+EBIRD_CACHE_REFRESH_AHEAD = float(os.getenv("EBIRD_CACHE_REFRESH_AHEAD", "0.2"))
+EBIRD_DISK_CACHE = os.getenv("EBIRD_DISK_CACHE", "true").lower() == "true"
+EBIRD_DISK_CACHE_MAX_BYTES = int(
+    os.getenv("EBIRD_DISK_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+)
+EBIRD_MAX_CONCURRENCY = int(os.getenv("EBIRD_MAX_CONCURRENCY", "8"))
+EBIRD_RATE_LIMIT = float(os.getenv("EBIRD_RATE_LIMIT", "10"))
+EBIRD_RATE_BURST = int(os.getenv("EBIRD_RATE_BURST", "10"))
+EBIRD_RETRY_ATTEMPTS = int(os.getenv("EBIRD_RETRY_ATTEMPTS", "3"))
+EBIRD_REQUEST_DEADLINE = float(os.getenv("EBIRD_REQUEST_DEADLINE", "30"))
+EBIRD_CIRCUIT_THRESHOLD = int(os.getenv("EBIRD_CIRCUIT_THRESHOLD", "5"))
+EBIRD_CIRCUIT_RESET = float(os.getenv("EBIRD_CIRCUIT_RESET", "30"))
+EBIRD_PAGE_SIZE = int(os.getenv("EBIRD_PAGE_SIZE", "100"))
+EBIRD_STRUCTURED_OUTPUT = os.getenv("EBIRD_STRUCTURED_OUTPUT", "false").lower() == "true"
+EBIRD_GEO_TILES = os.getenv("EBIRD_GEO_TILES", "false").lower() == "true"
+EBIRD_METRICS_PORT = int(os.getenv("EBIRD_METRICS_PORT", "0"))
+EBIRD_TRACE = os.getenv("EBIRD_TRACE", "")
+EBIRD_WARMUP_REGIONS = os.getenv("EBIRD_WARMUP_REGIONS", "")
+EBIRD_WARMUP_BUDGET = float(os.getenv("EBIRD_WARMUP_BUDGET", "60"))
+EBIRD_TRANSPORT = os.getenv("EBIRD_TRANSPORT", "stdio")
+EBIRD_HOST = os.getenv("EBIRD_HOST", "127.0.0.1")
+EBIRD_PORT = int(os.getenv("EBIRD_PORT", "8000"))
+EBIRD_WORKERS = int(os.getenv("EBIRD_WORKERS", "1"))
+EBIRD_SHUTDOWN_TIMEOUT = int(os.getenv("EBIRD_SHUTDOWN_TIMEOUT", "30"))
+
+metrics = MetricsRegistry()
+tracer = Tracer(exporter_for(EBIRD_TRACE))
+
+# How often the disk cache drops expired entries and enforces its size limit.
+DISK_CACHE_COMPACT_INTERVAL = 15 * MINUTE
+
+
+def response_cache():
+    """Return the client's response cache for the configured options."""
+    if not EBIRD_CACHE:
+        return None
+    memory = TTLCache(max_entries=EBIRD_CACHE_MAX_ENTRIES, max_bytes=EBIRD_CACHE_MAX_BYTES)
+    if not EBIRD_DISK_CACHE:
+        return memory
+    disk = DiskCache(
+        os.path.join(EBIRD_CACHE_DIR, "responses.sqlite3"), max_bytes=EBIRD_DISK_CACHE_MAX_BYTES
+    )
+    return TieredCache(memory, disk)
+
+
+def request_governor():
+    """
+    Return the client's request governor. The limits apply to the whole
+    server, so with several HTTP workers each one gets an equal share.
+    """
+    workers = max(1, EBIRD_WORKERS)
+    return RequestGovernor(
+        max_concurrency=max(1, EBIRD_MAX_CONCURRENCY // workers) if EBIRD_MAX_CONCURRENCY else 0,
+        rate=EBIRD_RATE_LIMIT / workers,
+        burst=max(1, EBIRD_RATE_BURST // workers),
+    )
+
+
+ebird = EBirdClient(
+    EBIRD_API_KEY,
+    cache=response_cache(),
+    governor=request_governor(),
+    retry_policy=RetryPolicy(
+        max_attempts=EBIRD_RETRY_ATTEMPTS, deadline=EBIRD_REQUEST_DEADLINE
+    ),
+    circuit_breaker=CircuitBreaker(
+        failure_threshold=EBIRD_CIRCUIT_THRESHOLD, reset_timeout=EBIRD_CIRCUIT_RESET
+    ),
+    metrics=metrics,
+    tracer=tracer,
+    stale_ratio=EBIRD_CACHE_STALE_RATIO,
+    refresh_ahead=EBIRD_CACHE_REFRESH_AHEAD,
+)
+
+taxonomy = TaxonomyStore(os.path.join(EBIRD_CACHE_DIR, "taxonomy.sqlite3"))
+regions = RegionGraph(os.path.join(EBIRD_CACHE_DIR, "regions.json"))
+archive = ObservationArchive(os.path.join(EBIRD_CACHE_DIR, "archive.sqlite3"))
+checklists = ChecklistStore(os.path.join(EBIRD_CACHE_DIR, "checklists.sqlite3"))
+# Worker processes share stored results, since a cursor's next page may
+# be requested from any worker.
+page_store = (
+    DiskCache(os.path.join(EBIRD_CACHE_DIR, "pages.sqlite3")) if EBIRD_WORKERS > 1 else None
+)
+pages = ResultPages(cache=page_store)
+hotspot_index = HotspotIndex()
+warmup = WarmUp(budget=EBIRD_WARMUP_BUDGET)
+
+if ebird.cache is not None:
+    metrics.collect("cache", ebird.cache.stats)
+metrics.collect("governor", ebird.governor.stats)
+metrics.collect("circuit", ebird.circuit_breaker.stats)
+metrics.collect(
+    "requests",
+    lambda: {
+        "retries": ebird.retry_policy.retries,
+        "coalesced": ebird.coalesced_requests,
+        "background_refreshes": ebird.background_refreshes,
+    },
+)
+metrics.collect("checklist_store", lambda: checklists.stats())
+metrics.collect("warmup", warmup.stats)
+metrics.collect(
+    "hotspot_index",
+    lambda: {"regions": len(hotspot_index.regions), "hotspots": len(hotspot_index)},
+)
+
+tool_latency = metrics.histogram(
+    "tool_duration_seconds", "Time per MCP tool call.", ("tool",)
+)
+tool_calls = metrics.counter(
+    "tool_calls_total", "MCP tool calls by outcome (ok or error).", ("tool", "status")
+)
+tool_in_flight = metrics.gauge("tool_in_flight", "MCP tool calls in progress.", ("tool",))
+
+
+async def taxonomy_locales(locale: str | None = None) -> list[str]:
+    """Return the taxonomy locales to search: ``locale`` or the configured ones."""
+    if locale:
+        return [locale]
+    if EBIRD_TAXONOMY_LOCALES == "all":
+        return [lc["code"] for lc in await ebird.get_taxa_locale_codes()]
+    return [code.strip() for code in EBIRD_TAXONOMY_LOCALES.split(",") if code.strip()]
+
+
+async def warm_hotspots(region_code: str):
+    data = await ebird.get_hotspots(region_code, {})
+    if isinstance(data, list):
+        hotspot_index.add_region(region_code, data, back=14)
+
+
+def warmup_jobs(region_codes: list[str], locales: list[str]) -> dict:
+    """
+    Return the warm-up jobs: the taxonomy for each locale, and the hotspot,
+    species and sub-region lists of each region, requested the way the
+    tools request them so they land in the same cache entries.
+    """
+    jobs = {
+        f"taxonomy {code}": functools.partial(taxonomy.ensure, ebird, code) for code in locales
+    }
+    for code in region_codes:
+        jobs[f"hotspots {code}"] = functools.partial(warm_hotspots, code)
+        jobs[f"species {code}"] = functools.partial(ebird.get_species_list_for_region, code)
+        if child_type(code):
+            jobs[f"subregions {code}"] = functools.partial(
+                ebird.get_sub_region_list, child_type(code), code
+            )
+    return jobs
+
+
+async def run_warmup():
+    """Preload the caches for EBIRD_WARMUP_REGIONS within EBIRD_WARMUP_BUDGET seconds."""
+    region_codes = [code.strip() for code in EBIRD_WARMUP_REGIONS.split(",") if code.strip()]
+    try:
+        locales = await taxonomy_locales()
+    except Exception as e:
+        log(f"Warm-up could not list taxonomy locales: {e}")
+        locales = []
+    summary = await warmup.run(warmup_jobs(region_codes, locales))
+    log(
+        f"Warm-up {summary['state']}: {summary['done']}/{summary['jobs']} jobs "
+        f"in {summary['seconds']:.1f}s"
+    )
+    for label, error in warmup.errors.items():
+        log(f"Warm-up job failed: {label}: {error}")
+
+
+def disk_caches() -> list:
+    """Return the disk-backed caches in use, which need periodic compaction."""
+    return [
+        cache for cache in (ebird.cache, page_store) if isinstance(cache, (TieredCache, DiskCache))
+    ]
+
+
+@contextmanager
+def warmup_leader():
+    """
+    Yield whether this process runs the warm-up. With several workers only
+    the one holding the lock on ``warmup.lock`` in EBIRD_CACHE_DIR does, and
+    it keeps the lock until it exits; the others share its results through
+    the disk caches and stores.
+    """
+    if EBIRD_WORKERS <= 1 or fcntl is None:
+        yield True
+        return
+    os.makedirs(EBIRD_CACHE_DIR, exist_ok=True)
+    with open(os.path.join(EBIRD_CACHE_DIR, "warmup.lock"), "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        yield True
+
+
+async def compact_cache():
+    """Compact the disk caches now and every DISK_CACHE_COMPACT_INTERVAL seconds."""
+    while True:
+        for cache in disk_caches():
+            try:
+                removed = cache.compact()
+                log(f"Disk cache compacted, {removed} entries removed")
+            except Exception as e:
+                log(f"Disk cache compaction failed: {e}")
+        await asyncio.sleep(DISK_CACHE_COMPACT_INTERVAL)
+
+
+@asynccontextmanager
+async def resources():
+    """
+    Runs the process-wide background tasks and closes the pooled eBird HTTP
+    client and local stores on exit.
+    """
+    metrics_server = None
+    if EBIRD_METRICS_PORT and EBIRD_WORKERS == 1:
+        metrics_server = await start_metrics_server(metrics, port=EBIRD_METRICS_PORT)
+    elif EBIRD_METRICS_PORT:
+        log("EBIRD_METRICS_PORT is ignored with several workers; use the ebird_get_metrics tool")
+    leader = ExitStack()
+    warmup_task = None
+    if EBIRD_WARMUP_REGIONS and leader.enter_context(warmup_leader()):
+        # Warm-up runs alongside the first calls, which share its requests.
+        warmup_task = asyncio.create_task(run_warmup())
+    elif EBIRD_WARMUP_REGIONS:
+        log("Warm-up runs in another worker")
+    caches = disk_caches()
+    compaction_task = asyncio.create_task(compact_cache()) if caches else None
+    try:
+        yield
+    finally:
+        if warmup_task is not None:
+            warmup_task.cancel()
+        leader.close()
+        if compaction_task is not None:
+            compaction_task.cancel()
+        for cache in caches:
+            cache.close()
+        if metrics_server is not None:
+            metrics_server.close()
+        await ebird.aclose()
+        taxonomy.close()
+        archive.close()
+        checklists.close()
+        tracer.close()
+
+
+# FastMCP enters the server lifespan once per session, and per request when
+# stateless, so over HTTP the app's lifespan holds the resources instead.
+serving_http = False
+ready = False
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Keeps the pooled eBird HTTP client open for the lifetime of a stdio session."""
+    if serving_http:
+        yield
+        return
+    async with resources():
+        yield
+
+
+class EBirdMCP(FastMCP):
+    """
+    FastMCP with deferred tool registration and a lighter structured output
+    path.
+
+    Building a tool's argument model and JSON schema is most of the cost of
+    importing this module, so ``defer_tool`` only records the function; it
+    is registered on its first call, or when the tool list is needed. The
+    tool list is then cached in ``schema_cache`` under a fingerprint of the
+    tools' names, descriptions and signatures and the mcp version, so later
+    starts answer ``tools/list`` without registering anything.
+
+    FastMCP round-trips structured tool results through pydantic and adds an
+    indented JSON copy as text content. The tools here already return plain
+    JSON-ready dicts, so in structured mode they are passed through as-is,
+    with a compact JSON copy for clients that only read text content.
+
+    Both rely on FastMCP's private tool manager. If an mcp release changes
+    it, the schema cache and the structured output shortcut are turned off
+    and the FastMCP methods are used instead.
+    """
+
+    def __init__(self, *args, schema_cache: str | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.schema_cache = schema_cache
+        self._specs = {}
+        self._deferred = {}
+        self._internals_supported = self._check_internals()
+
+    def _check_internals(self) -> bool:
+        """Whether the tool manager has the private methods used below."""
+        manager = getattr(self, "_tool_manager", None)
+        try:
+            parameters = inspect.signature(manager.call_tool).parameters
+            return "convert_result" in parameters and callable(manager.list_tools)
+        except (AttributeError, TypeError, ValueError):
+            return False
+
+    def defer_tool(self, func, name: str, description: str, structured_output: bool):
+        self._specs[name] = self._deferred[name] = (func, description, structured_output)
+
+    def _register(self, name: str):
+        deferred = self._deferred.pop(name, None)
+        if deferred is not None:
+            func, description, structured_output = deferred
+            self.add_tool(
+                func, name=name, description=description, structured_output=structured_output
+            )
+
+    def _register_all(self):
+        for name in list(self._deferred):
+            self._register(name)
+
+    def _fingerprint(self) -> str:
+        """Hash of everything the deferred tools' schemas are built from."""
+        tools = [
+            [name, description, structured_output, str(inspect.signature(func))]
+            for name, (func, description, structured_output) in sorted(self._specs.items())
+        ]
+        source = json.dumps([importlib.metadata.version("mcp"), tools])
+        return hashlib.sha256(source.encode()).hexdigest()
+
+    def _load_schemas(self, fingerprint: str) -> list[Tool] | None:
+        try:
+            with open(self.schema_cache, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("fingerprint") != fingerprint:
+                return None
+            return [Tool.model_validate(tool) for tool in cached["tools"]]
+        except (OSError, ValueError, KeyError, AttributeError):
+            return None
+
+    def _save_schemas(self, fingerprint: str, tools: list[Tool]):
+        data = {
+            "fingerprint": fingerprint,
+            "tools": [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in tools],
+        }
+        tmp = f"{self.schema_cache}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.schema_cache)), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.schema_cache)
+        except OSError as e:
+            log(f"Could not write the tool schema cache: {e}")
+
+    async def list_tools(self) -> list[Tool]:
+        cacheable = (
+            self._internals_supported
+            and self.schema_cache is not None
+            and all(info.name in self._specs for info in self._tool_manager.list_tools())
+        )
+        if not self._deferred or not cacheable:
+            self._register_all()
+            return await super().list_tools()
+        fingerprint = self._fingerprint()
+        tools = self._load_schemas(fingerprint)
+        if tools is None:
+            self._register_all()
+            order = list(self._specs)
+            tools = sorted(await super().list_tools(), key=lambda tool: order.index(tool.name))
+            self._save_schemas(fingerprint, tools)
+        return tools
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]):
+        self._register(name)
+        with tracer.span("mcp.call_tool", SERVER, tool=name) as span:
+            if not EBIRD_STRUCTURED_OUTPUT or not self._internals_supported:
+                return await super().call_tool(name, arguments)
+            result = await self._tool_manager.call_tool(
+                name, arguments, context=self.get_context(), convert_result=False
+            )
+            text = pydantic_core.to_json(result).decode()
+            span.set(bytes=len(text))
+            return [TextContent(type="text", text=text)], result
+
+
+mcp = EBirdMCP(
+    name="ebird-api",
+    version="1.0.0",
+    lifespan=lifespan,
+    schema_cache=os.path.join(EBIRD_CACHE_DIR, "tool_schemas.json"),
+)
 
 DEBUG = os.getenv("DEBUG", "true").lower() == "true"
 
@@ -28,45 +455,51 @@ def log(*args: Any):
         print("[DEBUG]", *args, file=sys.stderr)
 
 
+def format_observation(obs: dict) -> str:
+    """Formats a single observation into a readable string."""
+    get = obs.get
+    how_many = get("howMany")
+    how_many = f"Count: {how_many}" if how_many else "Present"
+    date = get("obsDt")
+    if date is None:
+        date = "Unknown date"
+    obs_time = get("obsTime")
+    if obs_time:
+        date = f"{date} {obs_time}"
+    observer = get("userDisplayName")
+    observer = f"\nObserver: {observer}" if observer else ""
+    return (
+        f"Species: {get('comName')} ({get('sciName')})\n"
+        f"Location: {get('locName')}\n"
+        f"{how_many}\n"
+        f"Date: {date}\n"
+        f"Coordinates: {get('lat')}, {get('lng')}{observer}"
+    )
+
+
 def format_observations(observations: list[dict]) -> str:
-    """Formats a list of observation dictionaries into a readable string."""
+    """Formats a list of observations into a readable string."""
     if not observations:
         return "No observations found."
-    lines = []
-    for obs in observations:
-        how_many = f"Count: {obs.get('howMany')}" if obs.get("howMany") else "Present"
-        date = obs.get("obsDt", "Unknown date")
-        time = obs.get("obsTime", "")
-        datetime_str = f"{date} {time}".strip()
-        line = (
-            f"Species: {obs.get('comName')} ({obs.get('sciName')})\n"
-            f"Location: {obs.get('locName')}\n"
-            f"{how_many}\n"
-            f"Date: {datetime_str}\n"
-            f"Coordinates: {obs.get('lat')}, {obs.get('lng')}"
-        )
-        if obs.get("userDisplayName"):
-            line += f"\nObserver: {obs.get('userDisplayName')}"
-        lines.append(line)
-    return "\n\n".join(lines)
+    return "\n\n".join(map(format_observation, observations))
 
 
 def format_hotspots(hotspots: list[dict]) -> str:
-    """Formats a list of hotspot dictionaries into a readable string."""
+    """Formats a list of hotspots into a readable string."""
     if not hotspots:
         return "No hotspots found."
     lines = []
     for hs in hotspots:
-        name = hs.get("locName", f"Hotspot {hs.get('locId', 'Unknown')}")
-        coords = (
-            f"{hs.get('lat')}, {hs.get('lng')}"
-            if hs.get("lat") and hs.get("lng")
-            else "Not available"
-        )
-        species = hs.get("numSpecies", "Unknown")
+        get = hs.get
+        loc_id, loc_name, lat, lng = get("locId"), get("locName"), get("lat"), get("lng")
+        name = loc_name if loc_name is not None else f"Hotspot {loc_id or 'Unknown'}"
+        coords = f"{lat}, {lng}" if lat and lng else "Not available"
+        species = get("numSpecies", get("numSpeciesAllTime"))
+        if species is None:
+            species = "Unknown"
         lines.append(
             f"Hotspot: {name}\n"
-            f"Location ID: {hs.get('locId')}\n"
+            f"Location ID: {loc_id}\n"
             f"Coordinates: {coords}\n"
             f"Number of Species: {species}"
         )
@@ -96,20 +529,20 @@ def format_taxonomy_forms(forms: list[str]) -> str:
 
 
 def format_checklist(checklist: dict) -> str:
-    """Formats a checklist dictionary into a readable string."""
+    """Formats a checklist into a readable string."""
     if not checklist:
         return "Checklist not found."
 
     lines = [
         f"Checklist ID: {checklist.get('subId')}",
-        f"Location: {checklist.get('loc', {}).get('locName')}",
+        f"Location: {(checklist.get('loc') or {}).get('locName')}",
         f"Date: {checklist.get('obsDt')}",
         f"Observer: {checklist.get('userDisplayName')}",
         "---",
         "Observations:",
     ]
 
-    for obs in checklist.get("obs", []):
+    for obs in checklist.get("obs") or ():
         how_many = f"Count: {obs.get('howMany')}" if obs.get("howMany") else "Present"
         lines.append(f"  - {obs.get('comName')} ({obs.get('sciName')}) - {how_many}")
 
@@ -190,6 +623,62 @@ def format_taxonomic_groups(groups: list[dict]) -> str:
     return "Taxonomic Groups:\n" + "\n".join(lines)
 
 
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(counts: list[int], present: str) -> str:
+    """Renders a daily series as one character per day."""
+    top = max(counts, default=0) or 1
+    return "".join(
+        SPARK_BLOCKS[min(7, count * 8 // (top + 1))] if seen == "1" else "·"
+        for count, seen in zip(counts, present)
+    )
+
+
+def format_species_frequency(frequency: dict) -> str:
+    """Formats a species frequency time series into a readable string."""
+    errors = frequency.get("errors", {})
+    failed = "\n".join(f"- {day}: {error}" for day, error in errors.items())
+    failed = f"\n\nFailed dates:\n{failed}" if errors else ""
+    if not frequency["species"]:
+        return "No observations found." + failed
+    days = frequency["days"]
+    lines = [
+        f"Species frequency in {frequency['regionCode']}, "
+        f"{frequency['start']} to {frequency['end']} ({days} days):"
+    ]
+    for sp in frequency["species"]:
+        peak = f", max {sp['maxCount']} on {sp['maxCountDate']}" if sp["maxCount"] else ""
+        lines.append(
+            f"\n{sp['comName'] or sp['speciesCode']} ({sp['speciesCode']}): "
+            f"reported on {sp['daysReported']}/{sp['daysCovered']} days ({sp['frequency']:.0%}), "
+            f"total count {sp['totalCount']}{peak}\n"
+            f"  {sparkline(sp['counts'], sp['present'])}"
+        )
+    return "\n".join(lines) + failed
+
+
+def format_species_matches(matches: list[tuple]) -> str:
+    """Formats ranked species name matches into a readable string."""
+    if not matches:
+        return "No matching species found."
+    lines = [
+        f"- {taxon.get('comName')} ({taxon.get('sciName')}) - Species Code: {taxon.get('speciesCode')} [{locale}, score {score:.2f}]"
+        for score, locale, taxon in matches
+    ]
+    return "Matching species:\n" + "\n".join(lines)
+
+
+def format_region_hops(regions: list[dict]) -> str:
+    """Formats regions with their adjacency distance into a readable string."""
+    return format_regions(
+        [
+            {"code": r["code"], "name": f"{r['name']}, {r['hops']} hop{'s' if r['hops'] > 1 else ''}"}
+            for r in regions
+        ]
+    )
+
+
 def format_region_info(region_info: dict) -> str:
     """Formats region information into a readable string."""
     if not region_info:
@@ -204,10 +693,177 @@ def format_region_info(region_info: dict) -> str:
     return "\n".join(lines)
 
 
+def hotspot_records(hotspots: list) -> list[dict]:
+    """Converts hotspots into compact records for structured output."""
+    return to_dicts(parse_hotspots(hotspots))
+
+
+def species_match_records(matches: list[tuple]) -> list[dict]:
+    """Converts ranked species matches into records for structured output."""
+    return [{"score": round(score, 3), "locale": locale, **taxon} for score, locale, taxon in matches]
+
+
+def instrumented(name: str, func):
+    """Wraps a tool to record its latency, outcome and calls in progress."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        status = "error"
+        try:
+            with (
+                tracer.span(f"tool {name}", tool=name),
+                tool_in_flight.track(tool=name),
+                tool_latency.time(tool=name),
+            ):
+                result = await func(*args, **kwargs)
+            status = "ok"
+            return result
+        finally:
+            tool_calls.inc(tool=name, status=status)
+
+    return wrapper
+
+
+def tool(name: str, description: str):
+    """
+    Registers an instrumented MCP tool, with structured output when it is
+    enabled. Registration is deferred until the tool is first needed.
+    """
+
+    def register(func):
+        wrapper = instrumented(name, func)
+        mcp.defer_tool(
+            wrapper, name=name, description=description, structured_output=EBIRD_STRUCTURED_OUTPUT
+        )
+        return wrapper
+
+    return register
+
+
+def tool_result(key: str, data, formatter, to_records=None) -> dict[str, Any]:
+    """
+    Build a tool result: formatted text by default, or ``{key: records}``
+    as structured content, skipping the formatter, when
+    EBIRD_STRUCTURED_OUTPUT is enabled.
+    """
+    records = len(data) if isinstance(data, list) else None
+    if EBIRD_STRUCTURED_OUTPUT:
+        with tracer.span("to_records", records=records):
+            return {key: to_records(data) if to_records else data}
+    with tracer.span("format", records=records) as span:
+        text = formatter(data)
+        span.set(chars=len(text))
+    return {"content": [{"type": "text", "text": text}]}
+
+
+def local_nearby_hotspots(lat: float, lng: float, dist: float, back: int | None):
+    """
+    Answer a radius query from the hotspot index, nearest first, or return
+    None when no fresh region list covers the circle. The extent of a
+    region's hotspots is only a rectangle, so the circle may cross a border:
+    the covering region's neighbours must be known and indexed too.
+    """
+    region_code = hotspot_index.covering_region(lat, lng, dist, back)
+    if region_code is None:
+        return None
+    neighbors = regions.known_neighbors(region_code)
+    if neighbors is None or not all(hotspot_index.covered(code, back) for code in neighbors):
+        return None
+    return hotspot_index.nearby(lat, lng, dist, back)
+
+
+# Widest window and largest page the geo observation endpoints accept.
+MAX_GEO_BACK = 30
+MAX_GEO_RESULTS = 10000
+
+
+async def tiled_nearby_observations(fetch, lat: float, lng: float, options: dict):
+    """
+    Fetch nearby observations for the geohash tile containing the point,
+    with a radius covering the query from anywhere in the tile and the
+    widest ``back`` window, then keep the records within the query's exact
+    distance and window. Nearby queries from the same tile share one
+    cached upstream response.
+
+    ``fetch`` is a client method taking ``(lat, lng, options)``.
+    """
+    dist, back = options.get("dist", 25), options.get("back", 14)
+    tile = covering_tile(lat, lng, dist) if EBIRD_GEO_TILES else None
+    if tile is None:
+        return await fetch(lat, lng, options)
+    tile_lat, tile_lng, radius = tile
+    records = await fetch(
+        tile_lat,
+        tile_lng,
+        {**options, "dist": radius, "back": MAX_GEO_BACK, "maxResults": MAX_GEO_RESULTS},
+    )
+    if not isinstance(records, list):
+        return records
+    since = (date.today() - timedelta(days=back)).isoformat()
+    return [
+        record
+        for record in records
+        if (record.get("obsDt") or "") >= since
+        and "lat" in record
+        and haversine(lat, lng, record["lat"], record["lng"]) <= dist
+    ][: options.get("maxResults", 100)]
+
+
+# Checklist prefetches still running, kept so they are not garbage collected.
+prefetches = set()
+
+
+def prefetch_checklists(feed: list[dict] | None, count: int | None):
+    """
+    Fetch the details of the first ``count`` checklists of a feed into the
+    checklist store in the background, so following ebird_get_checklists
+    or ebird_get_checklist_details calls are served locally.
+    """
+    sub_ids = [c["subId"] for c in (feed or [])[: count or 0] if c.get("subId")]
+    if not sub_ids:
+        return None
+    task = asyncio.create_task(checklists.fetch(ebird, sub_ids, EBIRD_MAX_CONCURRENCY))
+    prefetches.add(task)
+    task.add_done_callback(prefetches.discard)
+    return task
+
+
+# Tool arguments that control paging rather than the upstream request.
+PAGING_ARGS = ["pageSize", "offset", "cursor"]
+
+
+async def paged_result(
+    key: str, fetch, formatter, to_records, pageSize, offset, cursor
+) -> dict[str, Any]:
+    """
+    Build a tool result for one page of a list.
+
+    A cursor resumes a stored result without calling ``fetch`` again.
+    """
+    page_size = EBIRD_PAGE_SIZE if pageSize is None else pageSize
+    pages.check(page_size, offset or 0)
+    if cursor:
+        records, result_id, offset = pages.resume(cursor)
+    else:
+        records, result_id = await fetch(), None
+    records = records or []
+    if not EBIRD_STRUCTURED_OUTPUT:
+        with tracer.span("format", records=len(records)) as span:
+            text = pages.page(records, formatter, page_size, offset or 0, result_id)
+            span.set(chars=len(text))
+        return {"content": [{"type": "text", "text": text}]}
+    start, end, next_cursor = pages.window(records, page_size, offset or 0, result_id)
+    page = records[start:end]
+    with tracer.span("to_records", records=len(page)):
+        result = {key: to_records(page) if to_records else page, "total": len(records)}
+    if next_cursor:
+        result["nextCursor"] = next_cursor
+    return result
+
 
 # --- MCP Tools ---
 # data/obs
-@mcp.tool(
+@tool(
     name="ebird_get_recent_observations",
     description="Get the list of recent observations (up to 30 days ago) of birds seen in a country, state, county, or location. Results include only the most recent observation for each species in the region specified.",
 )
@@ -218,7 +874,10 @@ async def ebird_get_recent_observations(
     includeProvisional: bool | None = None,
     hotspot: bool | None = None,
     detail: str | None = None,
-) -> dict:
+    pageSize: int | None = None,
+    offset: int | None = None,
+    cursor: str | None = None,
+) -> dict[str, Any]:
     """1. Get recent observations in a region.
 
     :param regionCode: The regional code (e.g., US-NY).
@@ -227,18 +886,89 @@ async def ebird_get_recent_observations(
     :param includeProvisional: Include observations not yet reviewed.
     :param hotspot: Only fetch observations from hotspots.
     :param detail: Level of detail for observations. Can be 'simple' or 'full'.
+    :param pageSize: Number of records per page.
+    :param offset: Index of the first record to return.
+    :param cursor: Cursor from a previous page; other arguments are then ignored.
     """
     log(f"Received ebird_get_recent_observations request for region: {regionCode}")
     options = {
         k: v
         for k, v in locals().items()
-        if k not in ["regionCode", "log"] and v is not None
+        if k not in ["regionCode", "log", *PAGING_ARGS] and v is not None
+    }
+    return await paged_result(
+        "observations",
+        lambda: ebird.get_recent_observations(regionCode, options),
+        format_observations,
+        compact_observations,
+        pageSize,
+        offset,
+        cursor,
+    )
+
+
+@tool(
+    name="ebird_get_recent_observations_batch",
+    description="Get recent observations (up to 30 days ago) for several regions at once, e.g. every county in a state. Results are merged and de-duplicated; regions that fail are listed separately.",
+)
+async def ebird_get_recent_observations_batch(
+    regionCodes: list[str],
+    back: int | None = None,
+    maxResults: int | None = None,
+    includeProvisional: bool | None = None,
+    hotspot: bool | None = None,
+    detail: str | None = None,
+    maxConcurrency: int | None = None,
+    pageSize: int | None = None,
+    offset: int | None = None,
+    cursor: str | None = None,
+) -> dict[str, Any]:
+    """1b. Get recent observations in several regions.
+
+    :param regionCodes: The regional codes (e.g., ['US-NY-061', 'US-NY-047']).
+    :param back: The number of days back to fetch observations (1-30).
+    :param maxResults: Maximum number of results per region.
+    :param includeProvisional: Include observations not yet reviewed.
+    :param hotspot: Only fetch observations from hotspots.
+    :param detail: Level of detail for observations. Can be 'simple' or 'full'.
+    :param maxConcurrency: Maximum number of regions fetched at once.
+    :param pageSize: Number of records per page.
+    :param offset: Index of the first record to return.
+    :param cursor: Cursor from a previous page; other arguments are then ignored.
+    """
+    log(f"Received ebird_get_recent_observations_batch request for regions: {regionCodes}")
+    options = {
+        k: v
+        for k, v in locals().items()
+        if k not in ["regionCodes", "maxConcurrency", "log", *PAGING_ARGS] and v is not None
     }
-    data = await ebird.get_recent_observations(regionCode, options)
-    return {"content": [{"type": "text", "text": format_observations(data)}]}
+    errors = {}
 
+    async def fetch():
+        data = await ebird.get_recent_observations_batch(
+            regionCodes, options, max_concurrency=maxConcurrency or 8
+        )
+        errors.update(data["errors"])
+        return data["observations"]
+
+    result = await paged_result(
+        "observations",
+        fetch,
+        format_observations,
+        compact_observations,
+        pageSize,
+        offset,
+        cursor,
+    )
+    if errors and EBIRD_STRUCTURED_OUTPUT:
+        result["errors"] = errors
+    elif errors:
+        failed = "\n".join(f"- {code}: {error}" for code, error in errors.items())
+        result["content"][0]["text"] += f"\n\nFailed regions:\n{failed}"
+    return result
 
-@mcp.tool(
+
+@tool(
     name="ebird_get_notable_observations",
     description="Get the list of recent, notable observations (up to 30 days ago) of birds seen in a country, region or location.",
 )
@@ -247,25 +977,38 @@ async def ebird_get_notable_observations(
     back: int | None = None,
     maxResults: int | None = None,
     detail: str | None = None,
-) -> dict:
+    pageSize: int | None = None,
+    offset: int | None = None,
+    cursor: str | None = None,
+) -> dict[str, Any]:
     """2. Get recent notable observations in a region.
 
     :param regionCode: The regional code.
     :param back: Days back to fetch.
     :param maxResults: Maximum number of results.
     :param detail: Level of detail. Can be 'simple' or 'full'.
+    :param pageSize: Number of records per page.
+    :param offset: Index of the first record to return.
+    :param cursor: Cursor from a previous page; other arguments are then ignored.
     """
     log(f"Received ebird_get_notable_observations request for region: {regionCode}")
     options = {
         k: v
         for k, v in locals().items()
-        if k not in ["regionCode", "log"] and v is not None
+        if k not in ["regionCode", "log", *PAGING_ARGS] and v is not None
     }
-    data = await ebird.get_notable_observations(regionCode, options)
-    return {"content": [{"type": "text", "text": format_observations(data)}]}
+    return await paged_result(
+        "observations",
+        lambda: ebird.get_notable_observations(regionCode, options),
+        format_observations,
+        compact_observations,
+        pageSize,
+        offset,
+        cursor,
+    )
 
 
-@mcp.tool(
+@tool(
     name="ebird_get_recent_observations_for_species",
     description="Get the recent observations, up to 30 days ago, of a particular species in a country, region or location. Results include only the most recent observation from each location in the region specified.",
 )
@@ -276,7 +1019,10 @@ async def ebird_get_recent_observations_for_species(
     maxResults: int | None = None,
     includeProvisional: bool | None = None,
     hotspot: bool | None = None,
-) -> dict:
+    pageSize: int | None = None,
+    offset: int | None = None,
+    cursor: str | None = None,
+) -> dict[str, Any]:
     """3. Get recent observations of a species in a region.
 
     :param regionCode: The regional code.
@@ -285,6 +1031,9 @@ async def ebird_get_recent_observations_for_species(
     :param maxResults: Maximum number of results.
     :param includeProvisional: Include provisional data.
     :param hotspot: Only from hotspots.
+    :param pageSize: Number of records per page.
+    :param offset: Index of the first record to return.
+    :param cursor: Cursor from a previous page; other arguments are then ignored.
     """
     log(
         f"Received ebird_get_recent_observations_for_species request for region: {regionCode}, species: {speciesCode}"
@@ -292,15 +1041,22 @@ async def ebird_get_recent_observations_for_species(
     options = {
         k: v
         for k, v in locals().items()
-        if k not in ["regionCode", "speciesCode", "log"] and v is not None
+        if k not in ["regionCode", "speciesCode", "log", *PAGING_ARGS] and v is not None
     }
-    data = await ebird.get_recent_observations_for_species(
-        regionCode, speciesCode, options
+    return await paged_result(
+        "observations",
+        lambda: ebird.get_recent_observations_for_species(
+            regionCode, speciesCode, options
+        ),
+        format_observations,
+        compact_observations,
+        pageSize,
+        offset,
+        cursor,
     )
-    return {"content": [{"type": "text", "text": format_observations(data)}]}
 
 
-@mcp.tool(
+@tool(
     name="ebird_get_nearby_observations",
     description="Get the list of recent observations (up to 30 days ago) of birds seen at locations within a radius of up to 50 kilometers, from a given set of coordinates. Results include only the most recent observation for each species in the region specified.",
 )
@@ -312,7 +1068,10 @@ async def ebird_get_nearby_observations(
     maxResults: int | None = None,
     includeProvisional: bool | None = None,
     hotspot: bool | None = None,
-) -> dict:
+    pageSize: int | None = None,
+    offset: int | None = None,
+    cursor: str | None = None,
+) -> dict[str, Any]:
     """4. Get recent nearby observations.
 
     :param lat: Latitude.
@@ -322,18 +1081,28 @@ async def ebird_get_nearby_observations(
     :param maxResults: Maximum number of results.
     :param includeProvisional: Include provisional data.
     :param hotspot: Only from hotspots.
+    :param pageSize: Number of records per page.
+    :param offset: Index of the first record to return.
+    :param cursor: Cursor from a previous page; other arguments are then ignored.
     """
     log(f"Received ebird_get_nearby_observations request for lat: {lat}, lng: {lng}")
     options = {
         k: v
         for k, v in locals().items()
-        if k not in ["lat", "lng", "log"] and v is not None
+        if k not in ["lat", "lng", "log", *PAGING_ARGS] and v is not None
     }
-    data = await ebird.get_nearby_observations(lat, lng, options)
-    return {"content": [{"type": "text", "text": format_observations(data)}]}
+    return await paged_result(
+        "observations",
+        lambda: tiled_nearby_observations(ebird.get_nearby_observations, lat, lng, options),
+        format_observations,
+        compact_observations,
+        pageSize,
+        offset,
+        cursor,
+    )
 
 
-@mcp.tool(
+@tool(
     name="ebird_get_nearby_observations_for_species",
     description="Get all observations of a species, seen up to 30 days ago, at any location within a radius of up to 50 kilometers, from a given set of coordinates. Results include only the most recent observation from each location in the region specified.",
 )
@@ -345,7 +1114,10 @@ async def ebird_get_nearby_observations_for_species(
     back: int | None = None,
     maxResults: int | None = None,
     includeProvisional: bool | None = None,
-) -> dict:
+    pageSize: int | None = None,
+    offset: int | None = None,
+    cursor: str | None = None,
+) -> dict[str, Any]:
     """5. Get recent nearby observations of a species.
 
     :param lat: Latitude.
@@ -355,6 +1127,9 @@ async def ebird_get_nearby_observations_for_species(
     :param back: Days back to fetch.
     :param maxResults: Maximum number of results.
     :param includeProvisional: Include provisional data.
+    :param pageSize: Number of records per page.
+    :param offset: Index of the first record to return.
+    :param cursor: Cursor from a previous page; other arguments are then ignored.
     """
     log(
         f"Received ebird_get_nearby_observations_for_species request for lat: {lat}, lng: {lng}, species: {speciesCode}"
@@ -362,15 +1137,22 @@ async def ebird_get_nearby_observations_for_species(
     options = {
         k: v
         for k, v in locals().items()
-        if k not in ["lat", "lng", "speciesCode", "log"] and v is not None
+        if k not in ["lat", "lng", "speciesCode", "log", *PAGING_ARGS] and v is not None
     }
-    data = await ebird.get_nearby_observations_for_species(
-        lat, lng, speciesCode, options
+    return await paged_result(
+        "observations",
+        lambda: ebird.get_nearby_observations_for_species(
+            lat, lng, speciesCode, options
+        ),
+        format_observations,
+        compact_observations,
+        pageSize,
+        offset,
+        cursor,
     )
-    return {"content": [{"type": "text", "text": format_observations(data)}]}
 
 
-@mcp.tool(
+@tool(
     name="ebird_get_nearest_observations_for_species",
     description="Find the nearest locations where a species has been seen recently.",
 )
@@ -382,7 +1164,10 @@ async def ebird_get_nearest_observations_for_species(
     back: int | None = None,
     maxResults: int | None = None,
     includeProvisional: bool | None = None,
-) -> dict:
+    pageSize: int | None = None,
+    offset: int | None = None,
+    cursor: str | None = None,
+) -> dict[str, Any]:
     """6. Get nearest observations of a species.
 
     :param lat: Latitude.
@@ -392,6 +1177,9 @@ async def ebird_get_nearest_observations_for_species(
     :param back: Days back to fetch.
     :param maxResults: Maximum number of results.
     :param includeProvisional: Include provisional data.
+    :param pageSize: Number of records per page.
+    :param offset: Index of the first record to return.
+    :param cursor: Cursor from a previous page; other arguments are then ignored.
     """
     log(
         f"Received ebird_get_nearest_observations_for_species request for lat: {lat}, lng: {lng}, species: {speciesCode}"
@@ -399,15 +1187,22 @@ async def ebird_get_nearest_observations_for_species(
     options = {
         k: v
         for k, v in locals().items()
-        if k not in ["lat", "lng", "speciesCode", "log"] and v is not None
+        if k not in ["lat", "lng", "speciesCode", "log", *PAGING_ARGS] and v is not None
     }
-    data = await ebird.get_nearest_observations_for_species(
-        lat, lng, speciesCode, options
+    return await paged_result(
+        "observations",
+        lambda: ebird.get_nearest_observations_for_species(
+            lat, lng, speciesCode, options
+        ),
+        format_observations,
+        compact_observations,
+        pageSize,
+        offset,
+        cursor,
     )
-    return {"content": [{"type": "text", "text": format_observations(data)}]}
 
 
-@mcp.tool(
+@tool(
     name="ebird_get_nearby_notable_observations",
     description="Get the list of notable observations (up to 30 days ago) of birds seen at locations within a radius of up to 50 kilometers, from a given set of coordinates.",
 )
@@ -417,7 +1212,10 @@ async def ebird_get_nearby_notable_observations(
     dist: int | None = None,
     back: int | None = None,
     maxResults: int | None = None,
-) -> dict:
+    pageSize: int | None = None,
+    offset: int | None = None,
+    cursor: str | None = None,
+) -> dict[str, Any]:
     """7. Get recent nearby notable observations.
 
     :param lat: Latitude.
@@ -425,6 +1223,9 @@ async def ebird_get_nearby_notable_observations(
     :param dist: Distance in kilometers.
     :param back: Days back to fetch.
     :param maxResults: Maximum number of results.
+    :param pageSize: Number of records per page.
+    :param offset: Index of the first record to return.
+    :param cursor: Cursor from a previous page; other arguments are then ignored.
     """
     log(
         f"Received ebird_get_nearby_notable_observations request for lat: {lat}, lng: {lng}"
@@ -432,13 +1233,22 @@ async def ebird_get_nearby_notable_observations(
     options = {
         k: v
         for k, v in locals().items()
-        if k not in ["lat", "lng", "log"] and v is not None
+        if k not in ["lat", "lng", "log", *PAGING_ARGS] and v is not None
     }
-    data = await ebird.get_nearby_notable_observations(lat, lng, options)
-    return {"content": [{"type": "text", "text": format_observations(data)}]}
+    return await paged_result(
+        "observations",
+        lambda: tiled_nearby_observations(
+            ebird.get_nearby_notable_observations, lat, lng, options
+        ),
+        format_observations,
+        compact_observations,
+        pageSize,
+        offset,
+        cursor,
+    )
 
 
-@mcp.tool(
+@tool(
     name="ebird_get_historic_observations",
     description="Get a list of all taxa seen in a country, region or location on a specific date, with the specific observations determined by the rank parameter (defaults to latest observation on the date).",
 )
@@ -449,7 +1259,7 @@ async def ebird_get_historic_observations(
     day: int,
     back: int | None = None,
     maxResults: int | None = None,
-) -> dict:
+) -> dict[str, Any]:
     """Get historic observations on a date.
 
     :param regionCode: The regional code.
@@ -467,12 +1277,74 @@ async def ebird_get_historic_observations(
         for k, v in locals().items()
         if k not in ["regionCode", "year", "month", "day", "log"] and v is not None
     }
+    archived = archive.observations(
+        regionCode, date(year, month, day), max_results=maxResults or 100
+    )
+    if archived is not None:
+        log(f"Serving historic observations for {regionCode} from the archive")
+        return tool_result("observations", archived, format_observations, compact_observations)
     data = await ebird.get_historic_observations(regionCode, year, month, day, options)
-    return {"content": [{"type": "text", "text": format_observations(data)}]}
+    return tool_result("observations", data, format_observations, compact_observations)
+
+
+@tool(
+    name="ebird_species_frequency",
+    description="Get how often species were reported in a region over a range of days (up to a year), as a compact daily time series of presence and counts. Without speciesCode, returns the most frequently reported species.",
+)
+async def ebird_species_frequency(
+    regionCode: str,
+    speciesCode: str | None = None,
+    back: int | None = None,
+    endDate: str | None = None,
+    limit: int | None = None,
+) -> dict[str, Any]:
+    """Get how often species were reported over a range of days.
+
+    Each day comes from the local archive when available; other days are
+    fetched concurrently and archived. Days that cannot be fetched are
+    listed and left out of the frequency.
+
+    :param regionCode: The regional code.
+    :param speciesCode: Species codes to report on (comma-separated).
+    :param back: Number of days, ending on endDate (1-365, default 30).
+    :param endDate: Last day (YYYY-MM-DD), default and at most yesterday.
+    :param limit: Number of species to return when speciesCode is omitted (default 20).
+    """
+    log(
+        f"Received ebird_species_frequency request for region: {regionCode}, species: {speciesCode}, back: {back}"
+    )
+    back = back or 30
+    if not 1 <= back <= 365:
+        raise ValueError("back must be between 1 and 365 days")
+    yesterday = date.today() - timedelta(days=1)
+    # Days from today on have no complete historic data yet.
+    end = min(date.fromisoformat(endDate), yesterday) if endDate else yesterday
+    start = end - timedelta(days=back - 1)
+    species_codes = [c.strip() for c in speciesCode.split(",") if c.strip()] if speciesCode else None
+
+    frequency = SpeciesFrequency(start, back, species_codes)
+    days, errors = await historic_days(ebird, archive, regionCode, start, end)
+    for day, records in days:
+        frequency.add((day - start).days, records)
+    for day in errors:
+        frequency.mark_missing((day - start).days)
+    data = {
+        "regionCode": regionCode,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "days": back,
+        "species": [
+            frequency.series(code)
+            for code in (species_codes or frequency.ranked(limit or 20))
+        ],
+    }
+    if errors:
+        data["errors"] = {day.isoformat(): str(error) for day, error in sorted(errors.items())}
+    return tool_result("frequency", data, format_species_frequency)
 
 
 # product
-@mcp.tool(
+@tool(
     name="ebird_get_top100",
     description="Get the top 100 contributors on a given date for a country or region.",
 )
@@ -481,7 +1353,7 @@ async def ebird_get_top100(
     year: int,
     month: int,
     day: int,
-) -> dict:
+) -> dict[str, Any]:
     """1. Get the top 100 contributors on a given date for a country or region.
 
     :param regionCode: The regional code.
@@ -493,27 +1365,29 @@ async def ebird_get_top100(
         f"Received ebird_get_top100 request for region: {regionCode}, date: {year}-{month}-{day}"
     )
     data = await ebird.get_top100(regionCode, year, month, day)
-    return {"content": [{"type": "text", "text": format_observations(data)}]}
+    return tool_result("contributors", data, format_observations)
 
 
-@mcp.tool(
+@tool(
     name="ebird_get_recent_checklists_feed",
     description="Get information on the most recently submitted checklists for a region.",
 )
 async def ebird_get_recent_checklists_feed(
     regionCode: str,
-) -> dict:
+    prefetch: int | None = None,
+) -> dict[str, Any]:
     """2. Get information on the most recently submitted checklists for a region.
 
     :param regionCode: The regional code.
+    :param prefetch: Fetch the details of this many of the first checklists in the background.
     """
     log(f"Received ebird_get_recent_checklists_feed request for region: {regionCode}")
     data = await ebird.get_recent_checklists_feed(regionCode)
-    return {"content": [{"type": "text", "text": format_checklists(data)}]
-}
+    prefetch_checklists(data, prefetch)
+    return tool_result("checklists", data, format_checklists)
 
 
-@mcp.tool(
+@tool(
     name="ebird_get_checklist_feed_on_date",
     description="Get information on the checklists submitted on a given date for a country or region.",
 )
@@ -522,22 +1396,32 @@ async def ebird_get_checklist_feed_on_date(
     year: int,
     month: int,
     day: int,
-) -> dict:
+    maxResults: int | None = None,
+    prefetch: int | None = None,
+) -> dict[str, Any]:
     """3. Get information on the checklists submitted on a given date for a country or region.
 
     :param regionCode: The regional code.
     :param year: Year (e.g., 2023).
     :param month: Month (1-12).
     :param day: Day (1-31).
+    :param maxResults: Maximum number of checklists (1-200, default 10).
+    :param prefetch: Fetch the details of this many of the first checklists in the background.
     """
     log(
         f"Received ebird_get_checklist_feed_on_date request for region: {regionCode}, date: {year}-{month}-{day}"
     )
-    data = await ebird.get_checklist_feed_on_date(regionCode, year, month, day)
-    return {"content": [{"type": "text", "text": format_checklists(data)}]}
+    data = archive.checklists(regionCode, date(year, month, day), max_results=maxResults or 10)
+    if data is None:
+        options = {"maxResults": maxResults} if maxResults is not None else {}
+        data = await ebird.get_checklist_feed_on_date(regionCode, year, month, day, options)
+    else:
+        log(f"Serving checklist feed for {regionCode} from the archive")
+    prefetch_checklists(data, prefetch)
+    return tool_result("checklists", data, format_checklists)
 
 
-@mcp.tool(
+@tool(
     name="ebird_get_regional_statistics_on_date",
     description="Get a summary of the number of checklist submitted, species seen and contributors on a given date for a country or region.",
 )
@@ -546,7 +1430,7 @@ async def ebird_get_regional_statistics_on_date(
     year: int,
     month: int,
     day: int,
-) -> dict:
+) -> dict[str, Any]:
     """4. Get a summary of the number of checklist submitted, species seen and contributors on a given date for a country or region.
 
     :param regionCode: The regional code.
@@ -558,60 +1442,96 @@ async def ebird_get_regional_statistics_on_date(
         f"Received ebird_get_regional_statistics_on_date request for region: {regionCode}, date: {year}-{month}-{day}"
     )
     data = await ebird.get_regional_statistics_on_date(regionCode, year, month, day)
-    return {"content": [{"type": "text", "text": format_regional_statistics(data)}]}
+    return tool_result("stats", data, format_regional_statistics)
 
 
-@mcp.tool(
+@tool(
     name="ebird_get_species_list_for_region",
     description="Get a list of species codes ever seen in a region, in taxonomic order (species taxa only)",
 )
 async def ebird_get_species_list_for_region(
     regionCode: str,
-) -> dict:
+) -> dict[str, Any]:
     """5. Get a list of species codes ever seen in a region, in taxonomic order (species taxa only)
 
     :param regionCode: The regional code.
     """
     log(f"Received ebird_get_species_list_for_region request for region: {regionCode}")
     data = await ebird.get_species_list_for_region(regionCode)
-    return {"content": [{"type": "text", "text": format_species_list(data)}]}
+    return tool_result("speciesCodes", data, format_species_list)
 
 
-@mcp.tool(
+@tool(
     name="ebird_get_checklist_details",
     description="Get the details and observations of a checklist.",
 )
 async def ebird_get_checklist_details(
     checklistId: str,
-) -> dict:
+) -> dict[str, Any]:
     """6. Get the details and observations of a checklist.
 
     :param checklistId: The ID of the checklist (e.g., S12345678).
     """
     log(f"Received ebird_get_checklist_details request for checklist: {checklistId}")
-    data = await ebird.get_checklist(checklistId)
-    return {"content": [{"type": "text", "text": format_checklist(data)}]}
+    data = checklists.get(checklistId)
+    if data is None:
+        data = await ebird.get_checklist(checklistId)
+        if data:
+            checklists.put_many({checklistId: data})
+    return tool_result("checklist", data, format_checklist, lambda d: parse_checklist(d).to_dict())
+
+
+@tool(
+    name="ebird_get_checklists",
+    description="Get the details and observations of several checklists at once.",
+)
+async def ebird_get_checklists(
+    checklistIds: list[str],
+    maxConcurrency: int | None = None,
+) -> dict[str, Any]:
+    """6b. Get the details and observations of several checklists.
+
+    :param checklistIds: The IDs of the checklists (e.g., ['S12345678', 'S12345679']).
+    :param maxConcurrency: Maximum number of checklists fetched at once.
+    """
+    log(f"Received ebird_get_checklists request for checklists: {checklistIds}")
+    data = await checklists.fetch(ebird, checklistIds, maxConcurrency or 8)
+    errors = data["errors"]
+    result = tool_result(
+        "checklists",
+        data["checklists"],
+        format_checklists,
+        lambda records: [parse_checklist(r).to_dict() for r in records],
+    )
+    if errors and EBIRD_STRUCTURED_OUTPUT:
+        result["errors"] = errors
+    elif errors:
+        failed = "\n".join(f"- {sub_id}: {error}" for sub_id, error in errors.items())
+        result["content"][0]["text"] += f"\n\nFailed checklists:\n{failed}"
+    return result
 
 
 # ref/geo
-@mcp.tool(
+@tool(
     name="ebird_get_adjacent_regions",
     description="With the ref/geo end-point you can find a country's or region's neighbours.",
 )
 async def ebird_get_adjacent_regions(
     regionCode: str,
-) -> dict:
+) -> dict[str, Any]:
     """1. With the ref/geo end-point you can find a country's or region's neighbours.
 
     :param regionCode: The regional code.
     """
     log(f"Received ebird_get_adjacent_regions request for region: {regionCode}")
-    data = await ebird.get_adjacent_regions(regionCode)
-    return {"content": [{"type": "text", "text": format_regions(data)}]}
+    # Through the region graph, so the neighbours are known to the hotspot index.
+    distances = await regions.neighbors(ebird, regionCode, 1)
+    data = [{"code": code, "name": regions.name(code)} for code in distances]
+    return tool_result("regions", data, format_regions)
 
 
 # ref/hotspot
-@mcp.tool(
+@tool(
     name="ebird_get_hotspots",
     description="Get the list of birding hotspots in a region.",
 )
@@ -619,24 +1539,44 @@ async def ebird_get_hotspots(
     regionCode: str,
     back: int | None = None,
     includeProvisional: bool | None = None,
-) -> dict:
+    pageSize: int | None = None,
+    offset: int | None = None,
+    cursor: str | None = None,
+) -> dict[str, Any]:
     """1. Get the list of birding hotspots in a region.
 
     :param regionCode: The regional code.
     :param back: Days back to consider for recent sightings.
     :param includeProvisional: Include provisional data.
+    :param pageSize: Number of records per page.
+    :param offset: Index of the first record to return.
+    :param cursor: Cursor from a previous page; other arguments are then ignored.
     """
     log(f"Received ebird_get_hotspots request for region: {regionCode}")
     options = {
         k: v
         for k, v in locals().items()
-        if k not in ["regionCode", "log"] and v is not None
+        if k not in ["regionCode", "log", *PAGING_ARGS] and v is not None
     }
-    data = await ebird.get_hotspots(regionCode, options)
-    return {"content": [{"type": "text", "text": format_hotspots(data)}]}
 
+    async def fetch():
+        data = await ebird.get_hotspots(regionCode, options)
+        if isinstance(data, list) and includeProvisional is not False:
+            hotspot_index.add_region(regionCode, data, back=back or 14)
+        return data
+
+    return await paged_result(
+        "hotspots",
+        fetch,
+        format_hotspots,
+        hotspot_records,
+        pageSize,
+        offset,
+        cursor,
+    )
 
-@mcp.tool(
+
+@tool(
     name="ebird_get_nearby_hotspots",
     description="Get the list of hotspots, within a radius of up to 50 kilometers, from a given set of coordinates.",
 )
@@ -645,42 +1585,98 @@ async def ebird_get_nearby_hotspots(
     lng: float,
     dist: int | None = None,
     back: int | None = None,
-) -> dict:
+    pageSize: int | None = None,
+    offset: int | None = None,
+    cursor: str | None = None,
+) -> dict[str, Any]:
     """2. Get the list of hotspots, within a radius of up to 50 kilometers, from a given set of coordinates.
 
     :param lat: Latitude.
     :param lng: Longitude.
     :param dist: Distance in kilometers.
     :param back: Days back to consider.
+    :param pageSize: Number of records per page.
+    :param offset: Index of the first record to return.
+    :param cursor: Cursor from a previous page; other arguments are then ignored.
     """
     log(f"Received ebird_get_nearby_hotspots request for lat: {lat}, lng: {lng}")
     options = {
         k: v
         for k, v in locals().items()
-        if k not in ["lat", "lng", "log"] and v is not None
+        if k not in ["lat", "lng", "log", *PAGING_ARGS] and v is not None
     }
-    data = await ebird.get_nearby_hotspots(lat, lng, options)
-    return {"content": [{"type": "text", "text": format_hotspots(data)}]}
+
+    async def fetch():
+        local = local_nearby_hotspots(lat, lng, dist or 25, back or 14)
+        if local is not None:
+            log("Serving nearby hotspots from the hotspot index")
+            return [hotspot for _, hotspot in local]
+        return await ebird.get_nearby_hotspots(lat, lng, options)
+
+    return await paged_result(
+        "hotspots",
+        fetch,
+        format_hotspots,
+        hotspot_records,
+        pageSize,
+        offset,
+        cursor,
+    )
 
 
-@mcp.tool(
+@tool(
+    name="ebird_get_nearest_hotspots",
+    description="Get the hotspots closest to a given set of coordinates (within 50 kilometers), nearest first.",
+)
+async def ebird_get_nearest_hotspots(
+    lat: float,
+    lng: float,
+    count: int | None = None,
+    back: int | None = None,
+) -> dict[str, Any]:
+    """2b. Get the hotspots closest to a given set of coordinates.
+
+    Answered from hotspot lists already fetched with ebird_get_hotspots when
+    they cover the area, otherwise from a 50 km nearby query.
+
+    :param lat: Latitude.
+    :param lng: Longitude.
+    :param count: Number of hotspots to return (default 10).
+    :param back: Only hotspots visited within this many days (default 14).
+    """
+    log(f"Received ebird_get_nearest_hotspots request for lat: {lat}, lng: {lng}")
+    count, back = count or 10, back or 14
+    found = hotspot_index.nearest(lat, lng, count, back)
+    radius = found[-1][0] if len(found) == count else 50
+    if local_nearby_hotspots(lat, lng, radius, back) is None:
+        data = await ebird.get_nearby_hotspots(lat, lng, {"dist": 50, "back": back})
+        found = sorted(
+            ((haversine(lat, lng, h["lat"], h["lng"]), h) for h in data or [] if "lat" in h),
+            key=lambda item: item[0],
+        )[:count]
+    else:
+        log("Serving nearest hotspots from the hotspot index")
+    return tool_result("hotspots", [h for _, h in found], format_hotspots, hotspot_records)
+
+
+@tool(
     name="ebird_get_hotspot_info",
     description="Get information on the location of a hotspot.",
 )
 async def ebird_get_hotspot_info(
     locId: str,
-) -> dict:
+) -> dict[str, Any]:
     """3. Get information on the location of a hotspot.
 
     :param locId: The location ID of the hotspot.
     """
     log(f"Received ebird_get_hotspot_info request for hotspot: {locId}")
     data = await ebird.get_hotspot_info(locId)
-    return {"content": [{"type": "text", "text": format_hotspot_info(data)}]}
+    return tool_result("hotspot", data, format_hotspot_info)
 
 
 # ref/taxonomy
-@mcp.tool(
+@tool(
     name="ebird_get_taxonomy",
     description="Get the taxonomy used by eBird.",
 )
@@ -688,66 +1684,91 @@ async def ebird_get_taxonomy(
     locale: str | None = None,
     cat: str | None = None,
     fmt: str | None = None,
-) -> dict:
+    speciesCode: str | None = None,
+    pageSize: int | None = None,
+    offset: int | None = None,
+    cursor: str | None = None,
+) -> dict[str, Any]:
     """1. Get the taxonomy used by eBird.
 
+    JSON requests are answered from the local taxonomy store, which is
+    downloaded once per taxonomy version.
+
     :param locale: Language for common names.
-    :param cat: Taxonomic category.
+    :param cat: Taxonomic category, or a comma-separated list of categories.
     :param fmt: Format (json or csv).
+    :param speciesCode: Only return these species codes (comma-separated).
+    :param pageSize: Number of taxa per page (JSON only).
+    :param offset: Index of the first taxon to return (JSON only).
+    :param cursor: Cursor from a previous page; other arguments are then ignored.
     """
     log(
-        f"Received ebird_get_taxonomy request with args: locale={locale}, cat={cat}, fmt={fmt}"
+        f"Received ebird_get_taxonomy request with args: locale={locale}, cat={cat}, fmt={fmt}, speciesCode={speciesCode}"
     )
-    options = {k: v for k, v in locals().items() if k not in ["log"] and v is not None}
-    data = await ebird.get_taxonomy(options)
-    return {"content": [{"type": "text", "text": format_taxonomy(data)}]}
+    if fmt not in (None, "json"):
+        options = {"locale": locale, "cat": cat, "fmt": fmt}
+        options = {k: v for k, v in options.items() if v is not None}
+        data = await ebird.get_taxonomy(options)
+        if isinstance(data, str):
+            return tool_result("text", data, str)
+        return tool_result("taxa", data, format_taxonomy)
+
+    async def fetch():
+        await taxonomy.ensure(ebird, locale or "en")
+        return taxonomy.taxa(
+            locale or "en",
+            categories=(cat or "species").split(","),
+            species_codes=speciesCode.split(",") if speciesCode else None,
+        )
+
+    return await paged_result("taxa", fetch, format_taxonomy, None, pageSize, offset, cursor)
 
 
-@mcp.tool(
+@tool(
     name="ebird_get_taxonomy_forms",
     description="For a species, get the list of subspecies recognised in the taxonomy. The results include the species that was passed in.",
 )
 async def ebird_get_taxonomy_forms(
     speciesCode: str,
-) -> dict:
+) -> dict[str, Any]:
     """2. For a species, get the list of subspecies recognised in the taxonomy. The results include the species that was passed in.
 
     :param speciesCode: The eBird code for the species.
     """
     log(f"Received ebird_get_taxonomy_forms request for species: {speciesCode}")
     data = await ebird.get_taxonomy_forms(speciesCode)
-    return {"content": [{"type": "text", "text": format_taxonomy_forms(data)}]}
+    return tool_result("speciesCodes", data, format_taxonomy_forms)
 
 
-@mcp.tool(
+@tool(
     name="ebird_get_taxa_locale_codes",
     description="Returns the list of supported locale codes and names for species common names, with the last time they were updated. Use the accept-language header to get translated language names when available.",
 )
-async def ebird_get_taxa_locale_codes() -> dict:
+async def ebird_get_taxa_locale_codes() -> dict[str, Any]:
     """3. Returns the list of supported locale codes and names for species common names, with the last time they were updated. Use the accept-language header to get translated language names when available."""
     log(f"Received ebird_get_taxa_locale_codes request")
     data = await ebird.get_taxa_locale_codes()
-    return {"content": [{"type": "text", "text": format_taxa_locale_codes(data)}]}
+    return tool_result("locales", data, format_taxa_locale_codes)
 
 
-@mcp.tool(
+@tool(
     name="ebird_get_taxonomy_versions",
     description="Returns a list of all versions of the taxonomy, with a flag indicating which is the latest.",
 )
-async def ebird_get_taxonomy_versions() -> dict:
+async def ebird_get_taxonomy_versions() -> dict[str, Any]:
     """4. Returns a list of all versions of the taxonomy, with a flag indicating which is the latest."""
     log(f"Received ebird_get_taxonomy_versions request")
     data = await ebird.get_taxonomy_versions()
-    return {"content": [{"type": "text", "text": format_taxonomy_versions(data)}]}
+    return tool_result("versions", data, format_taxonomy_versions)
 
 
-@mcp.tool(
+@tool(
     name="ebird_get_taxonomic_groups",
     description="Get the list of species groups, e.g. terns, finches, etc.",
 )
 async def ebird_get_taxonomic_groups(
     speciesGrouping: str,
-) -> dict:
+) -> dict[str, Any]:
     """5. Get the list of species groups, e.g. terns, finches, etc.
 
     :param speciesGrouping: The species grouping (e.g., 'birds').
@@ -756,34 +1777,56 @@ async def ebird_get_taxonomic_groups(
         f"Received ebird_get_taxonomic_groups request for species grouping: {speciesGrouping}"
     )
     data = await ebird.get_taxonomic_groups(speciesGrouping)
-    return {"content": [{"type": "text", "text": format_taxonomic_groups(data)}]}
+    return tool_result("groups", data, format_taxonomic_groups)
+
+
+@tool(
+    name="ebird_resolve_species",
+    description="Find eBird species codes by fuzzy matching a common or scientific name, in any configured locale. Use this to get the speciesCode needed by other tools.",
+)
+async def ebird_resolve_species(
+    name: str,
+    locale: str | None = None,
+    limit: int | None = None,
+) -> dict[str, Any]:
+    """6. Find eBird species codes by fuzzy matching a common or scientific name.
+
+    :param name: Common or scientific name, or part of it (e.g., 'spoonbill').
+    :param locale: Only match common names in this locale (e.g., 'zh').
+    :param limit: Maximum number of matches to return.
+    """
+    log(f"Received ebird_resolve_species request for name: {name}, locale: {locale}")
+    locales = await taxonomy_locales(locale)
+    await asyncio.gather(*(taxonomy.ensure(ebird, code) for code in locales))
+    matches = taxonomy.search(name, locales=locales, limit=limit or 10)
+    return tool_result("matches", matches, format_species_matches, species_match_records)
 
 
 # ref/region
-@mcp.tool(
+@tool(
     name="ebird_get_region_info",
     description="Get information on the name and geographical area covered by a region.",
 )
 async def ebird_get_region_info(
     regionCode: str,
-) -> dict:
+) -> dict[str, Any]:
     """1. Get information on the name and geographical area covered by a region.
 
     :param regionCode: The regional code.
     """
     log(f"Received ebird_get_region_info request for region: {regionCode}")
     data = await ebird.get_region_info(regionCode)
-    return {"content": [{"type": "text", "text": format_region_info(data)}]}
+    return tool_result("region", data, format_region_info)
 
 
-@mcp.tool(
+@tool(
     name="ebird_get_sub_region_list",
     description="Get the list of sub-regions for a given country or region.",
 )
 async def ebird_get_sub_region_list(
     regionType: str,
     parentRegionCode: str,
-) -> dict:
+) -> dict[str, Any]:
     """2. Get the list of sub-regions for a given country or region.
 
     :param regionType: The type of region (e.g., 'country', 'state').
@@ -793,8 +1836,175 @@ async def ebird_get_sub_region_list(
         f"Received ebird_get_sub_region_list request for region type: {regionType}, parent region: {parentRegionCode}"
     )
     data = await ebird.get_sub_region_list(regionType, parentRegionCode)
-    return {"content": [{"type": "text", "text": format_regions(data)}]}
+    return tool_result("regions", data, format_regions)
+
+
+@tool(
+    name="ebird_get_region_tree",
+    description="Get every sub-region below a country or state, e.g. all counties within US-NY or all states and counties within US. The hierarchy is cached locally after the first call.",
+)
+async def ebird_get_region_tree(
+    regionCode: str,
+    regionType: str | None = None,
+) -> dict[str, Any]:
+    """3. Get every sub-region below a country or state.
+
+    :param regionCode: The regional code of the root region (e.g., 'US' or 'US-NY').
+    :param regionType: Only return regions of this type ('subnational1' or 'subnational2').
+    """
+    log(f"Received ebird_get_region_tree request for region: {regionCode}, type: {regionType}")
+    await regions.expand(ebird, regionCode)
+    codes = regions.descendants(regionCode, regionType)
+    data = [{"code": code, "name": regions.name(code)} for code in codes]
+    return tool_result("regions", data, format_regions)
+
+
+@tool(
+    name="ebird_get_regions_within_hops",
+    description="Get the regions within a number of adjacency hops of a region, e.g. neighbours of neighbours. Adjacency is cached locally after the first call.",
+)
+async def ebird_get_regions_within_hops(
+    regionCode: str,
+    hops: int | None = None,
+) -> dict[str, Any]:
+    """4. Get the regions within a number of adjacency hops of a region.
+
+    :param regionCode: The regional code.
+    :param hops: Number of adjacency hops (default 1).
+    """
+    log(f"Received ebird_get_regions_within_hops request for region: {regionCode}, hops: {hops}")
+    distances = await regions.neighbors(ebird, regionCode, hops or 1)
+    data = [
+        {"code": code, "name": regions.name(code), "hops": hop}
+        for code, hop in distances.items()
+    ]
+    return tool_result("regions", data, format_region_hops)
+
+
+
+# metrics
+@tool(
+    name="ebird_get_metrics",
+    description="Get the server's request metrics: per-tool and per-endpoint latency, eBird API status codes, cache hit ratios, requests in flight and bytes received.",
+)
+async def ebird_get_metrics() -> dict[str, Any]:
+    """1. Get the server's request metrics.
+
+    Text output is in the Prometheus exposition format.
+    """
+    log("Received ebird_get_metrics request")
+    return tool_result(
+        "metrics",
+        metrics,
+        lambda registry: registry.render(),
+        lambda registry: registry.snapshot(),
+    )
+
+
+# --- HTTP transport ---
+
+
+@mcp.custom_route("/healthz", methods=["GET"])
+async def healthz(request: Request) -> JSONResponse:
+    """Liveness: the worker is serving requests."""
+    return JSONResponse({"status": "ok", "pid": os.getpid()})
+
+
+@mcp.custom_route("/readyz", methods=["GET"])
+async def readyz(request: Request) -> JSONResponse:
+    """
+    Readiness: the worker has started up and is not shutting down. Also
+    reports the eBird circuit breaker and warm-up state.
+    """
+    return JSONResponse(
+        {
+            "status": "ready" if ready else "unavailable",
+            "pid": os.getpid(),
+            "circuit": ebird.circuit_breaker.state,
+            "warmup": warmup.state,
+        },
+        status_code=200 if ready else 503,
+    )
+
+
+def http_app(transport: str | None = None):
+    """
+    Return the ASGI app for the "streamable-http" or "sse" transport
+    (default EBIRD_TRANSPORT). uvicorn calls this in each worker process,
+    so every worker has its own pooled client and in-memory caches.
+
+    Sessions live in the worker that created them, so with several workers
+    the streamable HTTP transport runs stateless.
+    """
+    global serving_http
+    transport = transport or EBIRD_TRANSPORT
+    serving_http = True
+    if transport == "sse":
+        app = mcp.sse_app()
+    else:
+        mcp.settings.stateless_http = EBIRD_WORKERS > 1
+        app = mcp.streamable_http_app()
+    transport_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def app_lifespan(app):
+        global ready
+        async with resources(), transport_lifespan(app):
+            ready = True
+            try:
+                yield
+            finally:
+                ready = False
+
+    app.router.lifespan_context = app_lifespan
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="eBird MCP server.")
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "streamable-http", "sse"],
+        default=EBIRD_TRANSPORT,
+        help="stdio for a single client, or HTTP for a shared service.",
+    )
+    parser.add_argument("--host", default=EBIRD_HOST, help="Address to listen on over HTTP.")
+    parser.add_argument("--port", type=int, default=EBIRD_PORT, help="Port to listen on over HTTP.")
+    parser.add_argument(
+        "--workers", type=int, default=EBIRD_WORKERS, help="Worker processes over HTTP."
+    )
+    args = parser.parse_args(argv)
+    if args.transport == "stdio":
+        mcp.run()
+        return
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.transport == "sse" and args.workers > 1:
+        parser.error("the sse transport keeps sessions in one process; use streamable-http")
+
+    import uvicorn
+
+    if args.workers == EBIRD_WORKERS == 1:
+        # Serve from this process rather than importing the module a second time.
+        uvicorn.run(
+            http_app(args.transport),
+            host=args.host,
+            port=args.port,
+            timeout_graceful_shutdown=EBIRD_SHUTDOWN_TIMEOUT,
+        )
+        return
+    # Workers import this module afresh and read their settings from the environment.
+    os.environ["EBIRD_TRANSPORT"] = args.transport
+    os.environ["EBIRD_WORKERS"] = str(args.workers)
+    uvicorn.run(
+        "server:http_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=EBIRD_SHUTDOWN_TIMEOUT,
+    )
 
 
 if __name__ == "__main__":
-    mcp.run()
+    main()
@@ -0,0 +1,395 @@
+import asyncio
+import heapq
+from bisect import bisect_left
+import json
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from operator import itemgetter
+
+DAY = 24 * 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS taxonomy_meta (
+    locale TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    checked_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS taxa (
+    locale TEXT NOT NULL,
+    speciesCode TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (locale, speciesCode)
+) WITHOUT ROWID;
+"""
+
+
+def latest_version(versions):
+    """
+    Return the latest taxonomy version reported by the versions endpoint.
+    """
+    for v in versions or []:
+        if v.get("latest"):
+            return str(v.get("authorityVer", v.get("version")))
+    return None
+
+
+def normalize_name(name):
+    return " ".join(name.casefold().split())
+
+
+def fold_name(name):
+    """
+    Fold a name for fuzzy matching: strip accents, case and punctuation.
+    """
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    chars = [
+        c if c.isalnum() else " "
+        for c in decomposed
+        if not unicodedata.combining(c)
+    ]
+    return " ".join("".join(chars).split())
+
+
+def trigrams(word):
+    padded = f" {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+# Scripts written without spaces between words: Thai, kana, CJK ideographs
+# and Hangul syllables.
+UNSEGMENTED = re.compile(
+    "[\u0e00-\u0e7f\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af\uf900-\ufaff\U00020000-\U0002ffff]"
+)
+
+
+def unsegmented(word):
+    """
+    Whether a word is in a script without word breaks, so that a whole name
+    is one word and queries are often a part of it.
+    """
+    return UNSEGMENTED.search(word) is not None
+
+
+def bigrams(word):
+    return {word[i : i + 2] for i in range(len(word) - 1)}
+
+
+class NameIndex:
+    """
+    Word-level fuzzy index over the names of one locale's taxa.
+
+    Each taxon is indexed by common name, scientific name and species code.
+    Query words are matched against the vocabulary of indexed words by
+    prefix (sorted list + bisect) and by trigram similarity, then the
+    matching names are ranked by how well every query word matched. Words
+    in scripts without word breaks (Chinese, Japanese, Korean, Thai) are
+    also indexed by character bigrams, so any part of such a name matches.
+    """
+
+    __slots__ = (
+        "_entries",
+        "_exact",
+        "_vocabulary",
+        "_words",
+        "_word_ids",
+        "_postings",
+        "_grams",
+        "_bigrams",
+    )
+
+    MAX_PREFIX_WORDS = 64
+    MAX_FUZZY_WORDS = 16
+    MIN_SIMILARITY = 0.5
+    SUBSTRING_SIMILARITY = 0.8
+
+    def __init__(self, taxa):
+        self._entries = []
+        self._exact = defaultdict(list)
+        self._word_ids = {}
+        self._postings = []
+        for taxon in taxa:
+            for field in ("comName", "sciName", "speciesCode"):
+                value = taxon.get(field)
+                if not value:
+                    continue
+                folded = fold_name(value)
+                words = folded.split()
+                entry_id = len(self._entries)
+                self._entries.append((folded, len(words), taxon))
+                self._exact[folded].append(entry_id)
+                for word in set(words):
+                    word_id = self._word_ids.setdefault(word, len(self._word_ids))
+                    if word_id == len(self._postings):
+                        self._postings.append([])
+                    self._postings[word_id].append(entry_id)
+        self._words = list(self._word_ids)
+        self._vocabulary = sorted(self._words)
+        self._grams = defaultdict(list)
+        self._bigrams = defaultdict(set)
+        for word_id, word in enumerate(self._words):
+            for gram in trigrams(word):
+                self._grams[gram].append(word_id)
+            if unsegmented(word):
+                for gram in bigrams(word):
+                    self._bigrams[gram].add(word_id)
+
+    def _match_word(self, token):
+        """
+        Return ``{word_id: similarity}`` for vocabulary words matching a token.
+        """
+        matches = {}
+        i = bisect_left(self._vocabulary, token)
+        end = min(len(self._vocabulary), i + self.MAX_PREFIX_WORDS)
+        while i < end and self._vocabulary[i].startswith(token):
+            word = self._vocabulary[i]
+            matches[self._word_ids[word]] = 1.0 if word == token else 0.9
+            i += 1
+
+        if len(token) > 1 and unsegmented(token):
+            # Words holding every bigram of the token, then the ones that
+            # contain it in order.
+            postings = sorted((self._bigrams.get(gram, set()) for gram in bigrams(token)), key=len)
+            for word_id in postings[0].intersection(*postings[1:]):
+                if word_id not in matches and token in self._words[word_id]:
+                    matches[word_id] = self.SUBSTRING_SIMILARITY
+
+        token_grams = trigrams(token)
+        counts = Counter()
+        for gram in token_grams:
+            word_ids = self._grams.get(gram)
+            if word_ids:
+                counts.update(word_ids)
+        for word_id, shared in counts.most_common(self.MAX_FUZZY_WORDS):
+            if word_id in matches:
+                continue
+            word = self._words[word_id]
+            similarity = 2 * shared / (len(token_grams) + len(word) + 1)
+            if similarity >= self.MIN_SIMILARITY:
+                matches[word_id] = similarity
+        return matches
+
+    def search(self, query, limit=10):
+        """
+        Return up to ``limit`` ``(score, taxon)`` pairs, best first.
+        """
+        folded = fold_name(query)
+        tokens = folded.split()
+        if not tokens:
+            return []
+
+        totals = defaultdict(float)
+        for token in tokens:
+            best = {}
+            for word_id, similarity in self._match_word(token).items():
+                for entry_id in self._postings[word_id]:
+                    if similarity > best.get(entry_id, 0.0):
+                        best[entry_id] = similarity
+            for entry_id, similarity in best.items():
+                totals[entry_id] += similarity
+
+        # Scores only add small bonuses to the token total, so ranking the
+        # best totals first avoids scoring every loosely matching name.
+        candidates = heapq.nlargest(limit * 8, totals.items(), key=itemgetter(1))
+        candidates.extend((entry_id, totals[entry_id]) for entry_id in self._exact.get(folded, ()))
+
+        ranked = {}
+        for entry_id, total in candidates:
+            name, word_count, taxon = self._entries[entry_id]
+            score = total / max(len(tokens), word_count)
+            if name == folded:
+                score += 1.0
+            elif name.startswith(folded):
+                score += 0.25
+            code = taxon["speciesCode"]
+            if score > ranked.get(code, (0.0, None))[0]:
+                ranked[code] = (score, taxon)
+        return heapq.nlargest(limit, ranked.values(), key=lambda item: item[0])
+
+
+class LocaleTaxonomy:
+    """
+    In-memory indexes over the taxonomy for one locale.
+    """
+
+    __slots__ = ("version", "taxa", "by_code", "by_sci_name", "by_com_name", "_name_index")
+
+    def __init__(self, version, taxa):
+        self.version = version
+        self.taxa = sorted(taxa, key=lambda t: t.get("taxonOrder") or 0)
+        self.by_code = {}
+        self.by_sci_name = {}
+        self.by_com_name = {}
+        for taxon in self.taxa:
+            self.by_code[taxon["speciesCode"]] = taxon
+            if taxon.get("sciName"):
+                self.by_sci_name.setdefault(normalize_name(taxon["sciName"]), taxon)
+            if taxon.get("comName"):
+                self.by_com_name.setdefault(normalize_name(taxon["comName"]), taxon)
+        self._name_index = None
+
+    @property
+    def name_index(self):
+        if self._name_index is None:
+            self._name_index = NameIndex(self.taxa)
+        return self._name_index
+
+
+class TaxonomyStore:
+    """
+    Local copy of the eBird taxonomy persisted in SQLite.
+
+    Each locale is downloaded once per taxonomy version and refreshed only
+    when ``get_taxonomy_versions`` reports a new latest version (checked at
+    most every ``check_interval`` seconds). Lookups use in-memory dicts built
+    from the stored rows, so they never touch the network.
+    """
+
+    def __init__(self, path=":memory:", check_interval=DAY, clock=time.time):
+        self.path = path
+        self.check_interval = check_interval
+        self.clock = clock
+        self._conn = None
+        self._locales = {}
+        self._checked_at = {}
+        self._locks = {}
+
+    def _db(self):
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @property
+    def locales(self):
+        return list(self._locales)
+
+    def version(self, locale="en"):
+        loaded = self._locales.get(locale)
+        return loaded.version if loaded else None
+
+    async def ensure(self, client, locale="en"):
+        """
+        Make sure the taxonomy for ``locale`` is loaded and current.
+        """
+        if self._is_fresh(locale):
+            return self._locales[locale]
+        async with self._locks.setdefault(locale, asyncio.Lock()):
+            if self._is_fresh(locale):
+                return self._locales[locale]
+
+            row = self._db().execute(
+                "SELECT version, checked_at FROM taxonomy_meta WHERE locale = ?", (locale,)
+            ).fetchone()
+            now = self.clock()
+            if row is not None and now - row[1] < self.check_interval:
+                self._load(locale, row[0])
+                self._checked_at[locale] = row[1]
+                return self._locales[locale]
+
+            latest = latest_version(await client.get_taxonomy_versions())
+            if row is not None and (latest is None or latest == row[0]):
+                self._touch(locale, row[0], now)
+                self._load(locale, row[0])
+                return self._locales[locale]
+
+            # Stream the ~17k taxa so the raw body is never held in memory.
+            taxa = [
+                taxon
+                async for taxon in client.stream_taxonomy({"locale": locale, "cat": None})
+            ]
+            self._save(locale, latest or "unknown", taxa, now)
+            self._locales[locale] = LocaleTaxonomy(latest or "unknown", taxa)
+            self._checked_at[locale] = now
+            return self._locales[locale]
+
+    def get(self, species_code, locale="en"):
+        return self._locales[locale].by_code.get(species_code)
+
+    def get_by_sci_name(self, sci_name, locale="en"):
+        return self._locales[locale].by_sci_name.get(normalize_name(sci_name))
+
+    def get_by_common_name(self, com_name, locale="en"):
+        return self._locales[locale].by_com_name.get(normalize_name(com_name))
+
+    def taxa(self, locale="en", categories=None, species_codes=None):
+        """
+        Return taxa for a locale, optionally filtered by category and code.
+        """
+        loaded = self._locales[locale]
+        if species_codes:
+            taxa = [loaded.by_code[c] for c in species_codes if c in loaded.by_code]
+        else:
+            taxa = loaded.taxa
+        if categories:
+            wanted = set(categories)
+            taxa = [t for t in taxa if t.get("category") in wanted]
+        return taxa
+
+    def search(self, query, locales=None, limit=10):
+        """
+        Fuzzy-match a name against the loaded locales.
+
+        Returns up to ``limit`` ``(score, locale, taxon)`` tuples, best first,
+        with one entry per species code.
+        """
+        best = {}
+        for locale in locales or self._locales:
+            loaded = self._locales.get(locale)
+            if loaded is None:
+                continue
+            for score, taxon in loaded.name_index.search(query, limit):
+                code = taxon["speciesCode"]
+                if score > best.get(code, (0.0,))[0]:
+                    best[code] = (score, locale, taxon)
+        return heapq.nlargest(limit, best.values(), key=lambda item: item[0])
+
+    def _is_fresh(self, locale):
+        checked_at = self._checked_at.get(locale)
+        return (
+            locale in self._locales
+            and checked_at is not None
+            and self.clock() - checked_at < self.check_interval
+        )
+
+    def _load(self, locale, version):
+        if locale in self._locales and self._locales[locale].version == version:
+            return
+        rows = self._db().execute("SELECT data FROM taxa WHERE locale = ?", (locale,))
+        taxa = [json.loads(data) for (data,) in rows]
+        self._locales[locale] = LocaleTaxonomy(version, taxa)
+
+    def _touch(self, locale, version, now):
+        db = self._db()
+        with db:
+            db.execute(
+                "UPDATE taxonomy_meta SET checked_at = ? WHERE locale = ? AND version = ?",
+                (now, locale, version),
+            )
+        self._checked_at[locale] = now
+
+    def _save(self, locale, version, taxa, now):
+        db = self._db()
+        with db:
+            db.execute("DELETE FROM taxa WHERE locale = ?", (locale,))
+            db.executemany(
+                "INSERT OR REPLACE INTO taxa (locale, speciesCode, data) VALUES (?, ?, ?)",
+                (
+                    (locale, t["speciesCode"], json.dumps(t, separators=(",", ":")))
+                    for t in taxa
+                ),
+            )
+            db.execute(
+                "INSERT OR REPLACE INTO taxonomy_meta (locale, version, checked_at) VALUES (?, ?, ?)",
+                (locale, version, now),
+            )
@@ -0,0 +1,90 @@
+import pytest
+from datetime import date, datetime
+from unittest.mock import AsyncMock
+
+from archive import CHECKLISTS, OBSERVATIONS, ObservationArchive, days_between
+
+DAY = 24 * 60 * 60
+
+
+def at(day):
+    """Clock returning noon on the given day."""
+    return lambda: datetime(day.year, day.month, day.day, 12).timestamp()
+
+
+@pytest.fixture
+def fake_client():
+    client = AsyncMock()
+    client.get_historic_observations.side_effect = lambda region, y, m, d, options: [
+        {"speciesCode": "norcar", "obsDt": f"{y}-{m:02d}-{d:02d}"},
+        {"speciesCode": "blujay", "obsDt": f"{y}-{m:02d}-{d:02d}"},
+    ]
+    client.get_checklist_feed_on_date.return_value = [{"subId": "S1"}]
+    return client
+
+
+def test_days_between():
+    assert list(days_between(date(2024, 2, 28), date(2024, 3, 1))) == [
+        date(2024, 2, 28),
+        date(2024, 2, 29),
+        date(2024, 3, 1),
+    ]
+
+
+def test_only_settled_days_are_served():
+    """Test that a day fetched too soon after it ended is not served."""
+    archive = ObservationArchive(settle_days=3, clock=at(date(2024, 5, 3)))
+    archive.store_observations("US-NY", date(2024, 5, 1), [{"speciesCode": "norcar"}])
+    assert archive.observations("US-NY", date(2024, 5, 1)) is None
+
+    archive.clock = at(date(2024, 5, 4))
+    archive.store_observations("US-NY", date(2024, 5, 1), [{"speciesCode": "norcar"}])
+    assert archive.observations("US-NY", date(2024, 5, 1)) == [{"speciesCode": "norcar"}]
+    assert archive.observations("US-NJ", date(2024, 5, 1)) is None
+
+
+def test_observations_filters_and_keeps_order():
+    archive = ObservationArchive(settle_days=0, clock=at(date(2024, 5, 10)))
+    records = [{"speciesCode": code} for code in ("norcar", "blujay", "amecro", "blujay")]
+    archive.store_observations("US-NY", date(2024, 5, 1), records)
+    assert archive.observations("US-NY", date(2024, 5, 1)) == records
+    assert archive.observations("US-NY", date(2024, 5, 1), max_results=2) == records[:2]
+    assert archive.observations("US-NY", date(2024, 5, 1), species_code="blujay") == records[1::2]
+
+
+@pytest.mark.asyncio
+async def test_sync_backfills_then_fetches_only_new_days(fake_client):
+    """Test that re-running a sync only fetches days not yet archived."""
+    archive = ObservationArchive(clock=at(date(2024, 5, 10)))
+    summary = await archive.sync(fake_client, ["US-NY"], date(2024, 5, 1), date(2024, 5, 5))
+    assert summary == {"days": 5, OBSERVATIONS: 10, CHECKLISTS: 5, "errors": {}}
+    assert archive.checklists("US-NY", date(2024, 5, 3)) == [{"subId": "S1"}]
+    fake_client.get_historic_observations.assert_any_await(
+        "US-NY", 2024, 5, 1, {"maxResults": 10000}
+    )
+
+    fake_client.get_historic_observations.reset_mock()
+    summary = await archive.sync(fake_client, ["US-NY"], date(2024, 5, 1), date(2024, 5, 6))
+    assert summary["days"] == 1
+    fake_client.get_historic_observations.assert_awaited_once_with(
+        "US-NY", 2024, 5, 6, {"maxResults": 10000}
+    )
+
+
+@pytest.mark.asyncio
+async def test_sync_stops_before_today_and_records_errors(fake_client):
+    archive = ObservationArchive(clock=at(date(2024, 5, 10)))
+    fake_client.get_checklist_feed_on_date.side_effect = RuntimeError("boom")
+    summary = await archive.sync(fake_client, ["US-NY"], date(2024, 5, 8), date(2024, 5, 20))
+    assert summary["days"] == 0
+    assert sorted(summary["errors"]) == ["US-NY 2024-05-08", "US-NY 2024-05-09"]
+
+
+@pytest.mark.asyncio
+async def test_resume_from(fake_client):
+    """Test that an incremental sync continues after the last settled day."""
+    archive = ObservationArchive(settle_days=3, clock=at(date(2024, 5, 10)))
+    assert archive.resume_from("US-NY", default_days=30) == date(2024, 4, 10)
+    await archive.sync(fake_client, ["US-NY"], date(2024, 5, 1), date(2024, 5, 9))
+    # Days from 2024-05-08 on were fetched before they settled.
+    assert archive.resume_from("US-NY", default_days=30) == date(2024, 5, 8)
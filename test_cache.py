@@ -0,0 +1,164 @@
+from cache import (
+    CACHE_VERSION,
+    DAY,
+    DEFAULT_TTLS,
+    HOUR,
+    MINUTE,
+    DiskCache,
+    TieredCache,
+    TTLCache,
+    make_key,
+    ttl_for,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_for_uses_longest_prefix():
+    """Test that endpoint families map to their own TTLs."""
+    assert ttl_for("/data/obs/US-NY/recent", DEFAULT_TTLS) == 5 * MINUTE
+    assert ttl_for("/ref/taxonomy/ebird", DEFAULT_TTLS) == 7 * DAY
+    assert ttl_for("/ref/taxonomy/versions", DEFAULT_TTLS) == HOUR
+    assert ttl_for("/unknown", DEFAULT_TTLS) == 0
+
+
+def test_make_key_ignores_param_order():
+    """Test that keys are stable regardless of parameter order."""
+    assert make_key("/a", {"x": 1, "y": "true"}) == make_key("/a", {"y": "true", "x": 1})
+    assert make_key("/a", {"x": 1}) != make_key("/a", {"x": 2})
+
+
+def test_cache_hit_miss_and_expiry():
+    """Test hit and miss counters and TTL expiry."""
+    clock = FakeClock()
+    cache = TTLCache(clock=clock)
+
+    assert cache.get("k") is None
+    cache.set("k", [1], ttl=10, size=3)
+    assert cache.get("k") == [1]
+
+    clock.now = 11
+    assert cache.get("k") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_evicts_least_recently_used_by_count():
+    """Test LRU eviction when the entry limit is reached."""
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_cache_evicts_by_bytes():
+    """Test that the byte bound evicts old entries and rejects oversized ones."""
+    cache = TTLCache(max_bytes=100)
+    cache.set("a", "a", ttl=60, size=60)
+    cache.set("b", "b", ttl=60, size=60)
+
+    assert cache.get("a") is None
+    assert cache.current_bytes == 60
+
+    cache.set("huge", "x", ttl=60, size=101)
+    assert cache.get("huge") is None
+
+
+def test_lookup_serves_stale_entries():
+    """Test that entries stay available to lookup() during their stale window."""
+    now = [0.0]
+    cache = TTLCache(clock=lambda: now[0])
+    cache.set("k", "v", ttl=10, stale=5)
+
+    assert cache.lookup("k") == ("v", 10, 1)
+    assert cache.lookup("k") == ("v", 10, 2)
+    now[0] = 12
+    assert cache.get("k") is None
+    assert cache.lookup("k") == ("v", -2, 2)
+    now[0] = 15
+    assert cache.lookup("k") is None
+    assert cache.stats()["stale_hits"] == 1
+    assert len(cache) == 0
+
+
+def test_disk_cache_survives_reopen(tmp_path):
+    """Test that entries written by one process are read by the next."""
+    path = str(tmp_path / "responses.sqlite3")
+    now = [1000.0]
+    cache = DiskCache(path, clock=lambda: now[0])
+    key = make_key("/ref/region/list/country/world", {})
+    cache.set(key, [{"code": "US"}], ttl=60, stale=30)
+    cache.close()
+
+    reopened = DiskCache(path, clock=lambda: now[0])
+    assert reopened.get(key) == [{"code": "US"}]
+    now[0] += 70
+    assert reopened.get(key) is None
+    assert reopened.lookup(key) == ([{"code": "US"}], -10, 0)
+    now[0] += 30
+    assert reopened.lookup(key) is None
+    reopened.close()
+
+
+def test_disk_cache_ignores_other_versions(monkeypatch):
+    """Test that entries from another cache format version are not served."""
+    cache = DiskCache()
+    cache.set("k", "v", ttl=60)
+    monkeypatch.setattr("cache.CACHE_VERSION", CACHE_VERSION + 1)
+    assert cache.get("k") is None
+    assert cache.compact() == 1
+
+
+def test_disk_cache_compaction_enforces_size():
+    """Test that compaction drops dead entries, then least recently used ones."""
+    now = [0.0]
+    cache = DiskCache(max_bytes=20, clock=lambda: now[0])
+    cache.set("dead", "x" * 5, ttl=1)
+    cache.set("old", "x" * 8, ttl=100)
+    now[0] = 2
+    cache.set("new", "x" * 8, ttl=100)
+    now[0] = 3
+    cache.get("old")
+    cache.set("newest", "x" * 8, ttl=100)
+
+    assert cache.compact() == 2
+    assert cache.get("new") is None
+    assert cache.get("old") == cache.get("newest") == "x" * 8
+    assert cache.stats()["entries"] == 2
+
+
+def test_tiered_cache_persists_long_lived_entries():
+    """Test that only long TTLs reach disk and disk hits are copied to memory."""
+    disk = DiskCache()
+    cache = TieredCache(TTLCache(), disk, min_disk_ttl=60)
+    cache.set("obs", [1], ttl=10)
+    cache.set("ref", [2], ttl=3600)
+    assert disk.get("obs") is None
+
+    restarted = TieredCache(TTLCache(), disk, min_disk_ttl=60)
+    assert restarted.get("obs") is None
+    assert restarted.get("ref") == [2]
+    assert restarted.memory.get("ref") == [2]
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_tiered_cache_skips_disk_for_short_ttls():
+    """Test that lookups for values never written to disk do not query it."""
+    disk = DiskCache()
+    cache = TieredCache(TTLCache(), disk, min_disk_ttl=60)
+    assert cache.lookup("obs", ttl=10) is None
+    assert cache.lookup("ref", ttl=3600) is None
+    assert disk.stats()["misses"] == 1
@@ -0,0 +1,37 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from checklists import ChecklistStore
+
+
+def test_checklist_store_round_trip_and_limit():
+    """Test storing checklists and dropping the oldest beyond the limit."""
+    now = [1000.0]
+    store = ChecklistStore(max_entries=2, clock=lambda: now[0])
+    store.put_many({"S1": {"subId": "S1"}})
+    now[0] += 1
+    store.put_many({"S2": {"subId": "S2"}, "S3": {"subId": "S3"}})
+
+    assert store.get("S1") is None
+    assert store.get_many(["S2", "S3", "S4"]) == {"S2": {"subId": "S2"}, "S3": {"subId": "S3"}}
+    assert store.stats() == {"entries": 2, "hits": 2, "misses": 2}
+
+
+@pytest.mark.asyncio
+async def test_checklist_store_fetch():
+    """Test that only missing checklists are fetched and errors are reported."""
+    store = ChecklistStore()
+    store.put_many({"S1": {"subId": "S1"}})
+    client = AsyncMock()
+    client.get_checklist.side_effect = lambda sub_id: (
+        {"subId": sub_id} if sub_id != "S3" else (_ for _ in ()).throw(ValueError("boom"))
+    )
+
+    result = await store.fetch(client, ["S2", "S1", "S3", "S2"], max_concurrency=2)
+
+    assert result == {
+        "checklists": [{"subId": "S2"}, {"subId": "S1"}],
+        "errors": {"S3": "boom"},
+    }
+    assert [c.args for c in client.get_checklist.await_args_list] == [("S2",), ("S3",)]
+    assert store.get("S2") == {"subId": "S2"}
@@ -1,7 +1,15 @@
+import asyncio
+
+import httpx
 import pytest
 import respx
 from httpx import Response
+from cache import TTLCache
 from client import EBirdClient
+from metrics import MetricsRegistry
+from retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+from tracing import InMemoryExporter, Tracer
+from throttle import RequestGovernor
 
 BASE_URL = 'https://api.ebird.org/v2'
 
@@ -148,6 +156,9 @@ async def test_get_checklist_feed_on_date(client):
     response = await client.get_checklist_feed_on_date(region_code, year, month, day)
     assert response == mock_response
 
+    await client.get_checklist_feed_on_date(region_code, year, month, day, {"maxResults": 200})
+    assert respx.calls.last.request.url.params["maxResults"] == "200"
+
 @pytest.mark.asyncio
 @respx.mock
 async def test_get_regional_statistics_on_date(client):
@@ -252,4 +263,377 @@ async def test_get_sub_region_list(client):
     respx.get(f"{BASE_URL}/ref/region/list/{region_type}/{parent_region_code}").mock(return_value=Response(200, json=mock_response))
     
     response = await client.get_sub_region_list(region_type, parent_region_code)
-    assert response == mock_response
\ No newline at end of file
+    assert response == mock_response
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_make_request_reuses_pooled_client(client):
+    """Test that consecutive requests share one pooled HTTP client."""
+    respx.get(f"{BASE_URL}/ref/taxonomy/versions").mock(return_value=Response(200, json=[]))
+
+    await client.make_request("/ref/taxonomy/versions")
+    pooled = client._client
+    await client.make_request("/ref/taxonomy/versions")
+
+    assert client._client is pooled
+    await client.aclose()
+    assert pooled.is_closed
+    assert client._client is None
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_client_async_context_manager():
+    """Test that the client closes its pool when used as a context manager."""
+    respx.get(f"{BASE_URL}/ref/taxonomy/versions").mock(return_value=Response(200, json=[]))
+
+    async with EBirdClient(api_key="test_key") as ebird:
+        await ebird.get_taxonomy_versions()
+        pooled = ebird._client
+
+    assert pooled.is_closed
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_make_request_serves_repeat_calls_from_cache():
+    """Test that identical requests are served from the response cache."""
+    route = respx.get(f"{BASE_URL}/ref/hotspot/US-NY").mock(return_value=Response(200, json=[{"locId": "L1"}]))
+    ebird = EBirdClient(api_key="test_key", cache=TTLCache())
+
+    first = await ebird.get_hotspots("US-NY")
+    second = await ebird.get_hotspots("US-NY")
+    await ebird.get_hotspots("US-NY", {"back": 7})
+
+    assert first == second == [{"locId": "L1"}]
+    assert route.call_count == 2
+    assert ebird.cache.hits == 1
+    await ebird.aclose()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_concurrent_identical_requests_are_coalesced(client):
+    """Test that concurrent identical requests share one upstream call."""
+    async def slow_response(request):
+        await asyncio.sleep(0.01)
+        return Response(200, json=[{"speciesCode": "norcar"}])
+
+    route = respx.get(f"{BASE_URL}/data/obs/US-NY/recent").mock(side_effect=slow_response)
+
+    results = await asyncio.gather(*(client.get_recent_observations("US-NY") for _ in range(5)))
+
+    assert route.call_count == 1
+    assert all(r == [{"speciesCode": "norcar"}] for r in results)
+    assert client.coalesced_requests == 4
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_coalesced_requests_share_errors(client):
+    """Test that an upstream failure is raised to every coalesced caller."""
+    async def failing_response(request):
+        await asyncio.sleep(0.01)
+        return Response(500)
+
+    route = respx.get(f"{BASE_URL}/ref/region/info/US-NY").mock(side_effect=failing_response)
+
+    results = await asyncio.gather(
+        *(client.get_region_info("US-NY") for _ in range(3)), return_exceptions=True
+    )
+
+    assert route.call_count == 1
+    assert all(isinstance(r, httpx.HTTPStatusError) for r in results)
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_make_request_goes_through_governor():
+    """Test that upstream requests acquire a governor slot."""
+    respx.get(f"{BASE_URL}/ref/region/info/US-NY").mock(return_value=Response(200, json={}))
+    governor = RequestGovernor(max_concurrency=1, rate=100)
+    ebird = EBirdClient(api_key="test_key", governor=governor)
+
+    await ebird.get_region_info("US-NY")
+
+    assert governor.stats()["requests"] == 1
+    assert governor.stats()["in_flight"] == 0
+    await ebird.aclose()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_make_request_retries_transient_errors():
+    """Test that 503s and connection errors are retried until success."""
+    route = respx.get(f"{BASE_URL}/ref/region/info/US-NY").mock(
+        side_effect=[
+            Response(503),
+            httpx.ConnectError("boom"),
+            Response(200, json={"code": "US-NY"}),
+        ]
+    )
+    policy = RetryPolicy(max_attempts=3, base_delay=0)
+    ebird = EBirdClient(api_key="test_key", retry_policy=policy)
+
+    assert await ebird.get_region_info("US-NY") == {"code": "US-NY"}
+    assert route.call_count == 3
+    assert policy.retries == 2
+    await ebird.aclose()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_make_request_honors_retry_after_and_deadline():
+    """Test that a Retry-After beyond the deadline stops retrying."""
+    route = respx.get(f"{BASE_URL}/ref/region/info/US-NY").mock(
+        return_value=Response(429, headers={"Retry-After": "60"})
+    )
+    ebird = EBirdClient(api_key="test_key", retry_policy=RetryPolicy(deadline=5))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await ebird.get_region_info("US-NY")
+    assert route.call_count == 1
+    await ebird.aclose()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_zero_retry_attempts_sends_once():
+    """Test that zero attempts means a single request without retries."""
+    route = respx.get(f"{BASE_URL}/ref/region/info/US-NY").mock(
+        side_effect=[Response(503), Response(200, json={"code": "US-NY"})]
+    )
+    ebird = EBirdClient(api_key="test_key", retry_policy=RetryPolicy(max_attempts=0))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await ebird.get_region_info("US-NY")
+    assert route.call_count == 1
+    await ebird.aclose()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_make_request_does_not_retry_client_errors(capsys):
+    """Test that non-transient statuses are not retried."""
+    route = respx.get(f"{BASE_URL}/ref/region/info/XX").mock(return_value=Response(404))
+    ebird = EBirdClient(api_key="test_key", retry_policy=RetryPolicy(base_delay=0))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await ebird.get_region_info("XX")
+    assert route.call_count == 1
+    assert capsys.readouterr().out == ""
+    await ebird.aclose()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_circuit_breaker_fails_fast():
+    """Test that an open circuit stops calls from reaching the API."""
+    route = respx.get(f"{BASE_URL}/ref/region/info/US-NY").mock(return_value=Response(502))
+    ebird = EBirdClient(api_key="test_key", circuit_breaker=CircuitBreaker(failure_threshold=2))
+
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            await ebird.get_region_info("US-NY")
+    with pytest.raises(CircuitOpenError):
+        await ebird.get_region_info("US-NY")
+    assert route.call_count == 2
+    await ebird.aclose()
+
+
+def half_open_breaker():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 11
+    return breaker
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_unexpected_trial_error_releases_circuit():
+    """Test that a half-open trial failing without an HTTP outcome lets a later call through."""
+    route = respx.get(f"{BASE_URL}/ref/region/info/US-NY").mock(side_effect=RuntimeError("boom"))
+    breaker = half_open_breaker()
+    ebird = EBirdClient(api_key="test_key", circuit_breaker=breaker)
+
+    with pytest.raises(RuntimeError):
+        await ebird.get_region_info("US-NY")
+
+    route.mock(return_value=Response(200, json={"code": "US-NY"}))
+    assert await ebird.get_region_info("US-NY") == {"code": "US-NY"}
+    assert breaker.state == CircuitBreaker.CLOSED
+    await ebird.aclose()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_cancelled_trial_stream_releases_circuit():
+    """Test that cancelling a half-open trial stream lets a later call through."""
+    started = asyncio.Event()
+
+    async def slow(request):
+        started.set()
+        await asyncio.sleep(10)
+        return Response(200, json=[])
+
+    route = respx.get(f"{BASE_URL}/data/obs/US-NY/recent").mock(side_effect=slow)
+    breaker = half_open_breaker()
+    ebird = EBirdClient(api_key="test_key", circuit_breaker=breaker)
+
+    async def consume():
+        return [record async for record in ebird.stream_records("/data/obs/US-NY/recent")]
+
+    trial = asyncio.create_task(consume())
+    await started.wait()
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    route.mock(return_value=Response(200, json=[{"speciesCode": "norcar"}]))
+    assert await consume() == [{"speciesCode": "norcar"}]
+    assert breaker.state == CircuitBreaker.CLOSED
+    await ebird.aclose()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_get_recent_observations_batch(client):
+    """Test merging, de-duplication and per-region error isolation."""
+    shared = {"speciesCode": "norcar", "subId": "S1"}
+    respx.get(f"{BASE_URL}/data/obs/US-NY/recent").mock(return_value=Response(200, json=[shared]))
+    respx.get(f"{BASE_URL}/data/obs/US-NY-061/recent").mock(
+        return_value=Response(200, json=[shared, {"speciesCode": "blujay", "subId": "S1"}])
+    )
+    respx.get(f"{BASE_URL}/data/obs/XX/recent").mock(return_value=Response(400))
+
+    result = await client.get_recent_observations_batch(["US-NY", "US-NY-061", "XX", "US-NY"])
+
+    assert [o["speciesCode"] for o in result["observations"]] == ["norcar", "blujay"]
+    assert list(result["errors"]) == ["XX"]
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_stream_records(client):
+    """Test streaming records from a JSON array response."""
+    endpoint = "/data/obs/US-NY/historic/2023/10/26"
+    mock_response = [{"comName": "American Robin"}, {"comName": "Blue Jay"}]
+    respx.get(f"{BASE_URL}{endpoint}").mock(return_value=Response(200, json=mock_response))
+
+    records = [r async for r in client.stream_records(endpoint)]
+    assert records == mock_response
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_stream_records_raises_http_errors(client, capsys):
+    """Test that streaming surfaces HTTP errors before yielding anything."""
+    respx.get(f"{BASE_URL}/ref/taxonomy/ebird").mock(return_value=Response(503))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        async for _ in client.stream_taxonomy():
+            pass
+    # stdout carries the MCP messages over stdio.
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "HTTP error while accessing" in captured.err
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_make_request_records_metrics():
+    """Test per-endpoint latency, status, bytes and cache lookup metrics."""
+    respx.get(f"{BASE_URL}/ref/hotspot/US-NY").mock(return_value=Response(200, json=[{"locId": "L1"}]))
+    respx.get(f"{BASE_URL}/ref/hotspot/US-XX").mock(return_value=Response(404))
+    registry = MetricsRegistry()
+    ebird = EBirdClient(api_key="test_key", cache=TTLCache(), metrics=registry)
+
+    await ebird.get_hotspots("US-NY")
+    await ebird.get_hotspots("US-NY")
+    with pytest.raises(httpx.HTTPStatusError):
+        await ebird.get_hotspots("US-XX")
+
+    text = registry.render()
+    assert 'ebird_upstream_responses_total{endpoint="/ref/hotspot/{}",status="200"} 1' in text
+    assert 'ebird_upstream_responses_total{endpoint="/ref/hotspot/{}",status="404"} 1' in text
+    assert 'ebird_upstream_request_duration_seconds_count{endpoint="/ref/hotspot/{}"} 2' in text
+    assert 'ebird_cache_lookups_total{endpoint="/ref/hotspot/{}",result="hit"} 1' in text
+    body = len(Response(200, json=[{"locId": "L1"}]).content)
+    assert f'ebird_upstream_response_bytes_total{{endpoint="/ref/hotspot/{{}}"}} {body}' in text
+    assert "ebird_upstream_in_flight 0" in text
+    await ebird.aclose()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_make_request_emits_nested_spans():
+    """Test request, HTTP and decode spans with their attributes."""
+    respx.get(f"{BASE_URL}/data/obs/US-NY/recent").mock(return_value=Response(200, json=[{"a": 1}, {"b": 2}]))
+    exporter = InMemoryExporter()
+    ebird = EBirdClient(api_key="test_key", tracer=Tracer(exporter))
+
+    await ebird.get_recent_observations("US-NY")
+
+    http, decode, request = exporter.spans
+    assert (request.name, http.name, decode.name) == ("ebird.request", "HTTP GET", "json.decode")
+    assert http.parent_id == request.span_id and decode.parent_id == request.span_id
+    assert request.attributes["endpoint"] == "/data/obs/{}/recent"
+    assert http.attributes["status"] == 200
+    assert decode.attributes["records"] == 2
+    assert decode.attributes["bytes"] == http.attributes["bytes"]
+    await ebird.aclose()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_stale_response_served_while_refreshing():
+    """Test stale-while-revalidate: stale data now, one refresh in the background."""
+    now = [0.0]
+    route = respx.get(f"{BASE_URL}/ref/hotspot/US-NY").mock(
+        side_effect=[Response(200, json=[{"locId": "L1"}]), Response(200, json=[{"locId": "L2"}])]
+    )
+    ebird = EBirdClient(
+        api_key="test_key",
+        cache=TTLCache(clock=lambda: now[0]),
+        cache_ttls={"/ref/hotspot": 10},
+        stale_ratio=1.0,
+    )
+
+    assert await ebird.get_hotspots("US-NY") == [{"locId": "L1"}]
+    now[0] = 15
+    first, second = await asyncio.gather(ebird.get_hotspots("US-NY"), ebird.get_hotspots("US-NY"))
+    assert first == second == [{"locId": "L1"}]
+    assert ebird.background_refreshes == 1
+
+    await asyncio.sleep(0.01)
+    assert route.call_count == 2
+    assert await ebird.get_hotspots("US-NY") == [{"locId": "L2"}]
+    await ebird.aclose()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_hot_keys_refreshed_before_expiry():
+    """Test that only frequently used entries are refreshed ahead of expiry."""
+    now = [0.0]
+    route = respx.get(f"{BASE_URL}/ref/hotspot/US-NY").mock(return_value=Response(200, json=[]))
+    ebird = EBirdClient(
+        api_key="test_key",
+        cache=TTLCache(clock=lambda: now[0]),
+        cache_ttls={"/ref/hotspot": 10},
+        refresh_ahead=0.2,
+        hot_hits=3,
+    )
+
+    await ebird.get_hotspots("US-NY")
+    now[0] = 9
+    await ebird.get_hotspots("US-NY")
+    await ebird.get_hotspots("US-NY")
+    assert ebird.background_refreshes == 0
+    await ebird.get_hotspots("US-NY")
+    assert ebird.background_refreshes == 1
+
+    await asyncio.sleep(0.01)
+    assert route.call_count == 2
+    await ebird.aclose()
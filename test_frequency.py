@@ -0,0 +1,80 @@
+import httpx
+import pytest
+from datetime import date
+from unittest.mock import AsyncMock
+
+from archive import ObservationArchive
+from frequency import SpeciesFrequency, historic_days
+
+
+def test_species_frequency_series():
+    """Test per-day presence and counts for discovered species."""
+    frequency = SpeciesFrequency(date(2024, 5, 1), 4)
+    frequency.add(0, [{"speciesCode": "norcar", "comName": "Northern Cardinal", "howMany": 2}])
+    frequency.add(2, [{"speciesCode": "norcar", "howMany": 5}, {"speciesCode": "blujay"}])
+    frequency.add(3, [{"speciesCode": "blujay", "howMany": 1}])
+
+    assert frequency.ranked() == ["norcar", "blujay"]
+    assert frequency.series("norcar") == {
+        "speciesCode": "norcar",
+        "comName": "Northern Cardinal",
+        "daysReported": 2,
+        "daysCovered": 4,
+        "frequency": 0.5,
+        "totalCount": 7,
+        "maxCount": 5,
+        "maxCountDate": "2024-05-03",
+        "present": "1010",
+        "counts": [2, 0, 5, 0],
+    }
+    assert frequency.series("blujay")["present"] == "0011"
+
+
+def test_species_frequency_fixed_species():
+    """Test that only the requested species are tracked."""
+    frequency = SpeciesFrequency(date(2024, 5, 1), 2, ["amecro", "blujay"])
+    frequency.add(1, [{"speciesCode": "norcar"}, {"speciesCode": "blujay", "comName": "Blue Jay"}])
+    assert list(frequency.index) == ["amecro", "blujay"]
+    assert frequency.series("amecro")["daysReported"] == 0
+    assert frequency.series("blujay")["comName"] == "Blue Jay"
+
+
+@pytest.mark.asyncio
+async def test_historic_days_uses_archive_and_archives_fetched_days():
+    archive = ObservationArchive(settle_days=0)
+    archive.store_observations("US-NY", date(2024, 5, 1), [{"speciesCode": "norcar"}])
+    client = AsyncMock()
+    client.get_historic_observations.return_value = [{"speciesCode": "blujay"}]
+
+    days, errors = await historic_days(client, archive, "US-NY", date(2024, 5, 1), date(2024, 5, 2))
+    assert days == [
+        (date(2024, 5, 1), [{"speciesCode": "norcar"}]),
+        (date(2024, 5, 2), [{"speciesCode": "blujay"}]),
+    ]
+    assert errors == {}
+    client.get_historic_observations.assert_awaited_once_with(
+        "US-NY", 2024, 5, 2, {"maxResults": 10000}
+    )
+    assert archive.observations("US-NY", date(2024, 5, 2)) == [{"speciesCode": "blujay"}]
+
+
+@pytest.mark.asyncio
+async def test_historic_days_isolates_failed_days():
+    """Test that a failed day is reported without failing the others."""
+    client = AsyncMock()
+    error = httpx.ConnectError("boom")
+    client.get_historic_observations.side_effect = [[{"speciesCode": "norcar"}], error, []]
+
+    days, errors = await historic_days(client, None, "US-NY", date(2024, 5, 1), date(2024, 5, 3))
+    assert days == [(date(2024, 5, 1), [{"speciesCode": "norcar"}]), (date(2024, 5, 3), [])]
+    assert errors == {date(2024, 5, 2): error}
+
+
+def test_species_frequency_skips_missing_days():
+    """Test that missing days are left out of the frequency."""
+    frequency = SpeciesFrequency(date(2024, 5, 1), 4)
+    frequency.add(0, [{"speciesCode": "norcar"}])
+    frequency.mark_missing(3)
+    series = frequency.series("norcar")
+    assert series["daysCovered"] == 3
+    assert series["frequency"] == 0.333
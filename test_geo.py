@@ -0,0 +1,43 @@
+import pytest
+
+from geo import bounding_box, covering_tile, geohash_bounds, geohash_encode, haversine
+
+
+def test_haversine():
+    """Test great-circle distances in kilometers."""
+    assert haversine(40.0, -74.0, 40.0, -74.0) == 0
+    # One degree of latitude is about 111 km everywhere.
+    assert haversine(40.0, -74.0, 41.0, -74.0) == pytest.approx(111.2, abs=0.1)
+    # Central Park to Prospect Park.
+    assert haversine(40.7812, -73.9665, 40.6602, -73.9690) == pytest.approx(13.5, abs=0.1)
+
+
+def test_bounding_box_contains_circle():
+    """Test that the box encloses every point of the circle."""
+    min_lat, min_lng, max_lat, max_lng = bounding_box(40.0, -74.0, 25)
+    assert haversine(40.0, -74.0, max_lat, -74.0) == pytest.approx(25, abs=0.01)
+    assert haversine(40.0, -74.0, 40.0, min_lng) >= 25
+    assert min_lat < 40.0 < max_lat and min_lng < -74.0 < max_lng
+
+
+def test_bounding_box_wraps_to_whole_globe():
+    """Test that polar and antimeridian circles span every longitude."""
+    assert bounding_box(89.9, 0.0, 50)[1::2] == (-180.0, 180.0)
+    assert bounding_box(0.0, 179.9, 50)[1::2] == (-180.0, 180.0)
+
+
+def test_geohash_round_trip():
+    """Test geohash encoding against a known cell."""
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    min_lat, min_lng, max_lat, max_lng = geohash_bounds("u4pru")
+    assert min_lat <= 57.64911 <= max_lat and min_lng <= 10.40744 <= max_lng
+
+
+def test_covering_tile():
+    """Test that points in one cell share a tile that covers their circles."""
+    tile = covering_tile(40.7800, -73.9700, 25)
+    assert covering_tile(40.7805, -73.9710, 25) == tile
+    tile_lat, tile_lng, radius = tile
+    assert radius == 30
+    assert haversine(tile_lat, tile_lng, 40.78, -73.97) + 25 <= radius
+    assert covering_tile(40.78, -73.97, 48) is None
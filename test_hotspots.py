@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from hotspots import HotspotIndex
+
+NOW = datetime(2024, 5, 15, 12).timestamp()
+
+
+def hotspot(loc_id, lat, lng, latest="2024-05-14 08:00"):
+    return {"locId": loc_id, "locName": loc_id, "lat": lat, "lng": lng, "latestObsDt": latest}
+
+
+def county():
+    return [
+        hotspot("L1", 40.00, -74.00),
+        hotspot("L2", 40.05, -74.00),
+        hotspot("L3", 40.30, -74.00, latest="2024-03-01 08:00"),
+        hotspot("L4", 40.60, -74.40),
+        hotspot("L5", 39.40, -73.60),
+    ]
+
+
+def test_nearby_sorted_by_distance():
+    """Test radius queries against the grid index."""
+    index = HotspotIndex(clock=lambda: NOW)
+    index.add_region("US-NY-061", county(), back=None)
+
+    found = index.nearby(40.01, -74.0, 40)
+    assert [h["locId"] for _, h in found] == ["L1", "L2", "L3"]
+    assert found[0][0] < found[1][0] < found[2][0]
+    # L3 has not been visited within the last 14 days.
+    assert [h["locId"] for _, h in index.nearby(40.01, -74.0, 40, back=14)] == ["L1", "L2"]
+
+
+def test_nearest_widens_radius():
+    """Test k-nearest search."""
+    index = HotspotIndex(clock=lambda: NOW)
+    index.add_region("US-NY-061", county(), back=None)
+
+    assert [h["locId"] for _, h in index.nearest(40.0, -74.0, 3)] == ["L1", "L2", "L3"]
+    assert len(index.nearest(40.0, -74.0, 10, max_dist=6)) == 2
+
+
+def test_covering_region_and_freshness():
+    """Test which cached region lists can answer a query."""
+    now = [NOW]
+    index = HotspotIndex(ttl=3600, clock=lambda: now[0])
+    index.add_region("US-NY-061", county(), back=14)
+
+    assert index.covering_region(40.0, -74.0, 10, back=14) == "US-NY-061"
+    assert index.covering_region(40.0, -74.0, 10, back=7) == "US-NY-061"
+    # A 14-day list cannot answer a 30-day query.
+    assert index.covering_region(40.0, -74.0, 10, back=30) is None
+    # The circle reaches past the region's extent.
+    assert index.covering_region(40.0, -74.0, 200, back=14) is None
+    assert index.covered("US-NY-061-X", back=14)
+
+    now[0] += 3600
+    assert index.covering_region(40.0, -74.0, 10, back=14) is None
+
+
+def test_replacing_and_removing_regions():
+    """Test that hotspots shared by regions stay until their last region goes."""
+    index = HotspotIndex(clock=lambda: NOW)
+    index.add_region("US-NY-061", county())
+    index.add_region("US-NY", county()[:2])
+    assert len(index) == 5
+
+    index.remove_region("US-NY-061")
+    assert [h["locId"] for _, h in index.nearby(40.0, -74.0, 100)] == ["L1", "L2"]
+
+    index.add_region("US-NY", [hotspot("L9", 41.0, -75.0)])
+    assert len(index) == 1
+    assert index.nearby(40.0, -74.0, 100) == []
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from jsonstream import JSONArrayScanner, iter_json_array
+
+RECORDS = [
+    {"comName": "Tricky, \"quoted\" ] } name", "nested": [1, {"a": "]"}], "escape": "\\\\"},
+    "plain string",
+    42,
+    -1.5e3,
+    True,
+    None,
+    [[], {}],
+    "漢字",
+]
+
+
+def feed_in_chunks(raw, size):
+    scanner = JSONArrayScanner()
+    records = []
+    for i in range(0, len(raw), size):
+        records.extend(scanner.feed(raw[i : i + size]))
+    scanner.close()
+    return records
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10_000])
+def test_scanner_handles_any_chunking(size):
+    """Test that elements are decoded correctly however the body is split."""
+    raw = json.dumps(RECORDS, ensure_ascii=False).encode()
+    assert feed_in_chunks(raw, size) == RECORDS
+
+
+def test_scanner_buffers_only_the_current_element():
+    """Test that emitted elements are dropped from the buffer."""
+    scanner = JSONArrayScanner()
+    scanner.feed(b'[{"a": 1}, {"b": 2}, {"c"')
+    assert scanner._text == ', {"c"'
+
+
+def test_scanner_rejects_non_arrays_and_truncated_input():
+    """Test errors for objects and incomplete arrays."""
+    with pytest.raises(ValueError):
+        JSONArrayScanner().feed(b'{"a": 1}')
+    scanner = JSONArrayScanner()
+    scanner.feed(b"[1, 2")
+    with pytest.raises(ValueError):
+        scanner.close()
+    assert feed_in_chunks(b" [ ] ", 1) == []
+
+
+@pytest.mark.asyncio
+async def test_iter_json_array():
+    """Test the async generator over byte chunks."""
+    async def chunks():
+        yield b'[{"a": 1}, '
+        yield b'{"b": 2}]'
+
+    assert [r async for r in iter_json_array(chunks())] == [{"a": 1}, {"b": 2}]
@@ -0,0 +1,67 @@
+import httpx
+import pytest
+
+from metrics import MetricsRegistry, endpoint_label, start_server
+
+
+def test_endpoint_label():
+    """Test that arguments in endpoint paths collapse to placeholders."""
+    assert endpoint_label("/data/obs/US-NY/recent/norcar") == "/data/obs/{}/recent/{}"
+    assert endpoint_label("/data/obs/geo/recent/notable") == "/data/obs/geo/recent/notable"
+    assert endpoint_label("/product/lists/US-NY/2024/5/1") == "/product/lists/{}/{}/{}/{}"
+
+
+def test_render_exposition_format():
+    """Test counters, gauges and cumulative histogram buckets."""
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls.", ("tool", "status"))
+    in_flight = registry.gauge("in_flight", "In flight.")
+    latency = registry.histogram("duration_seconds", "Latency.", ("tool",), buckets=(0.1, 1))
+    calls.inc(tool="a", status="ok")
+    calls.inc(2, tool="a", status="ok")
+    with in_flight.track():
+        assert in_flight.values[()] == 1
+    latency.observe(0.05, tool="a")
+    latency.observe(0.5, tool="a")
+    latency.observe(5, tool="a")
+
+    text = registry.render()
+    assert "# TYPE ebird_calls_total counter" in text
+    assert 'ebird_calls_total{tool="a",status="ok"} 3' in text
+    assert "ebird_in_flight 0" in text
+    assert 'ebird_duration_seconds_bucket{tool="a",le="0.1"} 1' in text
+    assert 'ebird_duration_seconds_bucket{tool="a",le="1"} 2' in text
+    assert 'ebird_duration_seconds_bucket{tool="a",le="+Inf"} 3' in text
+    assert 'ebird_duration_seconds_count{tool="a"} 3' in text
+    assert registry.snapshot()["ebird_duration_seconds"][0]["count"] == 3
+
+
+def test_collectors():
+    """Test exporting component stats as gauges."""
+    registry = MetricsRegistry()
+    registry.collect("cache", lambda: {"hits": 3, "hit_ratio": 0.75, "state": "closed"})
+    text = registry.render()
+    assert "ebird_cache_hits 3" in text
+    assert "ebird_cache_hit_ratio 0.75" in text
+    assert 'ebird_cache_state{value="closed"} 1' in text
+    assert registry.snapshot()["ebird_cache"]["hits"] == 3
+
+
+@pytest.mark.asyncio
+async def test_metrics_http_endpoint():
+    """Test the plain HTTP metrics endpoint."""
+    registry = MetricsRegistry()
+    registry.counter("calls_total", "Calls.").inc()
+    server = await start_server(registry, port=0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        async with httpx.AsyncClient() as client:
+            response = await client.get(f"http://127.0.0.1:{port}/metrics")
+            missing = await client.get(f"http://127.0.0.1:{port}/other")
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    assert response.status_code == 200
+    assert "ebird_calls_total 1" in response.text
+    assert missing.status_code == 404
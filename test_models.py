@@ -0,0 +1,57 @@
+from models import (
+    Checklist,
+    Hotspot,
+    Observation,
+    compact_observations,
+    loads,
+    parse_checklist,
+    parse_hotspots,
+)
+
+
+def test_observation_from_dict():
+    """Test parsing an observation record."""
+    obs = Observation.from_dict(
+        {"speciesCode": "norcar", "comName": "Northern Cardinal", "howMany": 2, "lat": 40.7, "extra": 1}
+    )
+    assert obs.species_code == "norcar"
+    assert obs.how_many == 2
+    assert obs.user_display_name is None
+    assert not hasattr(obs, "__dict__")
+
+
+def test_hotspot_and_checklist_from_dict():
+    """Test parsing hotspots and checklists."""
+    hotspot = parse_hotspots([{"locId": "L1", "numSpeciesAllTime": 250}])[0]
+    assert isinstance(hotspot, Hotspot)
+    assert hotspot.num_species == 250
+
+    checklist = parse_checklist({"subId": "S1", "loc": {"locName": "Park"}, "obs": [{"comName": "Blue Jay"}]})
+    assert isinstance(checklist, Checklist)
+    assert checklist.loc_name == "Park"
+    assert checklist.obs[0].com_name == "Blue Jay"
+
+
+def test_loads_accepts_bytes():
+    """Test that the selected JSON decoder accepts raw bytes."""
+    assert loads(b'[{"a": 1}]') == [{"a": 1}]
+
+
+def test_to_dict_uses_api_names_and_drops_unset_fields():
+    """Test converting records back into compact eBird-style dicts."""
+    raw = {"speciesCode": "norcar", "comName": "Northern Cardinal", "howMany": 2, "obsValid": True}
+    assert Observation.from_dict(raw).to_dict() == {
+        "speciesCode": "norcar",
+        "comName": "Northern Cardinal",
+        "howMany": 2,
+    }
+    assert compact_observations([raw, {"speciesCode": "blujay"}]) == [
+        {"speciesCode": "norcar", "comName": "Northern Cardinal", "howMany": 2},
+        {"speciesCode": "blujay"},
+    ]
+    assert Hotspot.from_dict({"locId": "L1", "numSpeciesAllTime": 250}).to_dict() == {
+        "locId": "L1",
+        "numSpecies": 250,
+    }
+    checklist = parse_checklist({"subId": "S1", "obs": [{"speciesCode": "blujay"}]})
+    assert checklist.to_dict() == {"subId": "S1", "obs": [{"speciesCode": "blujay"}]}
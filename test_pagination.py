@@ -0,0 +1,64 @@
+import pytest
+
+from cache import TTLCache
+from pagination import CursorError, ResultPages
+
+
+def join(records):
+    return ",".join(str(r) for r in records)
+
+
+def test_single_page_has_no_footer():
+    """Test that results fitting on one page are returned unchanged."""
+    pages = ResultPages()
+    assert pages.page([1, 2, 3], join, page_size=10) == "1,2,3"
+
+
+def test_cursor_walks_all_pages():
+    """Test that following cursors yields every record exactly once."""
+    pages = ResultPages()
+    records = list(range(7))
+    text = pages.page(records, join, page_size=3)
+    assert text.startswith("0,1,2\n\nShowing 1-3 of 7. Next page cursor: ")
+    seen = [0, 1, 2]
+    while "Next page cursor: " in text:
+        cursor = text.rsplit("Next page cursor: ", 1)[1]
+        stored, result_id, offset = pages.resume(cursor)
+        assert stored is records
+        text = pages.page(stored, join, 3, offset, result_id)
+        seen.extend(int(r) for r in text.split("\n\n")[0].split(","))
+    assert seen == records
+    assert text.endswith("Showing 7-7 of 7.")
+
+
+def test_offset_past_end():
+    pages = ResultPages()
+    assert pages.page([1, 2], join, 1, offset=5).endswith("No results at offset 5 of 2.")
+
+
+def test_invalid_page_size_and_offset():
+    pages = ResultPages()
+    with pytest.raises(ValueError, match="pageSize"):
+        pages.page(list(range(5)), join, -1)
+    with pytest.raises(ValueError, match="pageSize"):
+        pages.window(list(range(5)), 0)
+    with pytest.raises(ValueError, match="offset"):
+        pages.page(list(range(5)), join, 2, offset=-1)
+
+
+def test_invalid_cursor():
+    with pytest.raises(CursorError, match="Invalid cursor"):
+        ResultPages().resume("not-a-cursor")
+    with pytest.raises(CursorError, match="Invalid cursor"):
+        ResultPages().resume(ResultPages.cursor("abc", -1))
+
+
+def test_expired_cursor():
+    """Test that a cursor stops working once its result has expired."""
+    now = [0.0]
+    pages = ResultPages(ttl=60, cache=TTLCache(clock=lambda: now[0]))
+    text = pages.page(list(range(5)), join, 2)
+    cursor = text.rsplit("Next page cursor: ", 1)[1]
+    now[0] = 61
+    with pytest.raises(CursorError, match="expired"):
+        pages.resume(cursor)
@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from regions import RegionGraph, child_type, region_type
+
+SUB_REGIONS = {
+    ("subnational1", "US"): [{"code": "US-NY", "name": "New York"}, {"code": "US-NJ", "name": "New Jersey"}],
+    ("subnational2", "US-NY"): [{"code": "US-NY-061", "name": "New York"}, {"code": "US-NY-047", "name": "Kings"}],
+    ("subnational2", "US-NJ"): [{"code": "US-NJ-013", "name": "Essex"}],
+}
+
+ADJACENT = {
+    "US-NY": [{"code": "US-NJ", "name": "New Jersey"}, {"code": "US-PA", "name": "Pennsylvania"}],
+    "US-NJ": [{"code": "US-NY", "name": "New York"}, {"code": "US-DE", "name": "Delaware"}],
+    "US-PA": [{"code": "US-NY", "name": "New York"}, {"code": "US-OH", "name": "Ohio"}],
+}
+
+
+@pytest.fixture
+def fake_client():
+    """Fixture for a client serving a small region hierarchy."""
+    client = AsyncMock()
+    client.get_sub_region_list.side_effect = lambda t, code: SUB_REGIONS.get((t, code), [])
+    client.get_adjacent_regions.side_effect = lambda code: ADJACENT.get(code, [])
+    return client
+
+
+def test_region_types():
+    """Test deriving region types from codes."""
+    assert region_type("US") == "country"
+    assert region_type("US-NY-061") == "subnational2"
+    assert child_type("US") == "subnational1"
+    assert child_type("US-NY-061") is None
+
+
+@pytest.mark.asyncio
+async def test_expand_builds_tree_once(fake_client, tmp_path):
+    """Test that the tree is expanded concurrently and then served locally."""
+    graph = RegionGraph(str(tmp_path / "regions.json"))
+    await graph.expand(fake_client, "US")
+    await graph.expand(fake_client, "US-NY")
+
+    assert fake_client.get_sub_region_list.call_count == 3
+    assert graph.descendants("US", "subnational2") == ["US-NY-061", "US-NY-047", "US-NJ-013"]
+    assert graph.descendants("US-NY") == ["US-NY-061", "US-NY-047"]
+    assert graph.name("US-NY-047") == "Kings"
+
+
+@pytest.mark.asyncio
+async def test_graph_persists_to_disk(fake_client, tmp_path):
+    """Test that a saved graph answers without API calls in a new instance."""
+    path = str(tmp_path / "regions.json")
+    await RegionGraph(path).expand(fake_client, "US")
+
+    offline = AsyncMock()
+    graph = RegionGraph(path)
+    await graph.expand(offline, "US")
+
+    offline.get_sub_region_list.assert_not_called()
+    assert len(graph.descendants("US")) == 5
+
+
+@pytest.mark.asyncio
+async def test_corrupt_graph_file_is_rebuilt(fake_client, tmp_path):
+    """Test that an unreadable file starts an empty graph that is saved again."""
+    path = tmp_path / "regions.json"
+    path.write_text('{"names": {"US-NY"')
+    graph = RegionGraph(str(path))
+    await graph.expand(fake_client, "US")
+
+    assert len(graph.descendants("US")) == 5
+    reloaded = RegionGraph(str(path))
+    reloaded.load()
+    assert len(reloaded.names) == 5
+    assert [p.name for p in tmp_path.iterdir()] == ["regions.json"]
+
+
+@pytest.mark.asyncio
+async def test_neighbors_within_hops(fake_client):
+    """Test multi-hop adjacency queries."""
+    graph = RegionGraph()
+    assert graph.known_neighbors("US-NY") is None
+
+    assert await graph.neighbors(fake_client, "US-NY", 1) == {"US-NJ": 1, "US-PA": 1}
+    assert graph.known_neighbors("US-NY") == ["US-NJ", "US-PA"]
+    assert await graph.neighbors(fake_client, "US-NY", 2) == {
+        "US-NJ": 1,
+        "US-PA": 1,
+        "US-DE": 2,
+        "US-OH": 2,
+    }
+    assert fake_client.get_adjacent_regions.call_count == 3
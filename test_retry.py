@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from retry import CircuitBreaker, CircuitOpenError, RetryPolicy, parse_retry_after
+
+
+def test_parse_retry_after():
+    """Test parsing Retry-After as seconds and as an HTTP date."""
+    now = datetime(2025, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 01 Jan 2025 12:00:05 GMT", now=now) == 5.0
+    assert parse_retry_after("Wed, 01 Jan 2025 11:00:00 GMT", now=now) == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_backoff_is_jittered_and_capped():
+    """Test exponential backoff bounds and Retry-After override."""
+    policy = RetryPolicy(base_delay=1, max_delay=4, rng=lambda: 1.0)
+    assert [policy.backoff(a) for a in range(4)] == [1, 2, 4, 4]
+    assert RetryPolicy(rng=lambda: 0.0).backoff(3) == 0
+    assert policy.backoff(0, retry_after=7) == 7
+
+
+def test_circuit_breaker_opens_and_recovers():
+    """Test that the breaker fails fast when open and closes after a good trial."""
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    now[0] = 11
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_circuit_breaker_reopens_after_failed_trial():
+    """Test that a failed half-open trial reopens the circuit."""
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 11
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_circuit_breaker_release_allows_new_trial():
+    """Test that a trial ending without an outcome lets the next call through."""
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 11
+    breaker.before_call()
+    breaker.release()
+
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
@@ -1,5 +1,15 @@
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from typing import Any
+
+import httpx
 import pytest
-from unittest.mock import AsyncMock, patch
+from mcp.server.fastmcp.tools import ToolManager
+from starlette.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock, patch
 from server import (
     ebird_get_recent_observations,
     ebird_get_hotspots,
@@ -20,8 +30,71 @@ from server import (
     ebird_get_taxonomy_versions,
     ebird_get_taxonomic_groups,
     ebird_get_region_info,
-    ebird_get_sub_region_list
+    ebird_get_sub_region_list,
+    ebird_get_taxonomy,
+    ebird_resolve_species,
+    ebird_get_recent_observations_batch,
+    ebird_get_region_tree,
+    EBirdMCP,
+    ebird_species_frequency,
+    ebird_get_nearby_hotspots,
+    ebird_get_nearest_hotspots,
+    ebird_get_nearby_observations,
+    ebird_get_checklists,
+    ebird_get_metrics,
+    http_app,
+    main,
+    mcp,
+    prefetches,
+    request_governor,
+    warmup_jobs,
+    warmup_leader,
 )
+from archive import ObservationArchive
+from checklists import ChecklistStore
+from hotspots import HotspotIndex
+from tracing import InMemoryExporter, Tracer
+from warmup import WarmUp
+from regions import RegionGraph
+from taxonomy import TaxonomyStore
+
+async def stream(records):
+    for record in records:
+        yield record
+
+
+def stream_mock(records):
+    """Mock for a client stream_* method yielding the given records."""
+    return MagicMock(side_effect=lambda *args: stream(records))
+
+
+@pytest.fixture(autouse=True)
+def empty_archive():
+    """Keep tool tests off the on-disk archive."""
+    with patch('server.archive', ObservationArchive(settle_days=0)) as archive:
+        yield archive
+
+
+@pytest.fixture(autouse=True)
+def empty_checklist_store():
+    """Keep tool tests off the on-disk checklist store."""
+    with patch('server.checklists', ChecklistStore()) as store:
+        yield store
+
+
+@pytest.fixture(autouse=True)
+def empty_hotspot_index():
+    """Keep hotspot lists indexed by one test out of the others."""
+    with patch('server.hotspot_index', HotspotIndex()) as index:
+        yield index
+
+
+@pytest.fixture(autouse=True)
+def empty_region_graph():
+    """Keep tool tests off the on-disk region graph."""
+    with patch('server.regions', RegionGraph()) as graph:
+        yield graph
+
 
 @pytest.fixture
 def mock_ebird_client():
@@ -161,7 +234,7 @@ async def test_ebird_get_checklist_feed_on_date_tool(mock_ebird_client):
     ]
     result = await ebird_get_checklist_feed_on_date(regionCode="US-NY", year=2023, month=1, day=1)
     assert "S67890" in result["content"][0]["text"]
-    mock_ebird_client.get_checklist_feed_on_date.assert_called_once_with("US-NY", 2023, 1, 1)
+    mock_ebird_client.get_checklist_feed_on_date.assert_called_once_with("US-NY", 2023, 1, 1, {})
 
 @pytest.mark.asyncio
 async def test_ebird_get_regional_statistics_on_date_tool(mock_ebird_client):
@@ -182,14 +255,15 @@ async def test_ebird_get_species_list_for_region_tool(mock_ebird_client):
     mock_ebird_client.get_species_list_for_region.assert_called_once_with("US-NY")
 
 @pytest.mark.asyncio
-async def test_ebird_get_adjacent_regions_tool(mock_ebird_client):
+async def test_ebird_get_adjacent_regions_tool(mock_ebird_client, empty_region_graph):
     """Test the ebird_get_adjacent_regions MCP tool."""
     mock_ebird_client.get_adjacent_regions.return_value = [
         {"code": "US-NJ", "name": "New Jersey"}
     ]
     result = await ebird_get_adjacent_regions(regionCode="US-NY")
-    assert "US-NJ" in result["content"][0]["text"]
+    assert "New Jersey (US-NJ)" in result["content"][0]["text"]
     mock_ebird_client.get_adjacent_regions.assert_called_once_with("US-NY")
+    assert empty_region_graph.known_neighbors("US-NY") == ["US-NJ"]
 
 @pytest.mark.asyncio
 async def test_ebird_get_hotspot_info_tool(mock_ebird_client):
@@ -245,4 +319,556 @@ async def test_ebird_get_sub_region_list_tool(mock_ebird_client):
     ]
     result = await ebird_get_sub_region_list(regionType="state", parentRegionCode="US")
     assert "US-NY" in result["content"][0]["text"]
-    mock_ebird_client.get_sub_region_list.assert_called_once_with("state", "US")
\ No newline at end of file
+    mock_ebird_client.get_sub_region_list.assert_called_once_with("state", "US")
+
+@pytest.mark.asyncio
+async def test_ebird_get_taxonomy_tool_uses_local_store(mock_ebird_client):
+    """Test that ebird_get_taxonomy answers from the local taxonomy store."""
+    mock_ebird_client.get_taxonomy_versions.return_value = [{"authorityVer": 2024.0, "latest": True}]
+    mock_ebird_client.stream_taxonomy = stream_mock([
+        {"speciesCode": "norcar", "comName": "Northern Cardinal", "sciName": "Cardinalis cardinalis", "category": "species"},
+        {"speciesCode": "bkfspo", "comName": "Black-faced Spoonbill", "sciName": "Platalea minor", "category": "species"},
+    ])
+    with patch("server.taxonomy", TaxonomyStore()):
+        result = await ebird_get_taxonomy(speciesCode="bkfspo")
+        await ebird_get_taxonomy()
+
+    assert "Black-faced Spoonbill" in result["content"][0]["text"]
+    assert "Northern Cardinal" not in result["content"][0]["text"]
+    mock_ebird_client.stream_taxonomy.assert_called_once_with({"locale": "en", "cat": None})
+
+
+@pytest.mark.asyncio
+async def test_ebird_resolve_species_tool(mock_ebird_client):
+    """Test the ebird_resolve_species MCP tool."""
+    mock_ebird_client.get_taxonomy_versions.return_value = [{"authorityVer": 2024.0, "latest": True}]
+    mock_ebird_client.stream_taxonomy = stream_mock([
+        {"speciesCode": "bkfspo", "comName": "Black-faced Spoonbill", "sciName": "Platalea minor", "category": "species"},
+    ])
+    with patch("server.taxonomy", TaxonomyStore()):
+        result = await ebird_resolve_species(name="black faced spoon")
+
+    assert "bkfspo" in result["content"][0]["text"]
+
+
+@pytest.mark.asyncio
+async def test_ebird_get_recent_observations_batch_tool(mock_ebird_client):
+    """Test the ebird_get_recent_observations_batch MCP tool."""
+    mock_ebird_client.get_recent_observations_batch.return_value = {
+        "observations": [{"comName": "Northern Cardinal", "locName": "Central Park"}],
+        "errors": {"XX": "Client error '400 Bad Request'"},
+    }
+    result = await ebird_get_recent_observations_batch(regionCodes=["US-NY", "XX"], back=7)
+
+    text = result["content"][0]["text"]
+    assert "Northern Cardinal" in text
+    assert "Failed regions:\n- XX" in text
+    mock_ebird_client.get_recent_observations_batch.assert_called_once_with(
+        ["US-NY", "XX"], {"back": 7}, max_concurrency=8
+    )
+
+
+@pytest.mark.asyncio
+async def test_ebird_get_region_tree_tool(mock_ebird_client):
+    """Test the ebird_get_region_tree MCP tool."""
+    mock_ebird_client.get_sub_region_list.side_effect = lambda region_type, code: {
+        "US-NY": [{"code": "US-NY-061", "name": "New York"}, {"code": "US-NY-047", "name": "Kings"}],
+    }[code]
+    with patch("server.regions", RegionGraph()):
+        result = await ebird_get_region_tree(regionCode="US-NY")
+
+    assert "Kings (US-NY-047)" in result["content"][0]["text"]
+    mock_ebird_client.get_sub_region_list.assert_called_once_with("subnational2", "US-NY")
+
+
+@pytest.mark.asyncio
+async def test_ebird_get_recent_observations_pagination(mock_ebird_client):
+    """Test that a page cursor serves the next page without refetching."""
+    mock_ebird_client.get_recent_observations.return_value = [
+        {"comName": f"Bird {i}", "sciName": "Avis", "locName": "Park"} for i in range(5)
+    ]
+    result = await ebird_get_recent_observations(regionCode="US-NY", pageSize=2)
+    text = result["content"][0]["text"]
+    assert "Bird 1" in text and "Bird 2" not in text
+    assert "Showing 1-2 of 5." in text
+    cursor = text.rsplit("Next page cursor: ", 1)[1]
+
+    result = await ebird_get_recent_observations(regionCode="US-NY", pageSize=2, cursor=cursor)
+    text = result["content"][0]["text"]
+    assert "Bird 2" in text and "Bird 3" in text and "Bird 1" not in text
+    assert "Showing 3-4 of 5." in text
+    mock_ebird_client.get_recent_observations.assert_awaited_once_with("US-NY", {})
+
+
+@pytest.mark.asyncio
+async def test_invalid_page_size_rejected(mock_ebird_client):
+    """Test that a page size below 1 or a negative offset is rejected before fetching."""
+    with pytest.raises(ValueError, match="pageSize"):
+        await ebird_get_recent_observations(regionCode="US-NY", pageSize=0)
+    with pytest.raises(ValueError, match="offset"):
+        await ebird_get_recent_observations(regionCode="US-NY", offset=-1)
+    mock_ebird_client.get_recent_observations.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_structured_output_mode(mock_ebird_client):
+    """Test that structured mode returns compact records and a page cursor."""
+    mock_ebird_client.get_recent_observations.return_value = [
+        {"speciesCode": f"sp{i}", "comName": f"Bird {i}", "obsValid": True} for i in range(3)
+    ]
+    with patch("server.EBIRD_STRUCTURED_OUTPUT", True):
+        result = await ebird_get_recent_observations(regionCode="US-NY", pageSize=2)
+        assert result["observations"] == [
+            {"speciesCode": "sp0", "comName": "Bird 0"},
+            {"speciesCode": "sp1", "comName": "Bird 1"},
+        ]
+        assert result["total"] == 3
+        result = await ebird_get_recent_observations(regionCode="US-NY", cursor=result["nextCursor"])
+        assert result == {"observations": [{"speciesCode": "sp2", "comName": "Bird 2"}], "total": 3}
+
+
+@pytest.mark.asyncio
+async def test_structured_output_passes_records_through():
+    """Test that structured tool results skip FastMCP's re-validation."""
+    server = EBirdMCP(name="test")
+
+    @server.tool(name="records", structured_output=True)
+    async def records() -> dict[str, Any]:
+        return {"observations": [{"speciesCode": "norcar"}]}
+
+    with patch("server.EBIRD_STRUCTURED_OUTPUT", True):
+        content, structured = await server.call_tool("records", {})
+    assert structured == {"observations": [{"speciesCode": "norcar"}]}
+    assert json.loads(content[0].text) == structured
+
+
+def deferred_server(schema_cache, description="Get hotspot info."):
+    server = EBirdMCP(name="test", schema_cache=schema_cache)
+    server.defer_tool(
+        ebird_get_hotspot_info,
+        name="ebird_get_hotspot_info",
+        description=description,
+        structured_output=False,
+    )
+    server.defer_tool(
+        ebird_get_region_info,
+        name="ebird_get_region_info",
+        description="Get region info.",
+        structured_output=False,
+    )
+    return server
+
+
+def registered(server):
+    return sorted(info.name for info in server._tool_manager.list_tools())
+
+
+@pytest.mark.asyncio
+async def test_deferred_tool_registered_on_first_call(mock_ebird_client):
+    """Test that only the called tool is registered."""
+    mock_ebird_client.get_hotspot_info.return_value = {"locId": "L1", "locName": "Central Park"}
+    server = deferred_server(None)
+    assert registered(server) == []
+
+    await server.call_tool("ebird_get_hotspot_info", {"locId": "L1"})
+
+    assert registered(server) == ["ebird_get_hotspot_info"]
+
+
+@pytest.mark.asyncio
+async def test_list_tools_served_from_schema_cache(tmp_path):
+    """Test that a later start lists tools from the cache without registering them."""
+    path = str(tmp_path / "tool_schemas.json")
+    first = deferred_server(path)
+    tools = await first.list_tools()
+    assert [tool.name for tool in tools] == ["ebird_get_hotspot_info", "ebird_get_region_info"]
+    assert registered(first) == ["ebird_get_hotspot_info", "ebird_get_region_info"]
+
+    second = deferred_server(path)
+    assert await second.list_tools() == tools
+    assert registered(second) == []
+
+    changed = deferred_server(path, description="Get details of a hotspot.")
+    tools = await changed.list_tools()
+    assert tools[0].description == "Get details of a hotspot."
+    assert registered(changed) == ["ebird_get_hotspot_info", "ebird_get_region_info"]
+
+
+@pytest.mark.asyncio
+async def test_changed_tool_manager_falls_back_to_fastmcp(tmp_path, mock_ebird_client):
+    """Test that tools still work when the private tool manager API changes."""
+    mock_ebird_client.get_hotspot_info.return_value = {"locId": "L1", "locName": "Central Park"}
+    original = ToolManager.call_tool
+
+    async def call_tool(self, name, arguments, context=None, **kwargs):
+        return await original(self, name, arguments, context=context, **kwargs)
+
+    path = tmp_path / "tool_schemas.json"
+    with patch.object(ToolManager, "call_tool", call_tool), patch("server.EBIRD_STRUCTURED_OUTPUT", True):
+        server = deferred_server(str(path))
+        assert [tool.name for tool in await server.list_tools()] == [
+            "ebird_get_hotspot_info",
+            "ebird_get_region_info",
+        ]
+        content = await server.call_tool("ebird_get_hotspot_info", {"locId": "L1"})
+    assert not path.exists()
+    assert "Central Park" in content[0].text
+
+
+@pytest.mark.asyncio
+async def test_past_dates_served_from_archive(mock_ebird_client, empty_archive):
+    """Test that archived days are answered without calling the API."""
+    empty_archive.store_observations("US-NY", date(2023, 1, 1), [{"comName": "American Crow"}])
+    empty_archive.store_checklists("US-NY", date(2023, 1, 1), [{"subId": "S67890"}])
+
+    result = await ebird_get_historic_observations(regionCode="US-NY", year=2023, month=1, day=1)
+    assert "American Crow" in result["content"][0]["text"]
+    result = await ebird_get_checklist_feed_on_date(regionCode="US-NY", year=2023, month=1, day=1)
+    assert "S67890" in result["content"][0]["text"]
+    mock_ebird_client.get_historic_observations.assert_not_called()
+    mock_ebird_client.get_checklist_feed_on_date.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ebird_species_frequency_tool(mock_ebird_client):
+    """Test aggregating a species over a date range."""
+    mock_ebird_client.get_historic_observations.side_effect = lambda region, y, m, d, options: (
+        [{"speciesCode": "norcar", "comName": "Northern Cardinal", "howMany": d}] if d % 2 else []
+    )
+    result = await ebird_species_frequency(
+        regionCode="US-NY", speciesCode="norcar", back=4, endDate="2024-05-04"
+    )
+    text = result["content"][0]["text"]
+    assert "2024-05-01 to 2024-05-04 (4 days)" in text
+    assert "reported on 2/4 days (50%), total count 4, max 3 on 2024-05-03" in text
+    assert mock_ebird_client.get_historic_observations.await_count == 4
+
+    with pytest.raises(ValueError):
+        await ebird_species_frequency(regionCode="US-NY", back=1000)
+
+
+@pytest.mark.asyncio
+async def test_ebird_species_frequency_lists_failed_days(mock_ebird_client):
+    """Test that a failed day is listed while the other days are aggregated."""
+    def historic(region, y, m, d, options):
+        if d == 2:
+            raise httpx.ConnectError("boom")
+        return [{"speciesCode": "norcar", "comName": "Northern Cardinal", "howMany": 1}]
+
+    mock_ebird_client.get_historic_observations.side_effect = historic
+    result = await ebird_species_frequency(
+        regionCode="US-NY", speciesCode="norcar", back=3, endDate="2024-05-03"
+    )
+    text = result["content"][0]["text"]
+    assert "reported on 2/2 days (100%)" in text
+    assert "Failed dates:\n- 2024-05-02: boom" in text
+
+
+@pytest.mark.asyncio
+async def test_ebird_species_frequency_ends_yesterday(mock_ebird_client):
+    """Test that an end date in the future does not request days without data."""
+    mock_ebird_client.get_historic_observations.return_value = []
+    future = (date.today() + timedelta(days=30)).isoformat()
+    await ebird_species_frequency(regionCode="US-NY", back=2, endDate=future)
+
+    yesterday = date.today() - timedelta(days=1)
+    requested = [
+        date(*call.args[1:4])
+        for call in mock_ebird_client.get_historic_observations.await_args_list
+    ]
+    assert sorted(requested) == [yesterday - timedelta(days=1), yesterday]
+
+
+def county_hotspots():
+    today = date.today().isoformat()
+    return [
+        {"locId": "L1", "locName": "Central Park", "lat": 40.78, "lng": -73.97, "latestObsDt": today},
+        {"locId": "L2", "locName": "Bryant Park", "lat": 40.75, "lng": -73.98, "latestObsDt": today},
+        {"locId": "L3", "locName": "Inwood Hill Park", "lat": 40.87, "lng": -73.92, "latestObsDt": today},
+        {"locId": "L4", "locName": "Battery Park", "lat": 40.40, "lng": -74.20, "latestObsDt": today},
+        {"locId": "L5", "locName": "Pelham Bay Park", "lat": 41.20, "lng": -73.60, "latestObsDt": today},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_nearby_hotspots_served_from_index(mock_ebird_client):
+    """Test that fetched region lists answer nearby and nearest queries."""
+    mock_ebird_client.get_hotspots.side_effect = [county_hotspots(), []]
+    mock_ebird_client.get_adjacent_regions.return_value = [{"code": "US-NJ-017", "name": "Hudson"}]
+    await ebird_get_hotspots(regionCode="US-NY-061")
+    await ebird_get_hotspots(regionCode="US-NJ-017")
+    await ebird_get_adjacent_regions(regionCode="US-NY-061")
+
+    nearby = await ebird_get_nearby_hotspots(lat=40.77, lng=-73.97, dist=5)
+    nearest = await ebird_get_nearest_hotspots(lat=40.77, lng=-73.97, count=2)
+
+    text = nearby["content"][0]["text"]
+    assert "Central Park" in text and "Bryant Park" in text
+    assert "Inwood Hill Park" not in text
+    nearest_text = nearest["content"][0]["text"]
+    assert nearest_text.index("Central Park") < nearest_text.index("Bryant Park")
+    assert "Battery Park" not in nearest_text
+    mock_ebird_client.get_nearby_hotspots.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_nearby_hotspots_needs_indexed_neighbors(mock_ebird_client):
+    """Test that a known but unindexed neighbour sends the query to the API."""
+    mock_ebird_client.get_hotspots.return_value = county_hotspots()
+    mock_ebird_client.get_nearby_hotspots.return_value = []
+    await ebird_get_hotspots(regionCode="US-NY-061")
+    graph = RegionGraph()
+    graph._store(graph.adjacent, "US-NY-061", [{"code": "US-NJ-017", "name": "Hudson"}])
+
+    with patch("server.regions", graph):
+        await ebird_get_nearby_hotspots(lat=40.77, lng=-73.97, dist=5)
+
+    mock_ebird_client.get_nearby_hotspots.assert_called_once_with(40.77, -73.97, {"dist": 5})
+
+
+@pytest.mark.asyncio
+async def test_nearby_hotspots_across_unknown_border(mock_ebird_client):
+    """Test that a region with unknown neighbours does not answer for a circle near its border."""
+    mock_ebird_client.get_hotspots.return_value = county_hotspots()
+    mock_ebird_client.get_nearby_hotspots.return_value = [
+        {"locId": "L9", "locName": "Liberty State Park", "lat": 40.70, "lng": -74.06}
+    ]
+    await ebird_get_hotspots(regionCode="US-NY-061")
+
+    with patch("server.regions", RegionGraph()):
+        result = await ebird_get_nearby_hotspots(lat=40.72, lng=-74.02, dist=10)
+
+    assert "Liberty State Park" in result["content"][0]["text"]
+    mock_ebird_client.get_nearby_hotspots.assert_called_once_with(40.72, -74.02, {"dist": 10})
+
+
+@pytest.mark.asyncio
+async def test_nearby_observations_share_geo_tile(mock_ebird_client):
+    """Test that nearby queries from one tile fetch the same area and filter locally."""
+    today = date.today().isoformat()
+    mock_ebird_client.get_nearby_observations.return_value = [
+        {"comName": "Near Bird", "lat": 40.78, "lng": -73.97, "obsDt": today},
+        {"comName": "Far Bird", "lat": 40.90, "lng": -73.97, "obsDt": today},
+        {"comName": "Old Bird", "lat": 40.78, "lng": -73.97, "obsDt": "2000-01-01 08:00"},
+    ]
+
+    with patch("server.EBIRD_GEO_TILES", True):
+        first = await ebird_get_nearby_observations(lat=40.7800, lng=-73.9700, dist=5)
+        await ebird_get_nearby_observations(lat=40.7805, lng=-73.9710, dist=5)
+
+    text = first["content"][0]["text"]
+    assert "Near Bird" in text
+    assert "Far Bird" not in text and "Old Bird" not in text
+    (args1, _), (args2, _) = mock_ebird_client.get_nearby_observations.call_args_list
+    assert args1 == args2
+    assert args1[2] == {"dist": 10, "back": 30, "maxResults": 10000}
+
+
+@pytest.mark.asyncio
+async def test_nearby_observations_exact_by_default(mock_ebird_client):
+    """Test that nearby queries go upstream unchanged unless tiling is enabled."""
+    mock_ebird_client.get_nearby_observations.return_value = []
+    await ebird_get_nearby_observations(lat=40.78, lng=-73.97, dist=5)
+    mock_ebird_client.get_nearby_observations.assert_called_once_with(40.78, -73.97, {"dist": 5})
+
+
+@pytest.mark.asyncio
+async def test_ebird_get_checklists_tool(mock_ebird_client):
+    """Test bulk checklist details with a failing checklist."""
+    async def get_checklist(sub_id):
+        if sub_id == "S2":
+            raise RuntimeError("not found")
+        return {"subId": sub_id, "obs": []}
+
+    mock_ebird_client.get_checklist.side_effect = get_checklist
+    result = await ebird_get_checklists(checklistIds=["S1", "S2", "S3", "S1"])
+    text = result["content"][0]["text"]
+    assert text.index("Checklist ID: S1") < text.index("Checklist ID: S3")
+    assert "- S2: not found" in text
+    assert mock_ebird_client.get_checklist.await_count == 3
+
+    await ebird_get_checklists(checklistIds=["S3", "S1"])
+    assert mock_ebird_client.get_checklist.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_checklist_feed_prefetch(mock_ebird_client):
+    """Test that a feed prefetches details that later calls read from the store."""
+    mock_ebird_client.get_recent_checklists_feed.return_value = [
+        {"subId": "S1", "locName": "Park"},
+        {"subId": "S2", "locName": "Park"},
+        {"subId": "S3", "locName": "Park"},
+    ]
+    mock_ebird_client.get_checklist.side_effect = lambda sub_id: {"subId": sub_id, "obs": []}
+
+    await ebird_get_recent_checklists_feed(regionCode="US-NY", prefetch=2)
+    await asyncio.gather(*prefetches)
+    assert mock_ebird_client.get_checklist.await_count == 2
+
+    result = await ebird_get_checklist_details(checklistId="S2")
+    assert "S2" in result["content"][0]["text"]
+    assert mock_ebird_client.get_checklist.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_ebird_get_metrics_tool(mock_ebird_client):
+    """Test that tool calls show up in the metrics."""
+    mock_ebird_client.get_hotspot_info.side_effect = [{"locId": "L1"}, RuntimeError("boom")]
+    await ebird_get_hotspot_info(locId="L1")
+    with pytest.raises(RuntimeError):
+        await ebird_get_hotspot_info(locId="L2")
+
+    text = (await ebird_get_metrics())["content"][0]["text"]
+    assert 'ebird_tool_calls_total{tool="ebird_get_hotspot_info",status="ok"}' in text
+    assert 'ebird_tool_calls_total{tool="ebird_get_hotspot_info",status="error"}' in text
+    assert 'ebird_tool_in_flight{tool="ebird_get_metrics"} 1' in text
+    assert 'ebird_tool_duration_seconds_count{tool="ebird_get_hotspot_info"}' in text
+
+
+@pytest.mark.asyncio
+async def test_tool_call_spans(mock_ebird_client):
+    """Test dispatch, tool and format spans for a tool call."""
+    mock_ebird_client.get_hotspot_info.return_value = {"locId": "L1", "locName": "Central Park"}
+    exporter = InMemoryExporter()
+    with patch("server.tracer", Tracer(exporter)):
+        await mcp.call_tool("ebird_get_hotspot_info", {"locId": "L1"})
+
+    names = [span.name for span in exporter.spans]
+    assert names == ["format", "tool ebird_get_hotspot_info", "mcp.call_tool"]
+    fmt, tool_span, dispatch = exporter.spans
+    assert fmt.parent_id == tool_span.span_id
+    assert tool_span.parent_id == dispatch.span_id
+    assert dispatch.attributes["tool"] == "ebird_get_hotspot_info"
+
+
+@pytest.mark.asyncio
+async def test_warmup_jobs_preload_region_data(mock_ebird_client, empty_hotspot_index):
+    """Test that warm-up requests region data the way the tools do."""
+    mock_ebird_client.get_hotspots.return_value = county_hotspots()
+    jobs = warmup_jobs(["US-NY"], [])
+    assert sorted(jobs) == ["hotspots US-NY", "species US-NY", "subregions US-NY"]
+
+    stats = await WarmUp().run(jobs)
+
+    assert stats["done"] == 3
+    mock_ebird_client.get_hotspots.assert_called_once_with("US-NY", {})
+    mock_ebird_client.get_species_list_for_region.assert_called_once_with("US-NY")
+    mock_ebird_client.get_sub_region_list.assert_called_once_with("subnational2", "US-NY")
+    assert empty_hotspot_index.fresh("US-NY", 14)
+
+
+@pytest.fixture
+def http_server(mock_ebird_client):
+    """An HTTP app whose process-wide resources are counted instead of opened."""
+    mock_ebird_client.circuit_breaker.state = "closed"
+    entered = []
+
+    @asynccontextmanager
+    async def resources():
+        entered.append(True)
+        yield
+
+    with (
+        patch("server.resources", resources),
+        patch("server.serving_http", False),
+        patch("server.ready", False),
+        patch.object(mcp, "_session_manager", None),
+        patch.object(mcp, "schema_cache", None),
+        patch.object(mcp.settings, "stateless_http", False),
+    ):
+        yield entered
+
+
+def test_http_health_and_readiness(http_server):
+    """Test that a worker is ready between startup and shutdown."""
+    app = http_app("sse")
+    with TestClient(app) as client:
+        assert client.get("/healthz").json()["status"] == "ok"
+        response = client.get("/readyz")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+        assert response.json()["circuit"] == "closed"
+    assert http_server == [True]
+
+    response = client.get("/readyz")
+    assert response.status_code == 503
+
+
+def test_stateless_http_workers_share_resources(http_server, mock_ebird_client):
+    """Test that stateless requests run without reopening the worker's resources."""
+    mock_ebird_client.get_hotspot_info.return_value = {"locId": "L1", "locName": "Central Park"}
+    with patch("server.EBIRD_WORKERS", 2):
+        app = http_app("streamable-http")
+    assert mcp.settings.stateless_http
+
+    with TestClient(app) as client:
+        for request_id in (1, 2):
+            response = client.post(
+                "/mcp/",
+                json={
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "method": "tools/call",
+                    "params": {"name": "ebird_get_hotspot_info", "arguments": {"locId": "L1"}},
+                },
+                headers={"Accept": "application/json, text/event-stream"},
+            )
+            data = next(
+                line[len("data: "):] for line in response.text.splitlines() if line.startswith("data: ")
+            )
+            assert "Central Park" in json.loads(data)["result"]["content"][0]["text"]
+
+    assert http_server == [True]
+    assert mock_ebird_client.get_hotspot_info.call_count == 2
+
+
+def test_request_limits_shared_by_workers():
+    """Test that the workers together stay within the configured request limits."""
+    with (
+        patch("server.EBIRD_WORKERS", 4),
+        patch("server.EBIRD_MAX_CONCURRENCY", 8),
+        patch("server.EBIRD_RATE_LIMIT", 10.0),
+        patch("server.EBIRD_RATE_BURST", 10),
+    ):
+        governor = request_governor()
+    assert governor.max_concurrency == 2
+    assert governor._bucket.rate == 2.5
+    assert governor._bucket.burst == 2
+
+
+def test_warmup_runs_in_one_worker(tmp_path):
+    """Test that only the worker holding the warm-up lock runs the warm-up."""
+    with patch("server.EBIRD_CACHE_DIR", str(tmp_path)), patch("server.EBIRD_WORKERS", 2):
+        with warmup_leader() as first:
+            with warmup_leader() as second:
+                assert first and not second
+        # The lock is released when the leader exits.
+        with warmup_leader() as third:
+            assert third
+
+
+def test_main_starts_uvicorn_workers():
+    """Test that the HTTP transport runs the app factory in worker processes."""
+    with patch("uvicorn.run") as run, patch.dict("os.environ"):
+        main(["--transport", "streamable-http", "--port", "9000", "--workers", "4"])
+        assert run.call_args.args == ("server:http_app",)
+        assert run.call_args.kwargs["factory"] is True
+        assert run.call_args.kwargs["workers"] == 4
+        assert run.call_args.kwargs["port"] == 9000
+        assert os.environ["EBIRD_WORKERS"] == "4"
+        assert os.environ["EBIRD_TRANSPORT"] == "streamable-http"
+
+    with pytest.raises(SystemExit):
+        main(["--transport", "sse", "--workers", "2"])
+
+
+def test_main_serves_single_worker_in_process(http_server):
+    """Test that a single worker is served from this process without reimporting it."""
+    with patch("uvicorn.run") as run, patch("server.EBIRD_WORKERS", 1):
+        main(["--transport", "sse", "--port", "9000"])
+    app = run.call_args.args[0]
+    assert not isinstance(app, str)
+    assert "factory" not in run.call_args.kwargs
+    assert run.call_args.kwargs["port"] == 9000
+    with TestClient(app) as client:
+        assert client.get("/readyz").status_code == 200
@@ -0,0 +1,140 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from taxonomy import NameIndex, TaxonomyStore, fold_name, latest_version
+
+TAXA = [
+    {"speciesCode": "norcar", "comName": "Northern Cardinal", "sciName": "Cardinalis cardinalis", "category": "species", "taxonOrder": 2},
+    {"speciesCode": "bkfspo", "comName": "Black-faced Spoonbill", "sciName": "Platalea minor", "category": "species", "taxonOrder": 1},
+    {"speciesCode": "x00001", "comName": "duck sp.", "sciName": "Anatinae sp.", "category": "spuh", "taxonOrder": 3},
+]
+
+
+async def stream(records):
+    for record in records:
+        yield record
+
+
+def stream_mock(records):
+    """Mock for a client stream_* method yielding the given records."""
+    mock = MagicMock(side_effect=lambda *args: stream(mock.records))
+    mock.records = records
+    return mock
+
+
+@pytest.fixture
+def fake_client():
+    """Fixture for a client returning a fixed taxonomy."""
+    client = AsyncMock()
+    client.get_taxonomy_versions.return_value = [
+        {"authorityVer": 2023.0, "latest": False},
+        {"authorityVer": 2024.0, "latest": True},
+    ]
+    client.stream_taxonomy = stream_mock(TAXA)
+    return client
+
+
+def test_latest_version():
+    """Test picking the latest taxonomy version."""
+    assert latest_version([{"authorityVer": 2024.0, "latest": True}]) == "2024.0"
+    assert latest_version([{"version": "2023", "latest": True}]) == "2023"
+    assert latest_version([]) is None
+
+
+@pytest.mark.asyncio
+async def test_ensure_downloads_once_and_indexes(fake_client, tmp_path):
+    """Test that the taxonomy is downloaded once and indexed for lookups."""
+    store = TaxonomyStore(str(tmp_path / "taxonomy.sqlite3"))
+
+    await store.ensure(fake_client, "en")
+    await store.ensure(fake_client, "en")
+
+    fake_client.stream_taxonomy.assert_called_once_with({"locale": "en", "cat": None})
+    assert store.version("en") == "2024.0"
+    assert store.get("norcar")["comName"] == "Northern Cardinal"
+    assert store.get_by_sci_name("platalea MINOR")["speciesCode"] == "bkfspo"
+    assert store.get_by_common_name("northern  cardinal")["speciesCode"] == "norcar"
+    assert [t["speciesCode"] for t in store.taxa("en", categories=["species"])] == ["bkfspo", "norcar"]
+    assert store.taxa("en", species_codes=["norcar", "nope"]) == [TAXA[0]]
+
+
+@pytest.mark.asyncio
+async def test_store_is_reused_across_instances(fake_client, tmp_path):
+    """Test that a persisted taxonomy is loaded without any network calls."""
+    path = str(tmp_path / "taxonomy.sqlite3")
+    first = TaxonomyStore(path)
+    await first.ensure(fake_client, "en")
+    first.close()
+
+    offline = AsyncMock()
+    second = TaxonomyStore(path)
+    await second.ensure(offline, "en")
+
+    offline.get_taxonomy_versions.assert_not_called()
+    offline.stream_taxonomy.assert_not_called()
+    assert second.get("bkfspo")["comName"] == "Black-faced Spoonbill"
+
+
+@pytest.mark.asyncio
+async def test_refreshes_only_on_new_version(fake_client, tmp_path):
+    """Test that a stale check re-downloads only when the version changes."""
+    now = [0.0]
+    store = TaxonomyStore(str(tmp_path / "taxonomy.sqlite3"), check_interval=10, clock=lambda: now[0])
+    await store.ensure(fake_client, "en")
+
+    now[0] = 20
+    await store.ensure(fake_client, "en")
+    assert fake_client.stream_taxonomy.call_count == 1
+    assert fake_client.get_taxonomy_versions.call_count == 2
+
+    now[0] = 40
+    fake_client.get_taxonomy_versions.return_value = [{"authorityVer": 2025.0, "latest": True}]
+    await store.ensure(fake_client, "en")
+    assert fake_client.stream_taxonomy.call_count == 2
+    assert store.version("en") == "2025.0"
+
+
+def test_name_index_ranks_fuzzy_matches():
+    """Test fuzzy matching on common names, scientific names and codes."""
+    index = NameIndex(TAXA)
+
+    assert index.search("spoonbill")[0][1]["speciesCode"] == "bkfspo"
+    assert index.search("Black faced spoonbil")[0][1]["speciesCode"] == "bkfspo"
+    assert index.search("cardinalis")[0][1]["speciesCode"] == "norcar"
+    assert index.search("norcar")[0][1]["speciesCode"] == "norcar"
+    assert index.search("") == []
+
+
+def test_name_index_matches_part_of_unsegmented_names():
+    """Test that any part of a Chinese name matches, not only its start."""
+    index = NameIndex([
+        {"speciesCode": "bkfspo", "comName": "黑面琵鷺", "sciName": "Platalea minor"},
+        {"speciesCode": "eurspo", "comName": "白琵鷺", "sciName": "Platalea leucorodia"},
+        {"speciesCode": "grbher3", "comName": "蒼鷺", "sciName": "Ardea cinerea"},
+    ])
+
+    assert index.search("黑面")[0][1]["speciesCode"] == "bkfspo"
+    assert {taxon["speciesCode"] for _, taxon in index.search("琵鷺")} == {"bkfspo", "eurspo"}
+    assert [taxon["speciesCode"] for _, taxon in index.search("面琵")] == ["bkfspo"]
+    assert index.search("白鷺") == []
+
+
+def test_fold_name_strips_accents_and_punctuation():
+    """Test that names are folded for accent-insensitive matching."""
+    assert fold_name("Garça-branca-pequena") == "garca branca pequena"
+
+
+@pytest.mark.asyncio
+async def test_search_across_locales(fake_client):
+    """Test that search merges matches from every loaded locale."""
+    store = TaxonomyStore()
+    await store.ensure(fake_client, "en")
+    fake_client.stream_taxonomy.records = [
+        {"speciesCode": "bkfspo", "comName": "黑面琵鷺", "sciName": "Platalea minor", "category": "species"},
+    ]
+    await store.ensure(fake_client, "zh")
+
+    matches = store.search("黑面琵鷺")
+    assert matches[0][1] == "zh"
+    assert matches[0][2]["speciesCode"] == "bkfspo"
+    assert len({taxon["speciesCode"] for _, _, taxon in store.search("platalea")}) == 1
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from throttle import FairSemaphore, RequestGovernor, TokenBucket
+
+
+@pytest.mark.asyncio
+async def test_governor_bounds_concurrency():
+    """Test that no more than max_concurrency requests run at once."""
+    governor = RequestGovernor(max_concurrency=2)
+    running = []
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        async with governor.slot():
+            running.append(1)
+            peak = max(peak, len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+
+    await asyncio.gather(*(request() for _ in range(6)))
+
+    assert peak == 2
+    stats = governor.stats()
+    assert stats["requests"] == 6
+    assert stats["queue_depth"] == 0
+    assert stats["in_flight"] == 0
+    assert stats["max_wait_seconds"] > 0
+
+
+@pytest.mark.asyncio
+async def test_fair_semaphore_serves_waiters_in_order():
+    """Test that queued callers acquire the semaphore in arrival order."""
+    semaphore = FairSemaphore(1)
+    order = []
+
+    async def worker(i):
+        await semaphore.acquire()
+        order.append(i)
+        await asyncio.sleep(0)
+        semaphore.release()
+
+    await asyncio.gather(*(worker(i) for i in range(5)))
+    assert order == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_fair_semaphore_skips_cancelled_waiters():
+    """Test that a cancelled waiter does not leak a slot."""
+    semaphore = FairSemaphore(1)
+    await semaphore.acquire()
+    waiter = asyncio.ensure_future(semaphore.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    semaphore.release()
+
+    await asyncio.wait_for(semaphore.acquire(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    """Test that requests beyond the burst wait for new tokens."""
+    bucket = TokenBucket(rate=100, burst=2)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for _ in range(4):
+        await bucket.acquire()
+
+    assert loop.time() - start >= 0.015
@@ -0,0 +1,83 @@
+import asyncio
+import io
+import json
+
+import pytest
+
+from tracing import (
+    NOOP_SPAN,
+    STATUS_ERROR,
+    InMemoryExporter,
+    JsonLinesExporter,
+    Tracer,
+    exporter_for,
+)
+
+
+def test_disabled_tracer_returns_noop_span():
+    """Test that spans cost nothing without an exporter."""
+    tracer = Tracer()
+    assert not tracer.enabled
+    with tracer.span("work", records=3) as span:
+        span.set(bytes=10)
+    assert span is NOOP_SPAN
+
+
+@pytest.mark.asyncio
+async def test_spans_nest_across_tasks():
+    """Test parent links through nested spans and asyncio.gather."""
+    exporter = InMemoryExporter()
+    tracer = Tracer(exporter)
+
+    async def child(i):
+        with tracer.span("child", index=i):
+            await asyncio.sleep(0)
+
+    with tracer.span("root") as root:
+        await asyncio.gather(child(0), child(1))
+
+    children = [s for s in exporter.spans if s.name == "child"]
+    assert len(children) == 2
+    assert {s.parent_id for s in children} == {root.span_id}
+    assert {s.trace_id for s in exporter.spans} == {root.trace_id}
+    assert root.parent_id is None and exporter.spans[-1] is root
+
+
+def test_span_records_errors():
+    """Test that an exception marks the span as failed."""
+    exporter = InMemoryExporter()
+    tracer = Tracer(exporter)
+    with pytest.raises(ValueError):
+        with tracer.span("work"):
+            raise ValueError("boom")
+    assert exporter.spans[0].status == STATUS_ERROR
+    assert exporter.spans[0].message == "boom"
+
+
+def test_json_lines_exporter_writes_otlp():
+    """Test the OTLP-JSON line format."""
+    stream = io.StringIO()
+    tracer = Tracer(JsonLinesExporter(stream))
+    with tracer.span("ebird.request", endpoint="/data/obs/{}/recent", cache_hit=False, bytes=12):
+        pass
+
+    document = json.loads(stream.getvalue())
+    span = document["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert span["name"] == "ebird.request"
+    assert len(span["traceId"]) == 32 and len(span["spanId"]) == 16
+    assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
+    assert {"key": "bytes", "value": {"intValue": "12"}} in span["attributes"]
+    assert {"key": "cache_hit", "value": {"boolValue": False}} in span["attributes"]
+
+
+def test_exporter_for_file(tmp_path):
+    """Test appending spans to a file."""
+    path = tmp_path / "traces" / "spans.jsonl"
+    assert exporter_for("") is None
+    tracer = Tracer(exporter_for(str(path)))
+    with tracer.span("one"):
+        pass
+    with tracer.span("two"):
+        pass
+    tracer.close()
+    assert len(path.read_text().splitlines()) == 2
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from warmup import WarmUp
+
+
+@pytest.mark.asyncio
+async def test_warmup_runs_jobs_and_counts_failures():
+    """Test that a failing job is reported without stopping the others."""
+    ran = []
+
+    async def ok():
+        ran.append("ok")
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    warmup = WarmUp(budget=1)
+    stats = await warmup.run({"a": ok, "b": fail, "c": ok})
+
+    assert ran == ["ok", "ok"]
+    assert stats["state"] == "done"
+    assert (stats["jobs"], stats["done"], stats["failed"]) == (3, 2, 1)
+    assert stats["progress"] == 1.0
+    assert warmup.errors == {"b": "boom"}
+
+
+@pytest.mark.asyncio
+async def test_warmup_cancels_jobs_over_budget():
+    """Test that jobs still running at the end of the budget are cancelled."""
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def fast():
+        pass
+
+    warmup = WarmUp(budget=0.05)
+    stats = await warmup.run({"slow": slow, "fast": fast})
+
+    assert cancelled.is_set()
+    assert stats["state"] == "timed_out"
+    assert (stats["done"], stats["cancelled"]) == (1, 1)
+    assert stats["seconds"] < 1
@@ -0,0 +1,129 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter.
+
+    ``rate`` tokens are added per second up to ``burst``. Waiters are served
+    in arrival order because refills happen under a FIFO lock.
+    """
+
+    def __init__(self, rate, burst=None, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class FairSemaphore:
+    """
+    Semaphore that hands released slots to waiters strictly in FIFO order.
+    """
+
+    def __init__(self, value):
+        self._value = value
+        self._waiters = deque()
+
+    def __len__(self):
+        return sum(1 for w in self._waiters if not w.done())
+
+    async def acquire(self):
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation.
+                self.release()
+            raise
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._value += 1
+
+
+class RequestGovernor:
+    """
+    Bounds outbound requests by concurrency and rate.
+
+    Callers queue fairly for a slot instead of failing. ``stats()`` reports
+    queue depth, in-flight requests and time spent waiting.
+    """
+
+    def __init__(self, max_concurrency=8, rate=None, burst=None, clock=time.monotonic):
+        self.max_concurrency = max_concurrency
+        self.clock = clock
+        self._semaphore = FairSemaphore(max_concurrency) if max_concurrency else None
+        self._bucket = TokenBucket(rate, burst, clock=clock) if rate else None
+        self.queued = 0
+        self.in_flight = 0
+        self.requests = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def slot(self):
+        start = self.clock()
+        self.queued += 1
+        acquired = False
+        try:
+            if self._semaphore is not None:
+                await self._semaphore.acquire()
+                acquired = True
+            if self._bucket is not None:
+                await self._bucket.acquire()
+        except BaseException:
+            if acquired:
+                self._semaphore.release()
+            raise
+        finally:
+            self.queued -= 1
+
+        waited = self.clock() - start
+        self.requests += 1
+        self.wait_seconds_total += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+    def stats(self):
+        return {
+            "queue_depth": self.queued,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "wait_seconds_total": self.wait_seconds_total,
+            "max_wait_seconds": self.max_wait_seconds,
+            "avg_wait_seconds": self.wait_seconds_total / self.requests if self.requests else 0.0,
+        }
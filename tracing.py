@@ -0,0 +1,204 @@
+"""
+Optional tracing of tool calls, eBird API requests and rendering.
+
+Spans nest through a context variable, so concurrent requests started with
+``asyncio.gather`` are attributed to the span that started them. Finished
+spans are written one OTLP-JSON ``ExportTraceServiceRequest`` per line,
+the format an OpenTelemetry collector's file receiver reads. Without an
+exporter, ``Tracer.span`` returns a shared no-op span.
+"""
+
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+
+INTERNAL = 1
+SERVER = 2
+CLIENT = 3
+
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current = contextvars.ContextVar("ebird_span", default=None)
+
+
+def _attribute(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Span:
+    __slots__ = (
+        "name", "kind", "trace_id", "span_id", "parent_id",
+        "start", "end", "attributes", "status", "message",
+    )
+
+    def __init__(self, name, kind, parent, attributes):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start = time.time_ns()
+        self.end = None
+        self.attributes = attributes
+        self.status = STATUS_OK
+        self.message = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end),
+            "attributes": [
+                _attribute(key, value)
+                for key, value in self.attributes.items()
+                if value is not None
+            ],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.message:
+            span["status"]["message"] = self.message
+        return span
+
+
+class NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class ActiveSpan:
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer, span):
+        self.tracer = tracer
+        self.span = span
+        self.token = None
+
+    def __enter__(self):
+        self.token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        span = self.span
+        span.end = time.time_ns()
+        if exc is not None:
+            span.status = STATUS_ERROR
+            span.message = str(exc) or exc_type.__name__
+        _current.reset(self.token)
+        self.tracer.exporter.export(span)
+        return False
+
+
+class JsonLinesExporter:
+    """
+    Write each finished span as a line of OTLP JSON to a text stream.
+    """
+
+    def __init__(self, stream, service_name="ebird-mcp-server"):
+        self.stream = stream
+        self.resource = {"attributes": [_attribute("service.name", service_name)]}
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        line = json.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "resource": self.resource,
+                        "scopeSpans": [
+                            {"scope": {"name": "ebird-mcp-server"}, "spans": [span.to_otlp()]}
+                        ],
+                    }
+                ]
+            },
+            separators=(",", ":"),
+        )
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def close(self):
+        if self.stream not in (sys.stdout, sys.stderr):
+            self.stream.close()
+
+
+class InMemoryExporter:
+    """
+    Keep finished spans in ``spans``, for tests and benchmarks.
+    """
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def close(self):
+        pass
+
+
+def exporter_for(target):
+    """
+    Return an exporter for ``target``: ``"stderr"``, or a file path that
+    spans are appended to. Returns None for an empty target.
+    """
+    if not target:
+        return None
+    if target == "stderr":
+        return JsonLinesExporter(sys.stderr)
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    return JsonLinesExporter(open(target, "a", encoding="utf-8"))
+
+
+class Tracer:
+    """
+    Creates nested spans and hands finished ones to ``exporter``.
+    """
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self):
+        return self.exporter is not None
+
+    def span(self, name, kind=INTERNAL, **attributes):
+        """
+        Return a context manager for a span that is a child of the current
+        one. Use ``span.set(...)`` to add attributes known only later.
+        """
+        if self.exporter is None:
+            return NOOP_SPAN
+        return ActiveSpan(self, Span(name, kind, _current.get(), attributes))
+
+    def close(self):
+        if self.exporter is not None:
+            self.exporter.close()
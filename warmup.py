@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+
+class WarmUp:
+    """
+    Runs cache warm-up jobs concurrently within a time budget.
+
+    Jobs are ``{label: coroutine function}``. Jobs still running when the
+    budget runs out are cancelled; a failing job is counted and does not
+    stop the others. Progress is exposed through ``stats()``.
+    """
+
+    def __init__(self, budget=60.0, clock=time.monotonic):
+        self.budget = budget
+        self.clock = clock
+        self.state = "idle"
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.errors = {}
+        self.started_at = None
+        self.finished_at = None
+
+    async def run(self, jobs):
+        self.state = "running"
+        self.total = len(jobs)
+        self.started_at = self.clock()
+
+        async def run_job(label, job):
+            try:
+                await job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                self.errors[label] = str(e) or type(e).__name__
+            else:
+                self.done += 1
+
+        tasks = [asyncio.ensure_future(run_job(label, job)) for label, job in jobs.items()]
+        try:
+            if tasks:
+                _, pending = await asyncio.wait(tasks, timeout=self.budget)
+                for task in pending:
+                    task.cancel()
+                self.cancelled = len(pending)
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.finished_at = self.clock()
+            self.state = "done" if not self.cancelled else "timed_out"
+        return self.stats()
+
+    def stats(self):
+        end = self.finished_at if self.finished_at is not None else self.clock()
+        return {
+            "state": self.state,
+            "jobs": self.total,
+            "done": self.done,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "progress": (self.done + self.failed) / self.total if self.total else 1.0,
+            "seconds": end - self.started_at if self.started_at is not None else 0.0,
+        }